@@ -0,0 +1,336 @@
+"""
+Background alert dispatch.
+
+send_notification used to build a Twilio client and make a blocking network
+call inside /predict. Alerts now go onto a bounded queue and are delivered
+by worker threads in small batches, with retry and exponential backoff, so
+the request path only pays for a queue put.
+
+Transports are pluggable: Twilio SMS, a JSON-lines file sink (useful for
+local testing), and a log-only fallback.
+"""
+import heapq
+import importlib.util
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime
+
+# The Twilio SDK is slow to import; it is only loaded once a Twilio
+# transport is actually built
+_TWILIO_AVAILABLE = importlib.util.find_spec("twilio") is not None
+
+
+class Alert:
+    """One notification waiting to be delivered"""
+
+    __slots__ = ('phone_number', 'message', 'enqueued_at', 'created', 'attempts')
+
+    def __init__(self, phone_number, message):
+        self.phone_number = str(phone_number)
+        self.message = message
+        self.enqueued_at = time.monotonic()
+        self.created = datetime.now().isoformat()
+        self.attempts = 0
+
+    def to_dict(self):
+        return {"to": self.phone_number, "message": self.message, "created": self.created}
+
+
+# --- Transports ---
+# A transport delivers a batch and returns the alerts that failed; raising
+# means the whole batch failed.
+
+class LogTransport:
+    """Writes alerts to the log only (the old fallback behaviour)"""
+
+    name = "log"
+
+    def __init__(self, logger=None):
+        self.logger = logger or logging.getLogger(__name__)
+
+    def send_batch(self, alerts):
+        for alert in alerts:
+            self.logger.info(f"Notify {alert.phone_number}: {alert.message}")
+        return []
+
+
+class FileTransport:
+    """Appends alerts as JSON lines to a local file"""
+
+    name = "file"
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def send_batch(self, alerts):
+        lines = "".join(json.dumps(alert.to_dict()) + "\n" for alert in alerts)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        return []
+
+
+class TwilioTransport:
+    """Sends alerts as SMS through Twilio, reusing one client"""
+
+    name = "twilio"
+
+    def __init__(self, account_sid, auth_token, from_number):
+        if not _TWILIO_AVAILABLE:
+            raise RuntimeError("twilio is not installed")
+        self.from_number = from_number
+        self._credentials = (account_sid, auth_token)
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self):
+        # Created by the first alert worker that needs it, not at startup
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from twilio.rest import Client
+                    self._client = Client(*self._credentials)
+        return self._client
+
+    @classmethod
+    def from_env(cls):
+        """Build from TWILIO_* environment variables, or return None"""
+        account_sid = os.getenv('TWILIO_ACCOUNT_SID')
+        auth_token = os.getenv('TWILIO_AUTH_TOKEN')
+        from_number = os.getenv('TWILIO_FROM')
+        if not (_TWILIO_AVAILABLE and account_sid and auth_token and from_number):
+            return None
+        return cls(account_sid, auth_token, from_number)
+
+    def send_batch(self, alerts):
+        failed = []
+        for alert in alerts:
+            try:
+                self.client.messages.create(
+                    to=alert.phone_number,
+                    from_=self.from_number,
+                    body=alert.message
+                )
+            except Exception:
+                failed.append(alert)
+        return failed
+
+
+def transport_from_env(logger=None):
+    """Pick a transport from ALERT_TRANSPORT (auto, twilio, file, log)"""
+    kind = os.getenv('ALERT_TRANSPORT', 'auto').lower()
+    if kind == 'file':
+        return FileTransport(os.getenv('ALERT_SINK_PATH', os.path.join('logs', 'alerts.jsonl')))
+    if kind == 'log':
+        return LogTransport(logger)
+    transport = TwilioTransport.from_env()
+    if transport is None:
+        if kind == 'twilio':
+            raise RuntimeError("ALERT_TRANSPORT=twilio but Twilio is not installed or configured")
+        return LogTransport(logger)
+    return transport
+
+
+# --- Dispatcher ---
+
+class AlertDispatcher:
+    """Bounded alert queue drained by worker threads.
+
+    Workers start on first submit and are restarted automatically in a
+    forked child process, so the dispatcher is safe to create at import time.
+    on_sent, if given, is called with each delivered alert's queue-to-send
+    latency in seconds (e.g. a metrics histogram's observe).
+    """
+
+    def __init__(self, transport, maxsize=1000, workers=2, batch_size=20, batch_wait=0.05,
+                 max_retries=3, backoff_base=0.5, backoff_max=30.0, logger=None, on_sent=None):
+        self.transport = transport
+        self.maxsize = maxsize
+        self.num_workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.logger = logger or logging.getLogger(__name__)
+        self.on_sent = on_sent
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._queue = queue.Queue(maxsize=self.maxsize)
+        self._retry_heap = []
+        self._retry_cond = threading.Condition()
+        self._stats_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._threads = []
+        self._stopping = threading.Event()
+        self.submitted = 0
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.dropped = 0
+        self.batches = 0
+        self._latency_count = 0
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+
+    def _ensure_started(self):
+        if self._pid != os.getpid():
+            # Forked: the parent's threads and queue state don't exist here
+            self._reset()
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.num_workers):
+                t = threading.Thread(target=self._worker, name=f"alert-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+            t = threading.Thread(target=self._retry_scheduler, name="alert-retry", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def submit(self, phone_number, message):
+        """Queue an alert without blocking; returns False if it was dropped"""
+        self._ensure_started()
+        alert = Alert(phone_number, message)
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+        with self._stats_lock:
+            self.submitted += 1
+        return True
+
+    def _next_batch(self):
+        try:
+            first = self._queue.get(timeout=0.5)
+        except queue.Empty:
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                failed = self.transport.send_batch(batch)
+            except Exception as e:
+                self.logger.warning(f"Alert transport {self.transport.name} failed: {e}")
+                failed = batch
+            failed_ids = {id(a) for a in failed}
+            now = time.monotonic()
+            latencies = [now - alert.enqueued_at for alert in batch if id(alert) not in failed_ids]
+            with self._stats_lock:
+                self.batches += 1
+                self.sent += len(latencies)
+                for latency in latencies:
+                    self._latency_count += 1
+                    self._latency_sum += latency
+                    self._latency_max = max(self._latency_max, latency)
+            if self.on_sent is not None:
+                for latency in latencies:
+                    self.on_sent(latency)
+            for alert in failed:
+                self._schedule_retry(alert)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _schedule_retry(self, alert):
+        alert.attempts += 1
+        if alert.attempts > self.max_retries:
+            with self._stats_lock:
+                self.failed += 1
+            self.logger.error(f"Giving up on alert to {alert.phone_number} after {alert.attempts} attempts")
+            return
+        delay = min(self.backoff_max, self.backoff_base * (2 ** (alert.attempts - 1)))
+        delay *= random.uniform(0.8, 1.2)
+        with self._retry_cond:
+            heapq.heappush(self._retry_heap, (time.monotonic() + delay, id(alert), alert))
+            self._retry_cond.notify()
+        with self._stats_lock:
+            self.retried += 1
+
+    def _retry_scheduler(self):
+        while not self._stopping.is_set():
+            with self._retry_cond:
+                if not self._retry_heap:
+                    self._retry_cond.wait(timeout=0.5)
+                    continue
+                due_at = self._retry_heap[0][0]
+                wait = due_at - time.monotonic()
+                if wait > 0:
+                    self._retry_cond.wait(timeout=min(wait, 0.5))
+                    continue
+                _, _, alert = heapq.heappop(self._retry_heap)
+                # Requeue under the lock so flush() never sees the alert in neither place
+                try:
+                    self._queue.put_nowait(alert)
+                except queue.Full:
+                    with self._stats_lock:
+                        self.dropped += 1
+
+    def flush(self, timeout=5.0):
+        """Wait until queued alerts and pending retries are processed"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._retry_cond:
+                pending_retries = len(self._retry_heap)
+            if self._queue.unfinished_tasks == 0 and pending_retries == 0:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def stop(self, timeout=5.0):
+        """Drain what can be sent within timeout, then stop the workers"""
+        if self._threads and self._pid == os.getpid():
+            self.flush(timeout)
+        self._stopping.set()
+        for t in self._threads:
+            t.join(timeout=1.0)
+        self._threads = []
+
+    def stats(self):
+        with self._stats_lock:
+            avg = self._latency_sum / self._latency_count if self._latency_count else 0.0
+            return {
+                "transport": self.transport.name,
+                "queue_depth": self._queue.qsize(),
+                "queue_maxsize": self.maxsize,
+                "pending_retries": len(self._retry_heap),
+                "submitted": self.submitted,
+                "sent": self.sent,
+                "failed": self.failed,
+                "retried": self.retried,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "dispatch_latency_ms": {
+                    "count": self._latency_count,
+                    "avg": round(avg * 1000, 3),
+                    "max": round(self._latency_max * 1000, 3),
+                },
+            }
@@ -0,0 +1,75 @@
+"""
+Alert deduplication by hazard and map cell.
+
+Repeated clicks around a hotspot used to send one alert per click. The
+suppressor remembers, per (hazard, grid cell), until when further alerts
+are muted; a lookup and update are O(1) dict operations, and the table is
+bounded with expired and least-recently-alerted entries dropped first.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+
+
+class AlertSuppressor:
+    """Per-hazard, per-cell cooldown table"""
+
+    def __init__(self, cell_degrees=0.5, cooldown=900.0, cooldowns=None, maxsize=10000):
+        self.cell_degrees = cell_degrees
+        self.cooldown = cooldown
+        self.cooldowns = dict(cooldowns or {})
+        self.maxsize = maxsize
+        self._until = OrderedDict()  # (hazard, cell_lat, cell_lng) -> muted until
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.suppressed = 0
+        self.suppressed_by_hazard = {}
+
+    def cell(self, lat, lng):
+        return (math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees))
+
+    def cooldown_for(self, hazard):
+        return self.cooldowns.get(hazard, self.cooldown)
+
+    def should_send(self, hazard, lat, lng, now=None):
+        """True if an alert for hazard at (lat, lng) should go out now"""
+        now = time.monotonic() if now is None else now
+        key = (hazard,) + self.cell(lat, lng)
+        with self._lock:
+            until = self._until.get(key)
+            if until is not None and until > now:
+                self.suppressed += 1
+                self.suppressed_by_hazard[hazard] = self.suppressed_by_hazard.get(hazard, 0) + 1
+                return False
+
+            self._until[key] = now + self.cooldown_for(hazard)
+            self._until.move_to_end(key)
+            self.allowed += 1
+            self._evict(now)
+            return True
+
+    def _evict(self, now):
+        # Entries at the front were alerted longest ago: drop them while
+        # expired, then drop more only if the table is over its bound.
+        while self._until:
+            key, until = next(iter(self._until.items()))
+            if until > now and len(self._until) <= self.maxsize:
+                break
+            self._until.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._until.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cell_degrees": self.cell_degrees,
+                "cooldown_seconds": self.cooldown,
+                "cooldown_overrides": dict(self.cooldowns),
+                "tracked_cells": len(self._until),
+                "allowed": self.allowed,
+                "suppressed": self.suppressed,
+                "suppressed_by_hazard": dict(self.suppressed_by_hazard),
+            }
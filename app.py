@@ -1,19 +1,25 @@
-from flask import Flask, jsonify, request, render_template
+import time
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, Response, g, jsonify, request, render_template
 from flask_cors import CORS
 import os
-import pickle
-import pandas as pd
 import numpy as np
 from math import radians, cos, sin, sqrt, atan2
 import traceback
 from datetime import datetime
 import sys
 import socket
-try:
-    from twilio.rest import Client
-    _TWILIO_AVAILABLE = True
-except Exception:
-    _TWILIO_AVAILABLE = False
+from spatial_index import SpatialIndex, find_lat_lon_columns
+from predictor import DisasterPredictor, base_path, class_probabilities, risk_level
+from stage_pipeline import StagePipeline
+from prediction_cache import PredictionCache
+from hot_reload import ModelReloader
+from ingest import EventIngestor, parse_events
+from alert_queue import AlertDispatcher, transport_from_env
+from alert_suppression import AlertSuppressor
+from metrics import Registry
+import warnings
 
 # Initialize Flask app
 app = Flask(__name__, template_folder=".", static_folder=".")
@@ -43,34 +49,195 @@ def handle_exception(e):
     }), 500
 
 # --- Model / Data Loading ---
-model_dir = "models"
-
-try:
-    earthquake_model = pickle.load(open(os.path.join(model_dir, "earthquake_model.pkl"), "rb"))
-    flood_model = pickle.load(open(os.path.join(model_dir, "flood_model.pkl"), "rb"))
-    wildfire_model = pickle.load(open(os.path.join(model_dir, "wildfire_model.pkl"), "rb"))
-    print("All models loaded successfully")
-except Exception as e:
-    print(f"Error loading models: {str(e)}")
-    raise
-
-# Load CSV data for nearby counts
-try:
-    earthquakes_df = pd.read_csv("earthquakes.csv")
-    floods_df = pd.read_csv("floods.csv")
-    wildfires_df = pd.read_csv("wildfires.csv")
-    
-    # Keep original column names for feature extraction
-    # The count_nearby function will handle both 'latitude'/'longitude' and 'lat'/'lon'
-    print("CSV data loaded successfully")
-    print(f"   Earthquake columns: {list(earthquakes_df.columns)}")
-    print(f"   Flood columns: {list(floods_df.columns)}")
-    print(f"   Wildfire columns: {list(wildfires_df.columns)}")
-except Exception as e:
-    print(f"Warning loading CSV data: {str(e)}")
-    earthquakes_df = pd.DataFrame()
-    floods_df = pd.DataFrame()
-    wildfires_df = pd.DataFrame()
+MODEL_LAZY_LOAD = os.getenv('MODEL_LAZY_LOAD', '0') == '1'
+CATALOG_AUTO_CONVERT = os.getenv('CATALOG_AUTO_CONVERT', '0') == '1'
+
+# Startup timings (ms since this module started importing), reported on /stats
+STARTUP = {"import_ms": None, "models_ms": None, "first_request_ms": None}
+
+# Models, feature plans, event catalogs (memory-mapped binaries written by
+# catalog_store.py, or the CSVs) and their spatial indexes, shared with
+# model.py, backend/predict_disaster.py and score_file.py
+predictor = DisasterPredictor(lazy=MODEL_LAZY_LOAD, convert_catalogs=CATALOG_AUTO_CONVERT)
+if predictor.catalog_error is None:
+    print("CSV data loaded successfully (sources: "
+          f"{', '.join(c.source for c in predictor.catalogs.values())})")
+    for hazard, catalog in predictor.catalogs.items():
+        print(f"   {hazard.title()} columns: {list(catalog.columns)}")
+else:
+    print(f"Warning loading CSV data: {str(predictor.catalog_error)}")
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+# Models load in parallel threads now, or on their first request with
+# MODEL_LAZY_LOAD=1
+if not MODEL_LAZY_LOAD:
+    try:
+        STARTUP["models_ms"] = predictor.load_models(parallel=True)
+        print(f"All models loaded successfully in {STARTUP['models_ms']} ms "
+              f"({', '.join(f'{h} {ms} ms' for h, ms in predictor.loader.load_ms.items())})")
+    except Exception as e:
+        print(f"Error loading models: {str(e)}")
+        raise
+else:
+    print("Models will load on first request (MODEL_LAZY_LOAD=1)")
+
+# Older module-level names, read from the predictor
+_PREDICTOR_ATTRIBUTES = {
+    "model_loader": lambda p: p.loader,
+    "feature_defaults": lambda p: p.feature_defaults,
+    "feature_plans": lambda p: p.feature_plans,
+    "MODEL_FILES": lambda p: p.model_files,
+    "MODEL_VERSION": lambda p: p.model_version,
+    "DATA_VERSION": lambda p: p.data_version,
+    "earthquakes_df": lambda p: p.catalogs["earthquake"],
+    "floods_df": lambda p: p.catalogs["flood"],
+    "wildfires_df": lambda p: p.catalogs["wildfire"],
+    "earthquakes_index": lambda p: p.indexes["earthquake"],
+    "floods_index": lambda p: p.indexes["flood"],
+    "wildfires_index": lambda p: p.indexes["wildfire"],
+}
+
+
+def __getattr__(name):
+    # app.earthquake_model etc. for scripts that import the models from here
+    if name.endswith("_model") and name[:-len("_model")] in predictor.hazards:
+        return predictor.model(name[:-len("_model")])
+    if name in _PREDICTOR_ATTRIBUTES:
+        return _PREDICTOR_ATTRIBUTES[name](predictor)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Thread pool for the independent /predict stages; PREDICT_WORKERS=1 runs them inline
+PREDICT_WORKERS = int(os.getenv('PREDICT_WORKERS', '6'))
+stage_pipeline = StagePipeline(max_workers=PREDICT_WORKERS)
+
+def _reinit_after_fork():
+    """Give a forked worker its own thread pool (threads don't survive fork)"""
+    global stage_pipeline
+    stage_pipeline = StagePipeline(max_workers=PREDICT_WORKERS)
+
+# Registered once; importlib.reload (serve.py graceful restart) reuses the module namespace
+if hasattr(os, 'register_at_fork') and not globals().get('_FORK_HOOK_REGISTERED'):
+    os.register_at_fork(after_in_child=lambda: _reinit_after_fork())
+    _FORK_HOOK_REGISTERED = True
+
+# Cache of computed probabilities/counts keyed on quantized coordinates and
+# the model/data version, so a reload never serves stale entries
+prediction_cache = PredictionCache(
+    maxsize=int(os.getenv('PREDICTION_CACHE_SIZE', '10000')),
+    ttl=float(os.getenv('PREDICTION_CACHE_TTL', '300')),
+    precision=int(os.getenv('PREDICTION_CACHE_PRECISION', '3'))
+)
+
+# --- Hot reload ---
+# New model files or catalogs are loaded and warmed in the background, then
+# swapped in; requests hold on to the predictor they started with
+MODEL_RELOAD_INTERVAL = float(os.getenv('MODEL_RELOAD_INTERVAL', '5'))
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+WARM_UP_POINT = (20.59, 78.96)
+
+def _build_predictor():
+    """A new predictor with every model loaded and one prediction run"""
+    new_predictor = DisasterPredictor(convert_catalogs=CATALOG_AUTO_CONVERT)
+    if new_predictor.catalog_error is not None:
+        raise new_predictor.catalog_error
+    # Replay events ingested since the catalogs were written
+    event_ingestor.sync(new_predictor)
+    new_predictor.load_models(parallel=True)
+    new_predictor.predict(*WARM_UP_POINT)
+    return new_predictor
+
+def _swap_predictor(new_predictor):
+    global predictor
+    predictor = new_predictor
+    # Entries are keyed on the version, so the old ones could never hit again
+    prediction_cache.clear()
+
+# serve.py's graceful restart stops the previous module's reloader, ingestor,
+# alert workers and stage pool once this one has loaded and warmed up
+model_reloader = ModelReloader(_build_predictor, _swap_predictor, predictor,
+                               interval=MODEL_RELOAD_INTERVAL, logger=app.logger)
+
+# --- Event ingestion ---
+# New events (POST /ingest or files in INGEST_DIR/<hazard>/) are appended to
+# the catalogs and spatial indexes in place of a full reload
+INGEST_DIR = os.getenv('INGEST_DIR', os.path.join(base_path, 'ingest'))
+INGEST_MAX_EVENTS = int(os.getenv('INGEST_MAX_EVENTS', '100000'))
+
+event_ingestor = EventIngestor(
+    lambda: predictor,
+    directory=INGEST_DIR,
+    interval=float(os.getenv('INGEST_INTERVAL', '2')),
+    compact_interval=float(os.getenv('INGEST_COMPACT_INTERVAL', '60')),
+    on_ingest=lambda current: prediction_cache.clear(),
+    logger=app.logger
+)
+if event_ingestor.sync(predictor):
+    print(f"Ingested events from {INGEST_DIR}: {predictor.ingested}")
+
+# Alerts are delivered by background workers (transport from ALERT_TRANSPORT)
+alert_dispatcher = AlertDispatcher(
+    transport_from_env(app.logger),
+    maxsize=int(os.getenv('ALERT_QUEUE_SIZE', '1000')),
+    workers=int(os.getenv('ALERT_WORKERS', '2')),
+    batch_size=int(os.getenv('ALERT_BATCH_SIZE', '20')),
+    max_retries=int(os.getenv('ALERT_MAX_RETRIES', '3')),
+    logger=app.logger,
+    on_sent=lambda latency: ALERT_DISPATCH_SECONDS.observe(latency)
+)
+
+# Mutes repeat alerts for the same hazard and map cell during a cooldown window
+alert_suppressor = AlertSuppressor(
+    cell_degrees=float(os.getenv('ALERT_CELL_DEGREES', '0.5')),
+    cooldown=float(os.getenv('ALERT_COOLDOWN_SECONDS', '900')),
+    cooldowns={
+        hazard: float(os.environ[f'ALERT_COOLDOWN_{hazard.upper()}'])
+        for hazard in ('earthquake', 'flood', 'wildfire')
+        if os.getenv(f'ALERT_COOLDOWN_{hazard.upper()}')
+    },
+    maxsize=int(os.getenv('ALERT_SUPPRESSION_SIZE', '10000'))
+)
+
+# --- Metrics ---
+metrics_registry = Registry()
+REQUESTS_TOTAL = metrics_registry.counter(
+    "disasterscope_requests_total", "HTTP requests by endpoint, method and status",
+    ("endpoint", "method", "status"))
+ERRORS_TOTAL = metrics_registry.counter(
+    "disasterscope_request_errors_total", "HTTP requests that returned a 5xx status", ("endpoint",))
+REQUEST_SECONDS = metrics_registry.histogram(
+    "disasterscope_request_duration_seconds", "End-to-end request latency", ("endpoint",))
+STAGE_SECONDS = metrics_registry.histogram(
+    "disasterscope_stage_duration_seconds", "Latency of request stages", ("stage", "target"))
+ALERT_DISPATCH_SECONDS = metrics_registry.histogram(
+    "disasterscope_alert_dispatch_seconds", "Time from queueing an alert to its delivery")
+
+def _collect_runtime_stats():
+    cache = prediction_cache.stats()
+    alerts = alert_dispatcher.stats()
+    suppression = alert_suppressor.stats()
+    return [
+        ("disasterscope_prediction_cache_hits_total", "counter", "Prediction cache hits", cache["hits"]),
+        ("disasterscope_prediction_cache_misses_total", "counter", "Prediction cache misses", cache["misses"]),
+        ("disasterscope_prediction_cache_evictions_total", "counter", "Prediction cache LRU evictions", cache["evictions"]),
+        ("disasterscope_prediction_cache_entries", "gauge", "Prediction cache entries", cache["size"]),
+        ("disasterscope_alert_queue_depth", "gauge", "Alerts waiting to be sent", alerts["queue_depth"]),
+        ("disasterscope_alerts_sent_total", "counter", "Alerts delivered", alerts["sent"]),
+        ("disasterscope_alerts_failed_total", "counter", "Alerts given up after retries", alerts["failed"]),
+        ("disasterscope_alerts_dropped_total", "counter", "Alerts dropped on a full queue", alerts["dropped"]),
+        ("disasterscope_alerts_suppressed_total", "counter", "Alerts muted by cooldown", suppression["suppressed"]),
+    ] + [
+        (f"disasterscope_startup_{key[:-3]}_seconds", "gauge", f"Startup timing: {key[:-3].replace('_', ' ')}", round(ms / 1000, 6))
+        for key, ms in STARTUP.items() if ms is not None
+    ]
+
+metrics_registry.add_collector(_collect_runtime_stats)
+
+STARTUP["import_ms"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 2)
+
+def state_version():
+    """Version of the loaded models and catalogs"""
+    return predictor.version
 
 # --- Helper Functions ---
 def haversine(lat1, lon1, lat2, lon2):
@@ -83,39 +250,86 @@ def haversine(lat1, lon1, lat2, lon2):
     return R * c
 
 def count_nearby(df, lat, lon, radius_km=100):
-    """Count nearby disasters within radius"""
-    if df.empty:
-        return 0
-    
-    # Find latitude and longitude columns
-    lat_col = None
-    lon_col = None
-    
-    for col in df.columns:
-        col_lower = col.lower()
-        if col_lower in ['latitude', 'lat'] and lat_col is None:
-            lat_col = col
-        if col_lower in ['longitude', 'lon', 'lng'] and lon_col is None:
-            lon_col = col
-    
-    if not lat_col or not lon_col:
-        return 0
-    
-    # Filter valid coordinates
-    valid_df = df.dropna(subset=[lat_col, lon_col])
-    if valid_df.empty:
-        return 0
-    
+    """Count nearby disasters within radius.
+
+    Accepts a prebuilt SpatialIndex (fast path used by the routes) or a
+    DataFrame, which is indexed on the fly.
+    """
+    if not isinstance(df, SpatialIndex):
+        if df.empty:
+            return 0
+        lat_col, lon_col = find_lat_lon_columns(df)
+        if not lat_col or not lon_col:
+            return 0
+        try:
+            df = SpatialIndex.from_dataframe(df)
+        except Exception:
+            return 0
+
     try:
-        # Calculate distances and count within radius
-        distances = valid_df.apply(
-            lambda r: haversine(lat, lon, r[lat_col], r[lon_col]), 
-            axis=1
-        )
-        return int((distances <= radius_km).sum())
+        return df.count_within(lat, lon, radius_km)
     except Exception:
         return 0
 
+def run_prediction_stages(lat, lng, radius_km=100, current=None, radii=None):
+    """Run per-hazard inference and nearby counts on the stage pool.
+    With radii, each count stage returns the counts for every radius (same order)."""
+    current = current or predictor
+
+    def infer(hazard):
+        def run():
+            model = current.model(hazard)
+            with STAGE_SECONDS.time(stage="build_model_input", target=hazard):
+                model_input = build_model_input(model, lat, lng, current)
+            with STAGE_SECONDS.time(stage="safe_predict_proba", target=hazard):
+                return safe_predict_proba(model, model_input)
+        return run
+
+    def count(hazard):
+        def run():
+            with STAGE_SECONDS.time(stage="count_nearby", target=hazard):
+                if radii:
+                    return current.count_nearby_radii(hazard, lat, lng, radii)
+                return current.count_nearby(hazard, lat, lng, radius_km=radius_km)
+        return run
+
+    return stage_pipeline.run([
+        ("earthquake_model", infer("earthquake")),
+        ("flood_model", infer("flood")),
+        ("wildfire_model", infer("wildfire")),
+        ("earthquake_count", count("earthquake")),
+        ("flood_count", count("flood")),
+        ("wildfire_count", count("wildfire")),
+    ])
+
+MAX_RADII = 20
+MAX_RADIUS_KM = 20038  # half the Earth's circumference
+
+def parse_radii(value):
+    """Radii (km) from a JSON list or a comma-separated string, deduplicated in order.
+    Returns (radii, error)."""
+    if value is None or value == "" or value == []:
+        return None, None
+    if isinstance(value, str):
+        value = [v for v in value.split(",") if v.strip()]
+    elif not isinstance(value, list):
+        value = [value]
+    radii = []
+    for v in value:
+        try:
+            if isinstance(v, bool):
+                raise ValueError
+            r = float(v)
+        except (TypeError, ValueError):
+            return None, f"Invalid radius: {v!r}"
+        if not 0 < r <= MAX_RADIUS_KM:
+            return None, f"Radius must be between 0 and {MAX_RADIUS_KM} km"
+        if r not in radii:
+            radii.append(r)
+    if len(radii) > MAX_RADII:
+        return None, f"Too many radii (max {MAX_RADII})"
+    return radii or None, None
+
 def validate_coordinates(lat, lng):
     """Validate latitude and longitude are within valid ranges"""
     if not isinstance(lat, (int, float)) or not isinstance(lng, (int, float)):
@@ -127,46 +341,22 @@ def validate_coordinates(lat, lng):
     return True, None
 
 def safe_predict_proba(model, input_df):
-    """Safely get prediction probability from model"""
+    """Safely get prediction probability (0-100) of the first row from model"""
     try:
-        # Check if model has predict_proba
-        if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(input_df)
-            # Handle different return formats
-            if isinstance(proba, np.ndarray):
-                if proba.shape[1] > 1:
-                    return proba[0][1] * 100  # Probability of class 1
-                else:
-                    return proba[0][0] * 100
-            elif isinstance(proba, list):
-                if len(proba) > 0 and isinstance(proba[0], (list, np.ndarray)):
-                    if len(proba[0]) > 1:
-                        return proba[0][1] * 100
-                    else:
-                        return proba[0][0] * 100
-                return proba[0] * 100 if isinstance(proba[0], (int, float)) else 50.0
-        else:
-            # If no predict_proba, use predict and convert to probability estimate
-            pred = model.predict(input_df)
-            if isinstance(pred, (list, np.ndarray)):
-                pred_val = pred[0] if len(pred) > 0 else 0
-            else:
-                pred_val = pred
-            # Convert binary prediction to probability estimate
-            return 85.0 if pred_val == 1 else 15.0
+        return float(class_probabilities(model, input_df)[0])
+    except Exception as e:
+        raise Exception(f"Prediction error: {str(e)}")
+
+def safe_predict_proba_batch(model, input_df):
+    """Get class-1 probabilities (0-100) for every row with a single model call"""
+    try:
+        return class_probabilities(model, input_df)
     except Exception as e:
         raise Exception(f"Prediction error: {str(e)}")
 
 def get_risk_level(probability):
     """Categorize risk level based on probability"""
-    if probability >= 70:
-        return "High", "High risk - Take immediate precautions"
-    elif probability >= 40:
-        return "Medium", "Moderate risk - Stay alert"
-    elif probability >= 10:
-        return "Low", "Low risk - Minimal concern"
-    else:
-        return "Very Low", "Very low risk - Safe area"
+    return risk_level(probability)
 
 def get_location_info(lat, lng):
     """Get additional location information"""
@@ -178,99 +368,129 @@ def get_location_info(lat, lng):
     }
 
 def send_notification(phone_number, message_text):
+    """Queue an alert for background delivery; never blocks on the network"""
     try:
-        if _TWILIO_AVAILABLE:
-            account_sid = os.getenv('TWILIO_ACCOUNT_SID')
-            auth_token = os.getenv('TWILIO_AUTH_TOKEN')
-            from_number = os.getenv('TWILIO_FROM')
-            if account_sid and auth_token and from_number:
-                client = Client(account_sid, auth_token)
-                client.messages.create(
-                    to=str(phone_number),
-                    from_=from_number,
-                    body=message_text
-                )
-                return True
-    except Exception as _e:
-        pass
-    try:
-        app.logger.info(f"Notify {phone_number}: {message_text}")
-    except Exception:
-        print(f"Notify {phone_number}: {message_text}")
-    return False
+        return alert_dispatcher.submit(phone_number, message_text)
+    except Exception as e:
+        app.logger.warning(f"Could not queue alert for {phone_number}: {e}")
+        return False
 
 # Build input matching model's expected features
-def build_model_input(model, lat, lng):
-    feat_names = getattr(model, 'feature_names_in_', None)
-    # Defaults
-    eq_magnitude = 5.0
-    eq_depth = 10.0
+def build_model_input(model, lat, lng, current=None):
+    """Single-row feature matrix for model, filled from its compiled plan"""
+    return (current or predictor).feature_plans.get(model).row(lat, lng)
+
+def build_model_matrix(model, lats, lngs, current=None):
+    """Build one input row per (lat, lng) pair matching the model's features"""
+    return (current or predictor).feature_plans.get(model).fill(lats, lngs)
+
+def build_prediction_response(lat, lng, earthquake_prob, flood_prob, wildfire_prob,
+                              eq_count, flood_count, wildfire_count):
+    """Assemble the per-point response shared by /predict and /predict/batch"""
+    # Ensure probabilities are in valid range
+    earthquake_prob = max(0.0, min(100.0, earthquake_prob))
+    flood_prob = max(0.0, min(100.0, flood_prob))
+    wildfire_prob = max(0.0, min(100.0, wildfire_prob))
+
+    # Get risk levels and recommendations
     try:
-        if not earthquakes_df.empty and 'magnitude' in earthquakes_df.columns:
-            eq_magnitude = float(earthquakes_df['magnitude'].mean())
-        if not earthquakes_df.empty and 'depth' in earthquakes_df.columns:
-            eq_depth = float(earthquakes_df['depth'].mean())
-    except Exception:
-        pass
+        eq_level, eq_message = get_risk_level(earthquake_prob)
+    except Exception as e:
+        app.logger.warning(f"Error getting earthquake risk level: {e}")
+        eq_level, eq_message = "Unknown", "Unable to assess risk"
 
-    flood_rainfall = 100.0
     try:
-        if not floods_df.empty:
-            if 'rainfall' in floods_df.columns:
-                flood_rainfall = float(floods_df['rainfall'].mean())
-            elif 'Rainfall' in floods_df.columns:
-                flood_rainfall = float(floods_df['Rainfall'].mean())
-            elif 'FloodProbability' in floods_df.columns:
-                flood_rainfall = float(floods_df['FloodProbability'].mean() * 2)
-    except Exception:
-        pass
+        flood_level, flood_message = get_risk_level(flood_prob)
+    except Exception as e:
+        app.logger.warning(f"Error getting flood risk level: {e}")
+        flood_level, flood_message = "Unknown", "Unable to assess risk"
 
-    avg_fires = 50000.0
     try:
-        if not wildfires_df.empty:
-            fires_col = None
-            for c in wildfires_df.columns:
-                if c.lower() == 'fires':
-                    fires_col = c; break
-            if fires_col:
-                fires_series = pd.to_numeric(wildfires_df[fires_col].astype(str).str.replace(',', ''), errors='coerce')
-                val = fires_series.mean()
-                if pd.notna(val):
-                    avg_fires = float(val)
-    except Exception:
-        pass
+        fire_level, fire_message = get_risk_level(wildfire_prob)
+    except Exception as e:
+        app.logger.warning(f"Error getting wildfire risk level: {e}")
+        fire_level, fire_message = "Unknown", "Unable to assess risk"
 
-    # If model doesn't specify feature names, default to lat/lon
-    if feat_names is None:
-        return pd.DataFrame([[lat, lng]], columns=['lat', 'lon'])
-
-    # Construct row matching expected features
-    row = []
-    for name in feat_names:
-        n = str(name)
-        n_low = n.lower()
-        if n_low in ('lat', 'latitude'):
-            row.append(lat)
-        elif n_low in ('lon', 'lng', 'longitude'):
-            row.append(lng)
-        elif n_low == 'magnitude':
-            row.append(eq_magnitude)
-        elif n_low == 'depth':
-            row.append(eq_depth)
-        elif n_low == 'rainfall':
-            row.append(flood_rainfall)
-        elif n_low == 'fires':
-            row.append(avg_fires)
-        else:
-            # Unknown extra feature: use 0.0
-            row.append(0.0)
+    # Calculate overall risk
     try:
-        return pd.DataFrame([row], columns=list(feat_names))
-    except Exception:
-        # Fallback to lat/lon only
-        return pd.DataFrame([[lat, lng]], columns=['lat', 'lon'])
+        max_risk = max(earthquake_prob, flood_prob, wildfire_prob)
+        overall_level, overall_message = get_risk_level(max_risk)
+    except Exception as e:
+        app.logger.warning(f"Error calculating overall risk: {e}")
+        max_risk = max(earthquake_prob, flood_prob, wildfire_prob)
+        overall_level, overall_message = "Unknown", "Unable to assess overall risk"
+
+    # Get location info
+    location_info = get_location_info(lat, lng)
+
+    # Validate all probabilities before creating response
+    try:
+        eq_prob_float = round(float(earthquake_prob), 2)
+        flood_prob_float = round(float(flood_prob), 2)
+        fire_prob_float = round(float(wildfire_prob), 2)
+        max_risk_float = round(float(max_risk), 2)
+    except (ValueError, TypeError) as e:
+        app.logger.error(f"Error converting probabilities to float: {e}")
+        raise ValueError("Internal error: Invalid probability values")
+
+    # Ensure all required fields exist
+    if not all([eq_level, flood_level, fire_level]):
+        app.logger.error(f"Missing risk levels: eq={eq_level}, flood={flood_level}, fire={fire_level}")
+
+    response = {
+        "earthquake": {
+            "probability": eq_prob_float,
+            "level": eq_level,
+            "message": eq_message or "Risk assessment available"
+        },
+        "flood": {
+            "probability": flood_prob_float,
+            "level": flood_level,
+            "message": flood_message or "Risk assessment available"
+        },
+        "wildfire": {
+            "probability": fire_prob_float,
+            "level": fire_level,
+            "message": fire_message or "Risk assessment available"
+        },
+        "overall": {
+            "risk_level": overall_level or "Unknown",
+            "max_probability": max_risk_float,
+            "message": overall_message or "Risk assessment complete"
+        },
+        "counts": {
+            "earthquake": int(eq_count),
+            "flood": int(flood_count),
+            "wildfire": int(wildfire_count)
+        },
+        "location": location_info or {},
+        "timestamp": datetime.now().isoformat()
+    }
+    return response
 
 # --- Routes ---
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+    model_reloader.ensure_started()
+    event_ingestor.ensure_started()
+
+@app.after_request
+def _record_request_metrics(response):
+    try:
+        if STARTUP["first_request_ms"] is None:
+            STARTUP["first_request_ms"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 2)
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUESTS_TOTAL.inc(endpoint=endpoint, method=request.method, status=str(response.status_code))
+        if response.status_code >= 500:
+            ERRORS_TOTAL.inc(endpoint=endpoint)
+        start = getattr(g, "request_start", None)
+        if start is not None:
+            REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+    except Exception:
+        pass
+    return response
+
 # Handle CORS preflight requests
 @app.route('/predict', methods=['OPTIONS'])
 def predict_options():
@@ -283,6 +503,7 @@ def predict():
     Supports both GET (query params lat,lng) and POST (JSON with latitude, longitude).
     """
     try:
+        parse_start = time.perf_counter()
         # Extract coordinates from request
         lat = None
         lng = None
@@ -291,9 +512,11 @@ def predict():
             data = request.get_json(silent=True) or {}
             lat = data.get("latitude") or data.get("lat")
             lng = data.get("longitude") or data.get("lng")
+            radii = data.get("radii")
         else:
             lat = request.args.get('lat', type=float)
             lng = request.args.get('lng', type=float)
+            radii = ",".join(request.args.getlist('radii'))
 
         # Validate inputs
         if lat is None or lng is None:
@@ -311,72 +534,56 @@ def predict():
         if not valid:
             return jsonify({"error": error_msg}), 400
 
-        # Prepare model inputs dynamically to match each model's expected features
-        eq_input = build_model_input(earthquake_model, lat, lng)
-        flood_input = build_model_input(flood_model, lat, lng)
-        wildfire_input = build_model_input(wildfire_model, lat, lng)
-
-        # Make predictions
-        try:
-            earthquake_prob = safe_predict_proba(earthquake_model, eq_input)
-        except Exception as e:
-            app.logger.error(f"Earthquake prediction error: {str(e)}\n{traceback.format_exc()}")
-            return jsonify({"error": f"Earthquake model error: {str(e)}"}), 500
-
-        try:
-            flood_prob = safe_predict_proba(flood_model, flood_input)
-        except Exception as e:
-            app.logger.error(f"Flood prediction error: {str(e)}\n{traceback.format_exc()}")
-            return jsonify({"error": f"Flood model error: {str(e)}"}), 500
-
-        try:
-            wildfire_prob = safe_predict_proba(wildfire_model, wildfire_input)
-        except Exception as e:
-            app.logger.error(f"Wildfire prediction error: {str(e)}\n{traceback.format_exc()}")
-            return jsonify({"error": f"Wildfire model error: {str(e)}"}), 500
-
-        # Calculate nearby counts
-        eq_count = count_nearby(earthquakes_df, lat, lng, radius_km=100)
-        flood_count = count_nearby(floods_df, lat, lng, radius_km=100)
-        wildfire_count = count_nearby(wildfires_df, lat, lng, radius_km=100)
+        # Extra count radii (km); the 100 km counts come from the same distance pass
+        radii, error_msg = parse_radii(radii)
+        if error_msg:
+            return jsonify({"error": error_msg}), 400
+        count_radii = radii + [100.0] if radii and 100.0 not in radii else radii
+        STAGE_SECONDS.observe(time.perf_counter() - parse_start, stage="parse_request", target="predict")
+
+        # The whole request uses one predictor, even if a reload swaps it meanwhile
+        current = predictor
+        cache_key = prediction_cache.key(lat, lng, current.version, tuple(radii or ()))
+        cached = prediction_cache.get(cache_key)
+        stages = None
+        counts_by_radius = None
+        if cached is not None:
+            (earthquake_prob, flood_prob, wildfire_prob,
+             eq_count, flood_count, wildfire_count, counts_by_radius) = cached
+        else:
+            # Inference and nearby counts are independent, so run them concurrently
+            stages = run_prediction_stages(lat, lng, current=current, radii=count_radii)
+            for hazard, label in (("earthquake", "Earthquake"), ("flood", "Flood"), ("wildfire", "Wildfire")):
+                result = stages[f"{hazard}_model"]
+                if not result.ok:
+                    app.logger.error(f"{label} prediction error: {str(result.error)}\n{result.traceback}")
+                    return jsonify({"error": f"{label} model error: {str(result.error)}"}), 500
+
+            earthquake_prob = stages["earthquake_model"].value
+            flood_prob = stages["flood_model"].value
+            wildfire_prob = stages["wildfire_model"].value
+            eq_count = stages["earthquake_count"].value
+            flood_count = stages["flood_count"].value
+            wildfire_count = stages["wildfire_count"].value
+            if radii:
+                by_radius = {hazard: dict(zip(count_radii, stages[f"{hazard}_count"].value))
+                             for hazard in ("earthquake", "flood", "wildfire")}
+                counts_by_radius = {hazard: {f"{r:g}": by_radius[hazard][r] for r in radii}
+                                    for hazard in by_radius}
+                eq_count = by_radius["earthquake"][100.0]
+                flood_count = by_radius["flood"][100.0]
+                wildfire_count = by_radius["wildfire"][100.0]
+            prediction_cache.put(cache_key, (earthquake_prob, flood_prob, wildfire_prob,
+                                             eq_count, flood_count, wildfire_count, counts_by_radius))
 
         # Ensure probabilities are in valid range
         earthquake_prob = max(0.0, min(100.0, earthquake_prob))
         flood_prob = max(0.0, min(100.0, flood_prob))
         wildfire_prob = max(0.0, min(100.0, wildfire_prob))
-
-        # Get risk levels and recommendations
-        try:
-            eq_level, eq_message = get_risk_level(earthquake_prob)
-        except Exception as e:
-            app.logger.warning(f"Error getting earthquake risk level: {e}")
-            eq_level, eq_message = "Unknown", "Unable to assess risk"
-        
-        try:
-            flood_level, flood_message = get_risk_level(flood_prob)
-        except Exception as e:
-            app.logger.warning(f"Error getting flood risk level: {e}")
-            flood_level, flood_message = "Unknown", "Unable to assess risk"
-        
-        try:
-            fire_level, fire_message = get_risk_level(wildfire_prob)
-        except Exception as e:
-            app.logger.warning(f"Error getting wildfire risk level: {e}")
-            fire_level, fire_message = "Unknown", "Unable to assess risk"
-
-        # Calculate overall risk
-        try:
-            max_risk = max(earthquake_prob, flood_prob, wildfire_prob)
-            overall_level, overall_message = get_risk_level(max_risk)
-        except Exception as e:
-            app.logger.warning(f"Error calculating overall risk: {e}")
-            max_risk = max(earthquake_prob, flood_prob, wildfire_prob)
-            overall_level, overall_message = "Unknown", "Unable to assess overall risk"
-
-        # Get location info
-        location_info = get_location_info(lat, lng)
+        max_risk = max(earthquake_prob, flood_prob, wildfire_prob)
 
         # Auto-notify if high risk
+        notify_start = time.perf_counter()
         try:
             risk_values = {
                 'earthquake': float(earthquake_prob),
@@ -384,7 +591,7 @@ def predict():
                 'wildfire': float(wildfire_prob)
             }
             top_risk_type = max(risk_values, key=risk_values.get)
-            if max_risk >= 70:
+            if max_risk >= 70 and alert_suppressor.should_send(top_risk_type, lat, lng):
                 send_notification(
                     phone_number='1945',
                     message_text=(
@@ -394,60 +601,155 @@ def predict():
                 )
         except Exception:
             pass
+        STAGE_SECONDS.observe(time.perf_counter() - notify_start, stage="notification", target="predict")
 
-        # Validate all probabilities before creating response
         try:
-            eq_prob_float = round(float(earthquake_prob), 2)
-            flood_prob_float = round(float(flood_prob), 2)
-            fire_prob_float = round(float(wildfire_prob), 2)
-            max_risk_float = round(float(max_risk), 2)
-        except (ValueError, TypeError) as e:
-            app.logger.error(f"Error converting probabilities to float: {e}")
-            return jsonify({"error": "Internal error: Invalid probability values"}), 500
-        
-        # Ensure all required fields exist
-        if not all([eq_level, flood_level, fire_level]):
-            app.logger.error(f"Missing risk levels: eq={eq_level}, flood={flood_level}, fire={fire_level}")
-        
-        response = {
-            "earthquake": {
-                "probability": eq_prob_float,
-                "level": eq_level,
-                "message": eq_message or "Risk assessment available"
-            },
-            "flood": {
-                "probability": flood_prob_float,
-                "level": flood_level,
-                "message": flood_message or "Risk assessment available"
-            },
-            "wildfire": {
-                "probability": fire_prob_float,
-                "level": fire_level,
-                "message": fire_message or "Risk assessment available"
-            },
-            "overall": {
-                "risk_level": overall_level or "Unknown",
-                "max_probability": max_risk_float,
-                "message": overall_message or "Risk assessment complete"
-            },
-            "counts": {
-                "earthquake": int(eq_count) if not pd.isna(eq_count) else 0,
-                "flood": int(flood_count) if not pd.isna(flood_count) else 0,
-                "wildfire": int(wildfire_count) if not pd.isna(wildfire_count) else 0
-            },
-            "location": location_info or {},
-            "timestamp": datetime.now().isoformat()
-        }
+            response = build_prediction_response(
+                lat, lng, earthquake_prob, flood_prob, wildfire_prob,
+                eq_count, flood_count, wildfire_count
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 500
+        if counts_by_radius is not None:
+            response["counts_by_radius"] = counts_by_radius
+        response["cached"] = stages is None
+        response["version"] = current.version
+        if stages is not None:
+            response["timings_ms"] = {name: round(r.elapsed_ms, 3) for name, r in stages.items()}
 
         # Log successful prediction (optional, for debugging)
-        app.logger.debug(f"Prediction successful for {lat}, {lng}: EQ={eq_prob_float}%, Flood={flood_prob_float}%, Fire={fire_prob_float}%")
+        app.logger.debug(
+            f"Prediction successful for {lat}, {lng}: EQ={response['earthquake']['probability']}%, "
+            f"Flood={response['flood']['probability']}%, Fire={response['wildfire']['probability']}%"
+        )
         
-        return jsonify(response)
+        with STAGE_SECONDS.time(stage="serialize", target="predict"):
+            return jsonify(response)
 
     except Exception as e:
         app.logger.error(f"Unexpected error in predict: {str(e)}\n{traceback.format_exc()}")
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
+BATCH_MAX_POINTS = int(os.getenv('BATCH_MAX_POINTS', '10000'))
+
+def parse_batch_points(data):
+    """Extract (lat, lng) pairs from a batch request body.
+
+    Accepts {"points": [{"latitude": .., "longitude": ..}, ...]} or
+    {"points": [[lat, lng], ...]} ("coordinates" is accepted as an alias),
+    or the array of points itself as the body.
+    Returns (points, errors) where errors maps point index -> message.
+    """
+    if isinstance(data, list):
+        raw_points = data
+    elif isinstance(data, dict):
+        raw_points = data.get("points")
+        if raw_points is None:
+            raw_points = data.get("coordinates")
+    else:
+        raw_points = None
+    if not isinstance(raw_points, list):
+        raise ValueError("Request body must contain a 'points' array")
+
+    points = []
+    errors = {}
+    for i, item in enumerate(raw_points):
+        if isinstance(item, dict):
+            lat = item.get("latitude", item.get("lat"))
+            lng = item.get("longitude", item.get("lng"))
+        elif isinstance(item, (list, tuple)) and len(item) == 2:
+            lat, lng = item
+        else:
+            lat = lng = None
+
+        if lat is None or lng is None:
+            errors[i] = "Missing latitude or longitude"
+            points.append(None)
+            continue
+        try:
+            lat = float(lat)
+            lng = float(lng)
+        except (TypeError, ValueError):
+            errors[i] = "Invalid latitude/longitude format"
+            points.append(None)
+            continue
+        valid, error_msg = validate_coordinates(lat, lng)
+        if not valid:
+            errors[i] = error_msg
+            points.append(None)
+            continue
+        points.append((lat, lng))
+    return points, errors
+
+@app.route('/predict/batch', methods=['OPTIONS'])
+def predict_batch_options():
+    return '', 200
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """
+    Predict disaster probabilities for many coordinates at once.
+    Each model is called once on a feature matrix holding every valid point,
+    and nearby counts are computed for all points together. Results keep
+    the order of the request; invalid points get an "error" entry instead.
+    Alerts are not sent for batch scoring.
+    """
+    try:
+        parse_start = time.perf_counter()
+        data = request.get_json(silent=True)
+        try:
+            points, errors = parse_batch_points(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if len(points) > BATCH_MAX_POINTS:
+            return jsonify({"error": f"Too many points (max {BATCH_MAX_POINTS})"}), 400
+
+        valid_idx = [i for i, p in enumerate(points) if p is not None]
+        lats = np.array([points[i][0] for i in valid_idx], dtype=float)
+        lngs = np.array([points[i][1] for i in valid_idx], dtype=float)
+
+        results = [{"error": errors[i]} if i in errors else None for i in range(len(points))]
+        STAGE_SECONDS.observe(time.perf_counter() - parse_start, stage="parse_request", target="predict_batch")
+        current = predictor
+        if valid_idx:
+            probs = {}
+            for hazard, label in (("earthquake", "Earthquake"),
+                                  ("flood", "Flood"),
+                                  ("wildfire", "Wildfire")):
+                try:
+                    model = current.model(hazard)
+                    with STAGE_SECONDS.time(stage="build_model_matrix", target=hazard):
+                        model_input = build_model_matrix(model, lats, lngs, current)
+                    with STAGE_SECONDS.time(stage="safe_predict_proba_batch", target=hazard):
+                        probs[hazard] = safe_predict_proba_batch(model, model_input)
+                except Exception as e:
+                    app.logger.error(f"{label} prediction error: {str(e)}\n{traceback.format_exc()}")
+                    return jsonify({"error": f"{label} model error: {str(e)}"}), 500
+            eq_probs, flood_probs, fire_probs = probs["earthquake"], probs["flood"], probs["wildfire"]
+
+            counts = {}
+            for hazard in ("earthquake", "flood", "wildfire"):
+                with STAGE_SECONDS.time(stage="count_within_many", target=hazard):
+                    counts[hazard] = current.count_nearby_many(hazard, lats, lngs, 100)
+            eq_counts, flood_counts, fire_counts = counts["earthquake"], counts["flood"], counts["wildfire"]
+
+            for j, i in enumerate(valid_idx):
+                try:
+                    results[i] = build_prediction_response(
+                        float(lats[j]), float(lngs[j]), eq_probs[j], flood_probs[j], fire_probs[j],
+                        eq_counts[j], flood_counts[j], fire_counts[j]
+                    )
+                except ValueError as e:
+                    results[i] = {"error": str(e)}
+
+        with STAGE_SECONDS.time(stage="serialize", target="predict_batch"):
+            return jsonify({"count": len(results), "version": current.version, "results": results})
+
+    except Exception as e:
+        app.logger.error(f"Unexpected error in predict_batch: {str(e)}\n{traceback.format_exc()}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
 # Route to serve the main HTML page
 @app.route('/')
 def index():
@@ -471,25 +773,98 @@ def index():
 # Health check endpoint
 @app.route('/health', methods=['GET'])
 def health():
-    return jsonify({"status": "healthy", "models_loaded": True})
+    current = predictor
+    return jsonify({
+        "status": "healthy",
+        "models_loaded": all(current.loader.is_loaded(h) for h in current.hazards),
+        "version": current.version,
+        "reload_in_progress": model_reloader.in_progress
+    })
+
+def _admin_denied():
+    """403 response unless the request has the admin token (or, without ADMIN_TOKEN, is local)"""
+    if ADMIN_TOKEN:
+        if request.headers.get('X-Admin-Token') != ADMIN_TOKEN:
+            return jsonify({"error": "Invalid or missing X-Admin-Token"}), 403
+    elif request.remote_addr not in ('127.0.0.1', '::1'):
+        return jsonify({"error": "Set ADMIN_TOKEN to allow remote requests"}), 403
+    return None
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """
+    Reload models and catalogs from disk without a restart.
+    Runs in the background (202) unless ?wait=1, which returns the outcome.
+    Needs the X-Admin-Token header when ADMIN_TOKEN is set, else a local client.
+    """
+    denied = _admin_denied()
+    if denied:
+        return denied
+
+    if request.args.get('wait') in ('1', 'true'):
+        result = model_reloader.reload("admin endpoint")
+        return jsonify(result), 200 if result["reloaded"] else 500
+    started = model_reloader.reload_async("admin endpoint")
+    return jsonify({
+        "status": "reloading" if started else "already reloading",
+        "version": predictor.version
+    }), 202
+
+@app.route('/ingest', methods=['POST'])
+def ingest_events():
+    """
+    Append new events to a hazard catalog (?hazard=earthquake, or "hazard" in the body).
+    Body: JSON list of events, {"events": [...]} or a GeoJSON FeatureCollection of points.
+    Nearby counts include the accepted events from the next request on.
+    """
+    denied = _admin_denied()
+    if denied:
+        return denied
+    data = request.get_json(silent=True)
+    if data is None:
+        return jsonify({"error": "Request body must be JSON"}), 400
+    hazard = request.args.get('hazard') or (data.get('hazard') if isinstance(data, dict) else None)
+    if not hazard:
+        return jsonify({"error": "Missing hazard (earthquake, flood, ...)"}), 400
+    try:
+        events = parse_events(data)
+        if len(events) > INGEST_MAX_EVENTS:
+            return jsonify({"error": f"Too many events (max {INGEST_MAX_EVENTS})"}), 400
+        result = event_ingestor.submit(hazard.strip().lower(), events)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except OSError as e:
+        app.logger.error(f"Could not save ingested events: {e}")
+        return jsonify({"error": f"Events were applied but could not be saved to {INGEST_DIR}: {e}"}), 500
+    return jsonify(result), 200 if result["accepted"] or not result["rejected"] else 400
+
+# Prometheus metrics endpoint
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Request/stage latency histograms, request and error counts, cache and alert stats"""
+    return Response(metrics_registry.render(), mimetype="text/plain; version=0.0.4")
 
 # Statistics endpoint
 @app.route('/stats', methods=['GET'])
 def stats():
     """Get dataset statistics"""
+    current = predictor
+    catalogs = current.catalog_stats()
     stats_data = {
-        "earthquakes": {
-            "total_records": len(earthquakes_df),
-            "columns": list(earthquakes_df.columns) if not earthquakes_df.empty else []
-        },
-        "floods": {
-            "total_records": len(floods_df),
-            "columns": list(floods_df.columns) if not floods_df.empty else []
+        "earthquakes": catalogs["earthquake"],
+        "floods": catalogs["flood"],
+        "wildfires": catalogs["wildfire"],
+        "feature_defaults": {
+            "version": current.feature_defaults.current.version,
+            "values": dict(current.feature_defaults.current.values)
         },
-        "wildfires": {
-            "total_records": len(wildfires_df),
-            "columns": list(wildfires_df.columns) if not wildfires_df.empty else []
-        }
+        "version": current.version,
+        "startup": dict(STARTUP, model_loading=current.loader.stats()),
+        "reload": model_reloader.stats(),
+        "ingest": event_ingestor.stats(),
+        "prediction_cache": prediction_cache.stats(),
+        "alerts": alert_dispatcher.stats(),
+        "alert_suppression": alert_suppressor.stats()
     }
     return jsonify(stats_data)
 
@@ -497,10 +872,10 @@ if __name__ == '__main__':
     print("\n" + "="*50)
     print("DisasterScope API Server Starting...")
     print("="*50)
-    print(f"Models directory: {model_dir}")
-    print(f"Earthquake data: {len(earthquakes_df)} records")
-    print(f"Flood data: {len(floods_df)} records")
-    print(f"Wildfire data: {len(wildfires_df)} records")
+    print(f"Models directory: {predictor.loader.model_dir}")
+    print(f"Earthquake data: {len(predictor.catalogs['earthquake'])} records")
+    print(f"Flood data: {len(predictor.catalogs['flood'])} records")
+    print(f"Wildfire data: {len(predictor.catalogs['wildfire'])} records")
     print("="*50)
     
     # Check if port is available
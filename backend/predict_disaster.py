@@ -1,40 +1,29 @@
-import pickle
-import pandas as pd
 import os
+import sys
 
-# Paths
-model_dir = "backend/models"
-flood_model_path = os.path.join(model_dir, "flood_model.pkl")
-earth_model_path = os.path.join(model_dir, "earthquake_model.pkl")
-fire_model_path = os.path.join(model_dir, "wildfire_model.pkl")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from predictor import default_predictor
 
-# Load models
-flood_model = pickle.load(open(flood_model_path, "rb"))
-earth_model = pickle.load(open(earth_model_path, "rb"))
-fire_model = pickle.load(open(fire_model_path, "rb"))
+# Models (from the repository's models/ directory) load on first use, so a
+# call only pays for the hazards it asks about
+predictor = default_predictor()
 
 def predict_disaster(lat, lon, rainfall=None, seismic=None, fires=None):
     results = {}
     
     # Flood Prediction
     if rainfall is not None:
-        flood_df = pd.DataFrame([[lat, lon, rainfall]], columns=['latitude', 'longitude', 'rainfall'])
-        flood_prob = flood_model.predict_proba(flood_df)[0][1]
-        results["Flood Risk"] = round(flood_prob * 100, 2)
+        flood_prob = predictor.probability("flood", lat, lon, rainfall=rainfall)
+        results["Flood Risk"] = round(flood_prob, 2)
     
-    # Earthquake Prediction
+    # Earthquake Prediction (the seismic index feeds the model's magnitude feature)
     if seismic is not None:
-        earth_df = pd.DataFrame([[lat, lon, seismic]], columns=['latitude', 'longitude', 'seismic_index'])
-        earth_prob = earth_model.predict_proba(earth_df)[0][1]
-        results["Earthquake Risk"] = round(earth_prob * 100, 2)
+        earth_prob = predictor.probability("earthquake", lat, lon, magnitude=seismic)
+        results["Earthquake Risk"] = round(earth_prob, 2)
     
     # Wildfire Prediction
     if fires is not None:
-        fire_df = pd.DataFrame([[fires]], columns=['Fires'])
-        fire_prob = fire_model.predict_proba(fire_df)[0][1]
-        results["Wildfire Risk"] = round(fire_prob * 100, 2)
+        fire_prob = predictor.probability("wildfire", lat, lon, fires=fires)
+        results["Wildfire Risk"] = round(fire_prob, 2)
     
     return results
-
-
-
@@ -0,0 +1,226 @@
+"""
+Microbenchmarks for the prediction hot path.
+
+Runs offline against app.py with synthetic event catalogs and times:
+  - haversine
+  - count_nearby (1k / 100k / 1M event catalogs by default)
+  - build_model_input and safe_predict_proba for each model
+  - a full /predict through the Flask test client
+
+Results are written as JSON. Pass --baseline to compare against an earlier
+run; any benchmark whose median got slower than --threshold is reported as
+a regression and the script exits with status 1.
+
+Usage:
+    python bench_hotpath.py                                  # run, write benchmark_results.json
+    python bench_hotpath.py --save-baseline                  # also store as benchmark_baseline.json
+    python bench_hotpath.py --baseline benchmark_baseline.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+os.environ.setdefault("ALERT_TRANSPORT", "log")
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+ANALYST_RADII_KM = [10, 50, 100, 250, 500]
+
+
+def synthetic_catalog(n, seed=0, with_magnitude=False):
+    """n events spread uniformly over the globe"""
+    rng = np.random.default_rng(seed)
+    data = {
+        "latitude": np.degrees(np.arcsin(rng.uniform(-1, 1, n))),
+        "longitude": rng.uniform(-180, 180, n),
+    }
+    if with_magnitude:
+        data["magnitude"] = rng.uniform(4, 8, n).round(1)
+        data["depth"] = rng.uniform(0, 600, n).round(1)
+    return pd.DataFrame(data)
+
+
+def query_points(n, seed=1):
+    rng = np.random.default_rng(seed)
+    lats = np.degrees(np.arcsin(rng.uniform(-1, 1, n)))
+    lngs = rng.uniform(-180, 180, n)
+    return list(zip(lats.tolist(), lngs.tolist()))
+
+
+def measure(fn, args_list, min_time=0.2, max_runs=5000):
+    """Call fn(*args) cycling through args_list; return timing stats in microseconds"""
+    for args in args_list[:3]:
+        fn(*args)  # warm-up
+    samples = []
+    start = time.perf_counter()
+    i = 0
+    while (time.perf_counter() - start < min_time or len(samples) < 5) and len(samples) < max_runs:
+        args = args_list[i % len(args_list)]
+        t0 = time.perf_counter_ns()
+        fn(*args)
+        samples.append((time.perf_counter_ns() - t0) / 1000)
+        i += 1
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "median_us": round(statistics.median(samples), 3),
+        "mean_us": round(statistics.fmean(samples), 3),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_us": round(samples[0], 3),
+    }
+
+
+def run_benchmarks(sizes, min_time):
+    # Run from the repository like the server does
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    import app
+    from spatial_index import SpatialIndex
+
+    results = {}
+    points = query_points(256)
+
+    def record(name, stats):
+        results[name] = stats
+        print(f"  {name:<45} median {stats['median_us']:>12.2f} us   p95 {stats['p95_us']:>12.2f} us")
+
+    print("Benchmarking helpers...")
+    pairs = [(a, b, c, d) for (a, b), (c, d) in zip(points, points[1:])]
+    record("haversine", measure(app.haversine, pairs, min_time))
+
+    models = {
+        "earthquake": app.earthquake_model,
+        "flood": app.flood_model,
+        "wildfire": app.wildfire_model,
+    }
+    for hazard, model in models.items():
+        record(f"build_model_input[{hazard}]",
+               measure(lambda lat, lng, m=model: app.build_model_input(m, lat, lng), points, min_time))
+        inputs = [(app.build_model_input(model, lat, lng),) for lat, lng in points[:32]]
+        record(f"safe_predict_proba[{hazard}]",
+               measure(lambda x, m=model: app.safe_predict_proba(m, x), inputs, min_time))
+
+    # Swap synthetic catalogs into the app for the count and end-to-end runs
+    indexes = app.predictor.indexes
+    saved = dict(indexes)
+    saved_cache_size = app.prediction_cache.maxsize
+    app.prediction_cache.maxsize = 0  # every /predict must do the full work
+    client = app.app.test_client()
+    try:
+        for n in sizes:
+            print(f"Benchmarking with {n:,} events per catalog...")
+            catalog = synthetic_catalog(n, seed=n, with_magnitude=True)
+            t0 = time.perf_counter()
+            index = SpatialIndex.from_dataframe(catalog)
+            build_ms = (time.perf_counter() - t0) * 1000
+            results[f"spatial_index_build[{n}]"] = {"runs": 1, "median_us": round(build_ms * 1000, 3),
+                                                    "mean_us": round(build_ms * 1000, 3),
+                                                    "p95_us": round(build_ms * 1000, 3),
+                                                    "min_us": round(build_ms * 1000, 3)}
+            print(f"  {'spatial_index_build[' + str(n) + ']':<45} {build_ms:>12.2f} ms")
+
+            record(f"count_nearby[{n}]",
+                   measure(lambda lat, lng: app.count_nearby(index, lat, lng, radius_km=100), points, min_time))
+            record(f"count_within_radii[{n}]",
+                   measure(lambda lat, lng: index.count_within_radii(lat, lng, ANALYST_RADII_KM), points, min_time))
+
+            indexes["earthquake"] = index
+            indexes["flood"] = SpatialIndex.from_dataframe(synthetic_catalog(n, seed=n + 1))
+            indexes["wildfire"] = SpatialIndex.from_dataframe(synthetic_catalog(n, seed=n + 2))
+            record(f"predict_endpoint[{n}]",
+                   measure(lambda lat, lng: client.get(f"/predict?lat={lat}&lng={lng}"), points, min_time))
+    finally:
+        indexes.update(saved)
+        app.prediction_cache.maxsize = saved_cache_size
+
+    return results
+
+
+def environment_info():
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+    try:
+        import sklearn
+        info["sklearn"] = sklearn.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def compare(results, baseline, threshold):
+    """Return [(name, baseline_us, current_us, change)] for regressed benchmarks"""
+    regressions = []
+    print("\nComparison against baseline (median):")
+    for name, stats in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            print(f"  {name:<45} (no baseline)")
+            continue
+        change = stats["median_us"] / base["median_us"] - 1 if base["median_us"] else 0.0
+        flag = "REGRESSION" if change > threshold else ("faster" if change < -threshold else "ok")
+        print(f"  {name:<45} {base['median_us']:>12.2f} -> {stats['median_us']:>12.2f} us  {change:+7.1%}  {flag}")
+        if change > threshold:
+            regressions.append((name, base["median_us"], stats["median_us"], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the DisasterScope prediction hot path")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Synthetic catalog sizes (events per catalog)")
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="Minimum seconds spent timing each benchmark")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed median slowdown before flagging a regression (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Also write the results to benchmark_baseline.json")
+    args = parser.parse_args(argv)
+    args.output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath("benchmark_baseline.json")
+    if args.baseline:
+        args.baseline = os.path.abspath(args.baseline)
+
+    print("=" * 60)
+    print("DisasterScope Benchmarks")
+    print("=" * 60)
+    results = run_benchmarks(args.sizes, args.min_time)
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "environment": environment_info(),
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    if args.save_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return 1
+        print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
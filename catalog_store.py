@@ -0,0 +1,285 @@
+"""
+Binary, memory-mapped event catalogs.
+
+Parsing the CSV catalogs with pandas at import time made cold start and
+resident memory grow with catalog size. convert_csv() writes each catalog
+once to a columnar file: a small JSON header followed by one float32 array
+per numeric column. load_catalog() maps those arrays with np.memmap, so
+opening a catalog costs a header read and pages are only touched when a
+column is used (and are shared between forked workers). The CSV is read
+only when the binary file is missing or older than the CSV it came from.
+
+File layout (little-endian):
+    8 bytes   magic b"DSCATLG1"
+    4 bytes   uint32 header length
+    N bytes   JSON header: format version, row count, columns with byte
+              offsets, and the source CSV's size/mtime for staleness checks
+    ...       float32 columns, each starting on a 64-byte boundary
+
+Usage:
+    python catalog_store.py              # convert the default catalogs
+    python catalog_store.py --check      # report which binaries are stale
+    python catalog_store.py floods.csv   # convert specific files
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+MAGIC = b"DSCATLG1"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+DTYPE = np.dtype("<f4")
+EXTENSION = ".catalog"
+
+DEFAULT_CATALOGS = ["earthquakes.csv", "floods.csv", "wildfires.csv"]
+
+
+def binary_path(csv_path):
+    """earthquakes.csv -> earthquakes.catalog"""
+    return os.path.splitext(csv_path)[0] + EXTENSION
+
+
+def _source_info(csv_path):
+    st = os.stat(csv_path)
+    return {"path": os.path.basename(csv_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _align(n):
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _numeric_columns(df, dtype=DTYPE):
+    """Yield (name, array of dtype) for every column that holds numbers"""
+    import pandas as pd
+
+    for name in df.columns:
+        col = df[name]
+        if pd.api.types.is_bool_dtype(col):
+            continue
+        if not pd.api.types.is_numeric_dtype(col):
+            # Counts like "50,000" are stored as text
+            parsed = pd.to_numeric(col.astype(str).str.replace(',', ''), errors='coerce')
+            if parsed.isna().sum() > col.isna().sum():
+                continue  # not a numeric column
+            col = parsed
+        yield str(name), np.asarray(col, dtype=dtype)
+
+
+def write_catalog(path, columns, nrows, source=None):
+    """Write {name: array} as a catalog file, atomically"""
+    meta_columns = []
+    offset = 0
+    for name in columns:
+        meta_columns.append({"name": name, "offset": offset})
+        offset += _align(nrows * DTYPE.itemsize)
+
+    header = {"version": FORMAT_VERSION, "rows": nrows, "dtype": DTYPE.str,
+              "columns": meta_columns, "source": source}
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _align(len(MAGIC) + 4 + len(header_bytes))
+
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(header_bytes)))
+            f.write(header_bytes)
+            for meta in meta_columns:
+                f.seek(data_start + meta["offset"])
+                f.write(np.ascontiguousarray(columns[meta["name"]], dtype=DTYPE).tobytes())
+            f.truncate(data_start + offset)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def convert_csv(csv_path, out_path=None):
+    """Convert one CSV catalog; returns the binary path"""
+    import pandas as pd
+
+    out_path = out_path or binary_path(csv_path)
+    df = pd.read_csv(csv_path)
+    columns = dict(_numeric_columns(df))
+    write_catalog(out_path, columns, len(df), source=_source_info(csv_path))
+    return out_path
+
+
+def read_header(path):
+    """Return (header dict, byte offset of the first column)"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a catalog file")
+        (length,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(length).decode("utf-8"))
+    if header.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported catalog version {header.get('version')}")
+    return header, _align(len(MAGIC) + 4 + length)
+
+
+def is_stale(path, csv_path):
+    """True if the binary is missing, unreadable, or older than its CSV"""
+    try:
+        header, _ = read_header(path)
+    except (OSError, ValueError):
+        return True
+    if not os.path.exists(csv_path):
+        return False  # the binary is all we have
+    source = header.get("source") or {}
+    current = _source_info(csv_path)
+    return source.get("size") != current["size"] or source.get("mtime_ns") != current["mtime_ns"]
+
+
+class EventCatalog:
+    """Read-only columnar catalog.
+
+    Offers the parts of the DataFrame interface the server uses (empty,
+    columns, len(), catalog[column]) so it can stand in for the DataFrames
+    loaded from CSV. Columns opened from a binary file are memory-mapped
+    float32 arrays; a catalog built from a DataFrame (the CSV fallback) keeps
+    float64, the values pandas parsed, and appended rows take the dtype of
+    the column they extend.
+    """
+
+    def __init__(self, columns, nrows, source="memory", path=None, pending=()):
+        self._columns = dict(columns)
+        self._nrows = nrows
+        # Appended (columns, nrows) chunks, kept apart until compacted()
+        self._pending = tuple(pending)
+        self._pending_rows = sum(n for _, n in self._pending)
+        self._merged = {}
+        self.source = source
+        self.path = path
+
+    @classmethod
+    def open(cls, path):
+        header, data_start = read_header(path)
+        nrows = header["rows"]
+        columns = {}
+        for meta in header["columns"]:
+            if nrows:
+                arr = np.memmap(path, dtype=DTYPE, mode="r", offset=data_start + meta["offset"], shape=(nrows,))
+            else:
+                arr = np.empty(0, dtype=DTYPE)
+            columns[meta["name"]] = arr
+        return cls(columns, nrows, source="binary", path=path)
+
+    @classmethod
+    def from_dataframe(cls, df, source="csv"):
+        return cls(dict(_numeric_columns(df, np.float64)), len(df), source=source)
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def empty(self):
+        return len(self) == 0 or not self._columns
+
+    def __len__(self):
+        return self._nrows + self._pending_rows
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __getitem__(self, name):
+        column = self._columns[name]
+        if not self._pending:
+            return column
+        merged = self._merged.get(name)
+        if merged is None:
+            merged = self._merged[name] = np.concatenate([column] + [chunk[name] for chunk, _ in self._pending])
+        return merged
+
+    @property
+    def nbytes(self):
+        buffered = [arr for chunk, _ in self._pending for arr in chunk.values()]
+        return sum(arr.nbytes for arr in list(self._columns.values()) + buffered)
+
+    @property
+    def pending(self):
+        """Appended (columns, nrows) chunks not yet merged into the columns"""
+        return self._pending
+
+    @property
+    def pending_rows(self):
+        return self._pending_rows
+
+    def appended(self, columns, nrows):
+        """New catalog with nrows more rows; columns missing from `columns` get NaN.
+
+        The existing columns are shared, not copied (memory-mapped ones stay
+        mapped); the new rows go to an append buffer that compacted() merges.
+        """
+        base = self._columns or {name: np.full(self._nrows, np.nan) for name in columns}
+        chunk = {name: np.asarray(columns[name] if name in columns else np.full(nrows, np.nan),
+                                  dtype=base[name].dtype)
+                 for name in base}
+        return EventCatalog(base, self._nrows, source=self.source, path=self.path,
+                            pending=self._pending + ((chunk, nrows),))
+
+    def compacted(self):
+        """Catalog with the append buffer merged into in-memory columns"""
+        if not self._pending:
+            return self
+        return EventCatalog({name: self[name] for name in self._columns}, len(self), source=self.source,
+                            path=self.path)
+
+    def to_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame({name: np.asarray(self[name]) for name in self._columns})
+
+    def __repr__(self):
+        return f"<EventCatalog {self.path or ''} rows={len(self)} columns={self.columns} source={self.source}>"
+
+
+def load_catalog(csv_path, convert=False):
+    """Open the binary form of csv_path, falling back to parsing the CSV.
+
+    With convert=True a missing or stale binary is rewritten from the CSV
+    so the next start is fast.
+    """
+    path = binary_path(csv_path)
+    if not is_stale(path, csv_path):
+        return EventCatalog.open(path)
+    if convert:
+        try:
+            return EventCatalog.open(convert_csv(csv_path, path))
+        except OSError:
+            pass  # read-only checkout: just use the CSV
+    import pandas as pd
+    return EventCatalog.from_dataframe(pd.read_csv(csv_path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert CSV event catalogs to memory-mapped binaries")
+    parser.add_argument("files", nargs="*", default=DEFAULT_CATALOGS, help="CSV catalogs to convert")
+    parser.add_argument("--check", action="store_true", help="Only report whether binaries are up to date")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for csv_path in args.files:
+        path = binary_path(csv_path)
+        if args.check:
+            status = "stale" if is_stale(path, csv_path) else "up to date"
+            print(f"{'❌' if status == 'stale' else '✅'} {path}: {status}")
+            failed += status == "stale"
+            continue
+        try:
+            convert_csv(csv_path, path)
+            header, _ = read_header(path)
+            names = [c["name"] for c in header["columns"]]
+            print(f"✅ {csv_path} -> {path} ({header['rows']} rows, columns {names})")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {csv_path}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
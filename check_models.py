@@ -1,11 +1,12 @@
 """
 Diagnostic script to check what features the models actually expect
 """
-import pickle
 import os
 import pandas as pd
+from model_loader import ModelLoader
 
 model_dir = "models"
+models = ModelLoader(model_dir, lazy=True)
 
 print("=" * 60)
 print("🔍 Checking Model Feature Requirements")
@@ -14,7 +15,7 @@ print("=" * 60)
 # Check earthquake model
 try:
     print("\n1. EARTHQUAKE MODEL:")
-    eq_model = pickle.load(open(os.path.join(model_dir, "earthquake_model.pkl"), "rb"))
+    eq_model = models.get("earthquake")
     print(f"   Model type: {type(eq_model)}")
     
     # Try to get feature names
@@ -52,7 +53,7 @@ except Exception as e:
 # Check flood model
 try:
     print("\n2. FLOOD MODEL:")
-    flood_model = pickle.load(open(os.path.join(model_dir, "flood_model.pkl"), "rb"))
+    flood_model = models.get("flood")
     print(f"   Model type: {type(flood_model)}")
     
     if hasattr(flood_model, 'feature_names_in_'):
@@ -81,7 +82,7 @@ except Exception as e:
 # Check wildfire model
 try:
     print("\n3. WILDFIRE MODEL:")
-    fire_model = pickle.load(open(os.path.join(model_dir, "wildfire_model.pkl"), "rb"))
+    fire_model = models.get("wildfire")
     print(f"   Model type: {type(fire_model)}")
     
     if hasattr(fire_model, 'feature_names_in_'):
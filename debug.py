@@ -3,9 +3,11 @@ Comprehensive debugging tool for DisasterScope
 Run this to diagnose issues before starting the server
 """
 import os
+import subprocess
 import sys
-import pickle
+import time
 import pandas as pd
+from model_loader import HAZARDS, ModelLoader
 
 def check_models():
     """Check if all models exist and can be loaded"""
@@ -14,19 +16,20 @@ def check_models():
     print("="*60)
     
     model_dir = "models"
-    required_models = ["earthquake_model.pkl", "flood_model.pkl", "wildfire_model.pkl"]
+    loader = ModelLoader(model_dir, lazy=True)
     all_ok = True
     
-    for model_file in required_models:
-        model_path = os.path.join(model_dir, model_file)
+    for hazard in HAZARDS:
+        model_path = loader.paths[hazard]
+        model_file = os.path.basename(model_path)
         if not os.path.exists(model_path):
             print(f"❌ {model_file} NOT FOUND at {model_path}")
             all_ok = False
         else:
             try:
-                with open(model_path, "rb") as f:
-                    model = pickle.load(f)
-                print(f"✅ {model_file} loaded successfully (type: {type(model).__name__})")
+                model = loader.get(hazard)
+                print(f"✅ {model_file} loaded successfully in {loader.load_ms[hazard]} ms "
+                      f"(type: {type(model).__name__})")
             except Exception as e:
                 print(f"❌ {model_file} FAILED to load: {str(e)}")
                 all_ok = False
@@ -82,6 +85,58 @@ def check_dependencies():
     
     return all_ok
 
+def import_time_report(module="app", top=15):
+    """Import `module` in a fresh interpreter with -X importtime.
+
+    Returns (total_ms, [(cumulative_ms, self_ms, name)]) for the module's
+    direct imports, slowest first.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed")
+
+    total_ms = None
+    direct = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part for part in line.replace("import time:", "|", 1).split("|"))
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        name = name.strip()
+        if depth == 0 and name == module:
+            total_ms = int(cumulative_us) / 1000
+        elif depth == 1:
+            direct.append((int(cumulative_us) / 1000, int(self_us) / 1000, name))
+    direct.sort(reverse=True)
+    return total_ms, direct[:top]
+
+def check_import_time():
+    """Report how long importing app.py takes and which imports dominate"""
+    print("\n" + "="*60)
+    print("🔍 CHECKING IMPORT TIME")
+    print("="*60)
+    
+    budget_ms = float(os.getenv("IMPORT_TIME_BUDGET_MS", "5000"))
+    try:
+        total_ms, slowest = import_time_report("app")
+    except Exception as e:
+        print(f"❌ Importing app FAILED: {str(e)}")
+        return False
+    
+    for cumulative_ms, self_ms, name in slowest:
+        print(f"   {cumulative_ms:9.1f} ms  (self {self_ms:7.1f} ms)  {name}")
+    if total_ms is None:
+        print("❌ No import timing recorded for app")
+        return False
+    if total_ms > budget_ms:
+        print(f"❌ import app took {total_ms:.1f} ms (budget {budget_ms:.0f} ms, IMPORT_TIME_BUDGET_MS)")
+        return False
+    print(f"✅ import app took {total_ms:.1f} ms (budget {budget_ms:.0f} ms)")
+    return True
+
 def test_prediction():
     """Test a sample prediction"""
     print("\n" + "="*60)
@@ -94,10 +149,13 @@ def test_prediction():
         floods_df = pd.read_csv("floods.csv")
         wildfires_df = pd.read_csv("wildfires.csv")
         
-        # Load models
-        earthquake_model = pickle.load(open(os.path.join(model_dir, "earthquake_model.pkl"), "rb"))
-        flood_model = pickle.load(open(os.path.join(model_dir, "flood_model.pkl"), "rb"))
-        wildfire_model = pickle.load(open(os.path.join(model_dir, "wildfire_model.pkl"), "rb"))
+        # Load models (in parallel)
+        start = time.perf_counter()
+        models = ModelLoader(model_dir).load_all(parallel=True)
+        print(f"✅ Models loaded in {(time.perf_counter() - start) * 1000:.1f} ms")
+        earthquake_model = models["earthquake"]
+        flood_model = models["flood"]
+        wildfire_model = models["wildfire"]
         
         # Test coordinates
         lat, lng = 20.59, 78.96
@@ -144,7 +202,8 @@ def main():
         "dependencies": check_dependencies(),
         "csv_files": check_csv_files(),
         "models": check_models(),
-        "predictions": test_prediction()
+        "predictions": test_prediction(),
+        "import_time": check_import_time()
     }
     
     print("\n" + "="*60)
@@ -165,5 +224,7 @@ def main():
         return 1
 
 if __name__ == "__main__":
+    if "--import-time" in sys.argv:
+        sys.exit(0 if check_import_time() else 1)
     sys.exit(main())
 
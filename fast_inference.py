@@ -0,0 +1,246 @@
+"""
+Fast inference paths for the fitted hazard models.
+
+sklearn's predict_proba has a large fixed cost per call (input validation,
+joblib dispatch over trees) compared with the work of scoring one point.
+The engines here copy what the fitted models need into flat NumPy arrays
+once, then score single rows and batches directly.
+
+get_engine(model) returns a cached engine, or None when the model type has
+no fast path; predict_proba(model, X) picks the engine when there is one and
+the batch is small enough, and model.predict_proba otherwise.
+"""
+import os
+import threading
+import weakref
+
+import numpy as np
+
+FAST_INFERENCE = os.getenv('FAST_INFERENCE', '1') != '0'
+# Above this many rows sklearn's multi-threaded Cython tree walk wins
+FAST_INFERENCE_MAX_ROWS = int(os.getenv('FAST_INFERENCE_MAX_ROWS', '2048'))
+
+
+class CompiledForest:
+    """Decision-tree ensemble flattened into contiguous node arrays.
+
+    All trees share one set of arrays, offset by each tree's root. Leaves
+    point to themselves, so every row can take the same fixed number of
+    steps (the deepest tree's depth) through a vectorized traversal.
+    """
+
+    def __init__(self, feature, threshold, left, right, values, roots, max_depth,
+                 n_features, classes):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        # children[2 * node] is the left child, children[2 * node + 1] the right
+        self.children = np.stack([left, right], axis=1).ravel()
+        self.values = values
+        self.roots = roots
+        self.max_depth = max_depth
+        self.n_features = n_features
+        self.classes_ = classes
+        self.max_rows = FAST_INFERENCE_MAX_ROWS
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Flatten a fitted forest (or single decision tree) classifier"""
+        estimators = getattr(model, 'estimators_', None)
+        if estimators is None:
+            estimators = [model]
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Multi-output forests are not supported")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for est in estimators:
+            tree = est.tree_
+            n = tree.node_count
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(n) + offset
+
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.intp)
+            threshold = np.where(is_leaf, np.inf, tree.threshold).astype(np.float64)
+            left = np.where(is_leaf, node_ids, tree.children_left + offset).astype(np.intp)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset).astype(np.intp)
+
+            # Same normalisation as DecisionTreeClassifier.predict_proba
+            value = np.array(tree.value[:, 0, :], dtype=np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            value /= normalizer
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(value)
+            roots.append(offset)
+            max_depth = max(max_depth, int(tree.max_depth))
+            offset += n
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts),
+            right=np.concatenate(rights),
+            values=np.concatenate(values),
+            roots=np.array(roots, dtype=np.intp),
+            max_depth=max_depth,
+            n_features=int(model.n_features_in_),
+            classes=np.asarray(model.classes_),
+        )
+
+    def predict_proba(self, X, chunk_rows=4096):
+        """Class probabilities for every row of X, matching sklearn"""
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but the model is expecting {self.n_features} features"
+            )
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+        X = X.astype(np.float64)
+
+        n_trees = len(self.roots)
+        n_classes = self.values.shape[1]
+        out = np.empty((X.shape[0], n_classes), dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_rows):
+            Xc = X[start:start + chunk_rows]
+            flat = Xc.ravel()
+            row_base = (np.arange(Xc.shape[0]) * self.n_features)[:, None]
+            node = np.broadcast_to(self.roots, (Xc.shape[0], n_trees)).copy()
+            for _ in range(self.max_depth):
+                x = np.take(flat, row_base + np.take(self.feature, node))
+                go_right = x > np.take(self.threshold, node)
+                node = np.take(self.children, 2 * node + go_right)
+            for c in range(n_classes):
+                out[start:start + chunk_rows, c] = np.take(self.values[:, c], node).sum(axis=1) / n_trees
+        return out
+
+
+class FusedLogistic:
+    """Binary logistic regression with any leading StandardScaler steps folded in.
+
+    ((x - mean) / scale) @ coef + intercept is rewritten as
+    x @ (coef / scale) + (intercept - (mean / scale) @ coef), so scoring is a
+    single dot product followed by the same expit sklearn uses.
+    """
+
+    def __init__(self, weights, bias, n_features, classes):
+        # scipy is already loaded by the time a fitted model exists; importing
+        # here keeps it off the import path of modules that only import us
+        from scipy.special import expit
+        self._expit = expit
+        self.weights = weights
+        self.bias = bias
+        self.n_features = n_features
+        self.classes_ = classes
+        self.max_rows = None
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Fuse a fitted LogisticRegression or Pipeline(StandardScaler..., LogisticRegression)"""
+        steps = [model]
+        if type(model).__name__ == 'Pipeline':
+            steps = [step for _, step in model.steps if step not in (None, 'passthrough')]
+        *scalers, logreg = steps
+        if type(logreg).__name__ != 'LogisticRegression':
+            raise ValueError("Final step must be a LogisticRegression")
+        if logreg.coef_.shape[0] != 1 or len(logreg.classes_) != 2:
+            raise ValueError("Only binary logistic regression is supported")
+
+        n_features = logreg.coef_.shape[1]
+        # Affine map x -> x * scale_in + shift_in accumulated over the scalers
+        scale_in = np.ones(n_features)
+        shift_in = np.zeros(n_features)
+        for scaler in scalers:
+            if type(scaler).__name__ != 'StandardScaler':
+                raise ValueError(f"Unsupported pipeline step: {type(scaler).__name__}")
+            # mean_ is fitted even with with_mean=False, but transform doesn't center then
+            mean = scaler.mean_ if scaler.with_mean and scaler.mean_ is not None else np.zeros(n_features)
+            scale = scaler.scale_ if scaler.with_std and scaler.scale_ is not None else np.ones(n_features)
+            scale_in = scale_in / scale
+            shift_in = (shift_in - mean) / scale
+
+        coef = np.asarray(logreg.coef_[0], dtype=np.float64)
+        intercept = float(logreg.intercept_[0])
+        if getattr(logreg, 'multi_class', None) == 'multinomial':
+            # sklearn scores a binary multinomial model as softmax([-d, d]) = expit(2d)
+            coef, intercept = 2 * coef, 2 * intercept
+        weights = coef * scale_in
+        bias = float(intercept + shift_in @ coef)
+        return cls(weights, bias, n_features, np.asarray(logreg.classes_))
+
+    def predict_proba(self, X):
+        """Class probabilities for every row of X, matching sklearn"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but the model is expecting {self.n_features} features"
+            )
+        if not np.isfinite(X).all():
+            raise ValueError("Input contains NaN or infinity")
+        p1 = self._expit(X @ self.weights + self.bias)
+        return np.column_stack([1 - p1, p1])
+
+
+_ENGINE_BUILDERS = {
+    'RandomForestClassifier': CompiledForest.from_sklearn,
+    'ExtraTreesClassifier': CompiledForest.from_sklearn,
+    'DecisionTreeClassifier': CompiledForest.from_sklearn,
+    'ExtraTreeClassifier': CompiledForest.from_sklearn,
+    'LogisticRegression': FusedLogistic.from_sklearn,
+    'Pipeline': FusedLogistic.from_sklearn,
+}
+
+_engines = weakref.WeakKeyDictionary()
+_engines_lock = threading.Lock()
+
+
+def build_engine(model):
+    """Build a fast engine for model, or return None if unsupported"""
+    builder = _ENGINE_BUILDERS.get(type(model).__name__)
+    if builder is None:
+        return None
+    try:
+        return builder(model)
+    except Exception:
+        return None
+
+
+def get_engine(model):
+    """Cached fast engine for model (None when unsupported or disabled)"""
+    if not FAST_INFERENCE:
+        return None
+    try:
+        return _engines[model]
+    except KeyError:
+        pass
+    except TypeError:
+        # Not weak-referenceable; build without caching
+        return build_engine(model)
+    engine = build_engine(model)
+    with _engines_lock:
+        _engines[model] = engine
+    return engine
+
+
+def predict_proba(model, X):
+    """model.predict_proba(X), served by the fast engine where it applies"""
+    engine = get_engine(model)
+    if engine is not None and (engine.max_rows is None or len(X) <= engine.max_rows):
+        try:
+            return engine.predict_proba(X)
+        except ValueError:
+            # Inputs the engine rejects (NaN, wrong width) get sklearn's handling
+            pass
+    return model.predict_proba(X)
@@ -0,0 +1,169 @@
+"""
+Dataset-derived default feature values.
+
+The models expect features such as magnitude, depth, rainfall and fires
+that a map click doesn't provide, so they are filled with catalog averages.
+Those averages only change when the catalogs change, so they are computed
+once per data version and shared read-only by every request; events
+ingested later update them from running sums and counts.
+"""
+import hashlib
+import os
+import threading
+from types import MappingProxyType
+
+import numpy as np
+
+# Fallbacks used when a catalog is missing or lacks the column
+BUILTIN_DEFAULTS = {
+    'magnitude': 5.0,
+    'depth': 10.0,
+    'rainfall': 100.0,
+    'fires': 50000.0,
+}
+
+
+def data_version(paths):
+    """Version string for a set of data files, based on size and mtime"""
+    h = hashlib.sha1()
+    for path in paths:
+        try:
+            st = os.stat(path)
+            h.update(f"{path}:{st.st_size}:{st.st_mtime_ns};".encode())
+        except OSError:
+            h.update(f"{path}:missing;".encode())
+    return h.hexdigest()[:12]
+
+
+def _moments(values):
+    """(sum, count) of the non-NaN values; counts stored as text ("50,000") are parsed"""
+    if getattr(values, 'dtype', None) == object:
+        import pandas as pd
+        values = pd.to_numeric(pd.Series(values).astype(str).str.replace(',', ''), errors='coerce')
+    values = np.asarray(values, dtype=float)
+    return float(np.nansum(values)), int(np.count_nonzero(~np.isnan(values)))
+
+
+def _columns(df):
+    return list(df.columns) if not df.empty else []
+
+
+def feature_sources(columns):
+    """feature -> (hazard, catalog column, scale) for the defaults the catalogs can provide.
+
+    columns maps each hazard to its catalog's column names.
+    """
+    sources = {}
+    for feature in ('magnitude', 'depth'):
+        if feature in columns.get('earthquake', ()):
+            sources[feature] = ('earthquake', feature, 1.0)
+    for column, scale in (('rainfall', 1.0), ('Rainfall', 1.0), ('FloodProbability', 2.0)):
+        if column in columns.get('flood', ()):
+            sources['rainfall'] = ('flood', column, scale)
+            break
+    for column in columns.get('wildfire', ()):
+        if str(column).lower() == 'fires':
+            sources['fires'] = ('wildfire', column, 1.0)
+            break
+    return sources
+
+
+def _defaults(sources, moments):
+    """Means (times the source's scale) of the sourced features; built-in fallbacks otherwise"""
+    values = dict(BUILTIN_DEFAULTS)
+    for feature, (_, _, scale) in sources.items():
+        total, count = moments.get(feature, (0.0, 0))
+        # A column that is entirely NaN keeps the built-in fallback
+        if count:
+            values[feature] = total / count * scale
+    return values
+
+
+def _catalog_moments(sources, catalogs):
+    moments = {}
+    for feature, (hazard, column, _) in sources.items():
+        try:
+            moments[feature] = _moments(catalogs[hazard][column])
+        except Exception:
+            pass
+    return moments
+
+
+def compute_feature_defaults(earthquakes_df, floods_df, wildfires_df):
+    """Compute default feature values from the loaded catalogs"""
+    catalogs = {'earthquake': earthquakes_df, 'flood': floods_df, 'wildfire': wildfires_df}
+    sources = feature_sources({hazard: _columns(df) for hazard, df in catalogs.items()})
+    return _defaults(sources, _catalog_moments(sources, catalogs))
+
+
+class FeatureDefaults:
+    """Immutable snapshot of default feature values for one data version"""
+
+    __slots__ = ('version', 'values')
+
+    def __init__(self, version, values):
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'values', MappingProxyType(dict(values)))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FeatureDefaults is read-only")
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def get(self, name, default=None):
+        return self.values.get(name, default)
+
+    def __repr__(self):
+        return f"FeatureDefaults(version={self.version!r}, values={dict(self.values)!r})"
+
+
+class FeatureDefaultsStore:
+    """Holds the current FeatureDefaults and recomputes them on data changes.
+
+    The sum and count behind each mean are kept, so rows appended to a
+    catalog (extend()) update the defaults without rereading the catalog.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = FeatureDefaults(None, BUILTIN_DEFAULTS)
+        self._columns = {'earthquake': [], 'flood': [], 'wildfire': []}
+        self._sources = {}
+        self._moments = {}
+
+    @property
+    def current(self):
+        return self._current
+
+    def refresh(self, version, earthquakes_df, floods_df, wildfires_df):
+        """Recompute defaults if version differs from the stored one"""
+        with self._lock:
+            if self._current.version == version and version is not None:
+                return self._current
+            catalogs = {'earthquake': earthquakes_df, 'flood': floods_df, 'wildfire': wildfires_df}
+            self._columns = {hazard: _columns(df) for hazard, df in catalogs.items()}
+            self._sources = feature_sources(self._columns)
+            self._moments = _catalog_moments(self._sources, catalogs)
+            self._current = FeatureDefaults(version, _defaults(self._sources, self._moments))
+            return self._current
+
+    def extend(self, version, hazard, columns):
+        """Add rows appended to hazard's catalog (catalog column -> array) to the defaults"""
+        with self._lock:
+            if not self._columns.get(hazard):
+                # The first rows of an empty catalog define its columns
+                self._columns = dict(self._columns, **{hazard: list(columns)})
+                self._sources = feature_sources(self._columns)
+            moments = dict(self._moments)
+            for feature, (source, column, _) in self._sources.items():
+                if source == hazard and column in columns:
+                    total, count = moments.get(feature, (0.0, 0))
+                    try:
+                        extra_total, extra_count = _moments(columns[column])
+                    except Exception:
+                        continue
+                    moments[feature] = (total + extra_total, count + extra_count)
+            self._moments = moments
+            self._current = FeatureDefaults(version, _defaults(self._sources, moments))
+            return self._current
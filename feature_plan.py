@@ -0,0 +1,106 @@
+"""
+Compiled per-model feature plans.
+
+A plan records, once per model, which input slot takes the latitude, which
+takes the longitude and which constant goes in every other slot, so the
+request path just copies a template row and writes the coordinates in.
+"""
+import threading
+
+import numpy as np
+
+LAT_NAMES = ('lat', 'latitude')
+LON_NAMES = ('lon', 'lng', 'longitude')
+
+SOURCE_LAT = 'lat'
+SOURCE_LON = 'lon'
+SOURCE_CONST = 'const'
+
+
+class FeaturePlan:
+    """Column order, slot sources and constant fills for one model"""
+
+    def __init__(self, columns, sources, template, defaults_version=None):
+        self.columns = tuple(columns)
+        self.sources = tuple(sources)
+        self.template = np.asarray(template, dtype=np.float64)
+        self.template.setflags(write=False)
+        self.lat_slots = np.array([i for i, s in enumerate(sources) if s == SOURCE_LAT], dtype=np.intp)
+        self.lon_slots = np.array([i for i, s in enumerate(sources) if s == SOURCE_LON], dtype=np.intp)
+        self.defaults_version = defaults_version
+
+    @classmethod
+    def compile(cls, model, defaults):
+        """Build the plan for a fitted model from its feature_names_in_"""
+        feat_names = getattr(model, 'feature_names_in_', None)
+        if feat_names is None:
+            # No recorded feature names: the model was fitted on lat/lon
+            return cls(['lat', 'lon'], [SOURCE_LAT, SOURCE_LON], [0.0, 0.0], defaults.version)
+
+        sources = []
+        template = []
+        for name in feat_names:
+            n_low = str(name).lower()
+            if n_low in LAT_NAMES:
+                sources.append(SOURCE_LAT)
+                template.append(0.0)
+            elif n_low in LON_NAMES:
+                sources.append(SOURCE_LON)
+                template.append(0.0)
+            else:
+                # Dataset-derived default, or 0.0 for unknown extra features
+                sources.append(SOURCE_CONST)
+                template.append(float(defaults.get(n_low, 0.0)))
+        return cls([str(n) for n in feat_names], sources, template, defaults.version)
+
+    def fill(self, lats, lngs, out=None):
+        """Return an (n, n_features) float64 matrix for the given points"""
+        lats = np.asarray(lats, dtype=np.float64).reshape(-1)
+        lngs = np.asarray(lngs, dtype=np.float64).reshape(-1)
+        n = len(lats)
+        if out is None:
+            out = np.empty((n, len(self.columns)), dtype=np.float64)
+        out[:] = self.template
+        if len(self.lat_slots):
+            out[:, self.lat_slots] = lats[:, None]
+        if len(self.lon_slots):
+            out[:, self.lon_slots] = lngs[:, None]
+        return out
+
+    def row(self, lat, lng):
+        """Return a (1, n_features) matrix for a single point"""
+        out = self.template.copy().reshape(1, -1)
+        out[0, self.lat_slots] = lat
+        out[0, self.lon_slots] = lng
+        return out
+
+    def slots(self, name):
+        """Input slots of the feature called name (case-insensitive)"""
+        name = name.lower()
+        return np.array([i for i, c in enumerate(self.columns) if c.lower() == name], dtype=np.intp)
+
+    def describe(self):
+        return [
+            {"column": c, "source": s, "value": None if s != SOURCE_CONST else float(v)}
+            for c, s, v in zip(self.columns, self.sources, self.template)
+        ]
+
+
+class FeaturePlanRegistry:
+    """Compiled plans per model, recompiled when the feature defaults change"""
+
+    def __init__(self, defaults_store):
+        self._defaults_store = defaults_store
+        self._plans = {}
+        self._lock = threading.Lock()
+
+    def get(self, model):
+        defaults = self._defaults_store.current
+        entry = self._plans.get(id(model))
+        if entry is not None and entry[0] is model and entry[1].defaults_version == defaults.version:
+            return entry[1]
+        plan = FeaturePlan.compile(model, defaults)
+        with self._lock:
+            # Keep a reference to the model so its id can't be reused
+            self._plans[id(model)] = (model, plan)
+        return plan
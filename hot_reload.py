@@ -0,0 +1,165 @@
+"""
+Hot reload of the models and event catalogs.
+
+After retraining (new .pkl/.joblib files in models/) or editing a catalog,
+the server used to need a restart, dropping in-flight requests and paying
+the full cold start. ModelReloader builds a fresh predictor in a background
+thread, loads and warms it, and only then hands it to the app, which swaps
+it in with a single assignment. Requests that already took a reference to
+the old predictor finish on it; new requests see the new version. If
+anything fails while building, the old predictor stays in service.
+
+Reloads are triggered by a polling file watcher (stdlib only) or by calling
+reload()/reload_async(), e.g. from an admin endpoint. The watcher waits until
+the changed files are unchanged for one more poll, so a file that is still
+being written is not loaded half-way.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from catalog_store import binary_path
+from model_loader import model_filename
+
+
+def watched_files(predictor):
+    """Model files (pickle and joblib) and catalogs (CSV and binary) a predictor was built from"""
+    paths = []
+    for hazard in predictor.hazards:
+        for ext in (".pkl", ".joblib"):
+            paths.append(os.path.join(predictor.loader.model_dir, model_filename(hazard, ext)))
+    for csv_path in predictor.catalog_paths.values():
+        paths += [csv_path, binary_path(csv_path)]
+    return paths
+
+
+def file_state(paths):
+    """(size, mtime_ns) per path, None for missing files"""
+    state = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            state[path] = (st.st_size, st.st_mtime_ns)
+        except OSError:
+            state[path] = None
+    return state
+
+
+class ModelReloader:
+    """Builds, warms and swaps in new predictors on file changes or on request.
+
+    build() returns a ready predictor (raising if it can't be built) and
+    on_swap(predictor) installs it. The watcher thread starts on first use
+    and is restarted automatically in a forked child process.
+    """
+
+    def __init__(self, build, on_swap, current, interval=5.0, logger=None):
+        self.build = build
+        self.on_swap = on_swap
+        self.interval = interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.version = current.version
+        self._paths = watched_files(current)
+        self._baseline = file_state(self._paths)
+        self._reload_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.reloads = 0
+        self.failures = 0
+        self.last_reload = None
+        self.last_reload_ms = None
+        self.last_error = None
+        self._reset_thread()
+
+    def _reset_thread(self):
+        self._pid = os.getpid()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def in_progress(self):
+        return self._reload_lock.locked()
+
+    def ensure_started(self):
+        """Start the file watcher (no-op when interval is 0 or it is running)"""
+        if self._pid != os.getpid():
+            # Forked: the parent's watcher thread doesn't exist here
+            self._reset_thread()
+        if self.interval <= 0 or self._thread is not None or self._stopping.is_set():
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._watch, name="model-reload-watcher", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+
+    def reload(self, reason="manual"):
+        """Build, warm and swap in a new predictor; returns a result dict"""
+        with self._reload_lock:
+            # Files changed while building are picked up by the next poll
+            state = file_state(self._paths)
+            start = time.perf_counter()
+            try:
+                predictor = self.build()
+            except Exception as e:
+                with self._stats_lock:
+                    self.failures += 1
+                    self.last_error = f"{type(e).__name__}: {e}"
+                    self._baseline = state
+                self.logger.error(f"Reload ({reason}) failed, keeping version {self.version}: {e}")
+                return {"reloaded": False, "version": self.version, "error": self.last_error}
+            previous = self.version
+            self.on_swap(predictor)
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 2)
+            with self._stats_lock:
+                self.version = predictor.version
+                self._paths = watched_files(predictor)
+                self._baseline = state
+                self.reloads += 1
+                self.last_reload = datetime.now().isoformat()
+                self.last_reload_ms = elapsed_ms
+                self.last_error = None
+            self.logger.info(f"Reload ({reason}): {previous} -> {self.version} in {elapsed_ms} ms")
+            return {"reloaded": True, "version": self.version, "previous_version": previous,
+                    "elapsed_ms": elapsed_ms}
+
+    def reload_async(self, reason="manual"):
+        """Start reload() in a background thread; False if a reload is already running"""
+        if self.in_progress:
+            return False
+        threading.Thread(target=self.reload, args=(reason,), name="model-reload", daemon=True).start()
+        return True
+
+    def _watch(self):
+        pending = None
+        while not self._stopping.wait(self.interval):
+            try:
+                state = file_state(self._paths)
+                if state == self._baseline:
+                    pending = None
+                elif state != pending:
+                    # Changed since the last poll: wait until it settles
+                    pending = state
+                elif not self.in_progress:
+                    pending = None
+                    changed = [os.path.basename(p) for p in state if state[p] != self._baseline.get(p)]
+                    self.reload(f"changed: {', '.join(changed)}")
+            except Exception as e:
+                self.logger.error(f"Model reload watcher error: {e}")
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "version": self.version,
+                "watch_interval_seconds": self.interval,
+                "in_progress": self.in_progress,
+                "reloads": self.reloads,
+                "failures": self.failures,
+                "last_reload": self.last_reload,
+                "last_reload_ms": self.last_reload_ms,
+                "last_error": self.last_error,
+            }
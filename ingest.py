@@ -0,0 +1,287 @@
+"""
+Incremental event ingestion.
+
+New events are appended to the in-memory catalogs and spatial indexes of
+the running predictor (DisasterPredictor.ingest), so nearby counts include
+them within seconds, without re-reading or re-sorting the full history.
+The index keeps new points in a small delta that is merged in by periodic
+compaction.
+
+Events arrive two ways:
+
+* POST /ingest (see app.py) with a JSON list of events, {"events": [...]},
+  or a GeoJSON Feature/FeatureCollection of points (USGS feeds work as is).
+* Files dropped into <INGEST_DIR>/<hazard>/ (CSV, JSON or GeoJSON), picked
+  up by a polling thread once they have not changed for a second. Write
+  them under a .tmp name and rename, or copy them in whole.
+
+Events posted to the API are also written to the drop directory, so every
+server process (serve.py workers each poll on their own) and every hot
+reload replays the same events. Files are never modified; merge them into
+the catalog CSV and delete them to make them part of the base data.
+"""
+import csv
+import json
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+EVENT_EXTENSIONS = (".csv", ".json", ".geojson")
+# Alternative names for catalog columns (USGS GeoJSON uses "mag")
+ALIASES = {"lat": "latitude", "lon": "longitude", "lng": "longitude", "long": "longitude", "mag": "magnitude"}
+MAX_REPORTED_ERRORS = 20
+
+
+def parse_events(payload):
+    """List of event dicts from a JSON list, {"events": [...]} or GeoJSON points"""
+    if isinstance(payload, dict):
+        if payload.get("type") == "FeatureCollection":
+            return [_feature_event(f) for f in payload.get("features") or []]
+        if payload.get("type") == "Feature":
+            return [_feature_event(payload)]
+        payload = payload.get("events")
+    if not isinstance(payload, list):
+        raise ValueError("Expected a list of events, {\"events\": [...]} or a GeoJSON FeatureCollection")
+    return [event if isinstance(event, dict) else {} for event in payload]
+
+
+def _feature_event(feature):
+    """GeoJSON Point feature -> event dict (coordinates are lon, lat[, depth])"""
+    event = dict((feature or {}).get("properties") or {})
+    geometry = (feature or {}).get("geometry") or {}
+    coordinates = geometry.get("coordinates") or []
+    if geometry.get("type") == "Point" and len(coordinates) >= 2:
+        event["longitude"], event["latitude"] = coordinates[0], coordinates[1]
+        if len(coordinates) >= 3 and "depth" not in event:
+            event["depth"] = coordinates[2]
+    return event
+
+
+def read_event_file(path):
+    """Events from a CSV, JSON or GeoJSON file"""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+    with open(path, encoding="utf-8") as f:
+        return parse_events(json.load(f))
+
+
+def _number(value):
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        value = float(str(value).replace(",", "").strip()) if isinstance(value, str) else float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def event_columns(events, columns, lat_col, lon_col):
+    """Catalog column arrays for the valid events, and (position, message) for the rest.
+
+    Event keys match catalog columns case-insensitively (and through ALIASES);
+    catalog columns an event doesn't have are NaN.
+    """
+    wanted = {str(c).lower(): c for c in columns}
+    wanted.setdefault(lat_col.lower(), lat_col)
+    wanted.setdefault(lon_col.lower(), lon_col)
+    rows, errors = [], []
+    for position, event in enumerate(events):
+        row = {}
+        for key, value in event.items():
+            key = str(key).strip().lower()
+            name = wanted.get(key) or wanted.get(ALIASES.get(key, ""))
+            if name is not None and name not in row:
+                row[name] = _number(value)
+        lat, lon = row.get(lat_col), row.get(lon_col)
+        if lat is None or lon is None:
+            errors.append((position, "Missing or invalid latitude/longitude"))
+        elif not -90 <= lat <= 90:
+            errors.append((position, "Latitude must be between -90 and 90"))
+        elif not -180 <= lon <= 180:
+            errors.append((position, "Longitude must be between -180 and 180"))
+        else:
+            rows.append(row)
+    names = list(dict.fromkeys(list(columns) + [lat_col, lon_col]))
+    arrays = {name: np.array([np.nan if r.get(name) is None else r[name] for r in rows], dtype=np.float64)
+              for name in names}
+    return arrays, len(rows), errors
+
+
+class EventIngestor:
+    """Feeds events from the API and a drop directory into the current predictor.
+
+    get_predictor() returns the predictor to ingest into (it changes on hot
+    reload); on_ingest(predictor) runs after every ingested batch. The poll
+    thread starts on first use and is restarted in a forked child process.
+    """
+
+    def __init__(self, get_predictor, directory=None, interval=2.0, compact_interval=60.0, settle=1.0,
+                 on_ingest=None, logger=None):
+        self.get_predictor = get_predictor
+        self.directory = directory
+        self.interval = interval
+        self.compact_interval = compact_interval
+        self.settle = settle
+        self.on_ingest = on_ingest
+        self.logger = logger or logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.accepted = 0
+        self.rejected = 0
+        self.files = 0
+        self.failed_files = 0
+        self.compactions = 0
+        self.last_ingest = None
+        self.last_error = None
+        self._reset_thread()
+
+    def _reset_thread(self):
+        self._pid = os.getpid()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def ensure_started(self):
+        """Start the drop-directory poller (no-op when interval is 0 or it is running)"""
+        if self._pid != os.getpid():
+            # Forked: the parent's poll thread doesn't exist here
+            self._reset_thread()
+        if self.interval <= 0 or self._thread is not None or self._stopping.is_set():
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._poll, name="event-ingest", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+
+    @staticmethod
+    def coordinate_columns(predictor, hazard):
+        """(lat, lon) columns of hazard's catalog; ValueError if it can't take events"""
+        if hazard not in predictor.catalogs:
+            raise ValueError(f"Unknown hazard {hazard!r} (expected one of {', '.join(predictor.catalogs)})")
+        lat_col, lon_col = predictor.coordinate_columns(hazard)
+        if lat_col is None or lon_col is None:
+            raise ValueError(f"The {hazard} catalog has no latitude/longitude columns")
+        return lat_col, lon_col
+
+    def ingest(self, predictor, hazard, events, source=None):
+        """Append events to one hazard's catalog; returns a result dict"""
+        lat_col, lon_col = self.coordinate_columns(predictor, hazard)
+        columns, nrows, errors = event_columns(events, predictor.catalogs[hazard].columns, lat_col, lon_col)
+        version = predictor.version
+        with self._lock:
+            if nrows:
+                version = predictor.ingest(hazard, columns, nrows, source)
+            elif source is not None:
+                predictor.ingested_sources.add(source)
+            self.accepted += nrows
+            self.rejected += len(errors)
+            self.last_ingest = datetime.now().isoformat()
+        if nrows and self.on_ingest is not None and predictor is self.get_predictor():
+            self.on_ingest(predictor)
+        return {
+            "hazard": hazard,
+            "accepted": nrows,
+            "rejected": len(errors),
+            "errors": [{"index": i, "error": message} for i, message in errors[:MAX_REPORTED_ERRORS]],
+            "catalog_records": len(predictor.catalogs[hazard]),
+            "version": version,
+        }
+
+    def submit(self, hazard, events):
+        """Ingest events posted to the API, keeping a copy in the drop directory if any were accepted"""
+        predictor = self.get_predictor()
+        source = f"{hazard}/api-{time.time_ns()}-{os.getpid()}.json" if self.directory else None
+        result = self.ingest(predictor, hazard, events, source)
+        if source is not None and result["accepted"]:
+            self._save(source, events)
+        return result
+
+    def _save(self, source, events):
+        path = os.path.join(self.directory, source)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"events": events}, f)
+        os.replace(f"{path}.tmp", path)
+
+    def pending_files(self, predictor):
+        """(hazard, source, path) of settled drop-directory files the predictor hasn't ingested"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        now = time.time()
+        pending = []
+        for hazard in predictor.catalogs:
+            directory = os.path.join(self.directory, hazard)
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                source = f"{hazard}/{name}"
+                path = os.path.join(directory, name)
+                if name.startswith(".") or not name.lower().endswith(EVENT_EXTENSIONS):
+                    continue
+                if source in predictor.ingested_sources:
+                    continue
+                try:
+                    if now - os.path.getmtime(path) < self.settle:
+                        continue  # may still be being written
+                except OSError:
+                    continue
+                pending.append((hazard, source, path))
+        return pending
+
+    def sync(self, predictor=None):
+        """Ingest every new drop-directory file into predictor (default: the current one)"""
+        predictor = predictor or self.get_predictor()
+        ingested = 0
+        for hazard, source, path in self.pending_files(predictor):
+            try:
+                result = self.ingest(predictor, hazard, read_event_file(path), source)
+                ingested += result["accepted"]
+                with self._lock:
+                    self.files += 1
+                self.logger.info(f"Ingested {result['accepted']} {hazard} events from {source} "
+                                 f"({result['rejected']} rejected)")
+            except Exception as e:
+                # Don't retry a broken file on every poll
+                predictor.ingested_sources.add(source)
+                with self._lock:
+                    self.failed_files += 1
+                    self.last_error = f"{source}: {e}"
+                self.logger.error(f"Could not ingest {source}: {e}")
+        return ingested
+
+    def _poll(self):
+        last_compaction = time.monotonic()
+        while not self._stopping.wait(self.interval):
+            try:
+                self.sync()
+                if self.compact_interval > 0 and time.monotonic() - last_compaction >= self.compact_interval:
+                    last_compaction = time.monotonic()
+                    if self.get_predictor().compact():
+                        with self._lock:
+                            self.compactions += 1
+            except Exception as e:
+                self.logger.error(f"Event ingestion poll error: {e}")
+
+    def stats(self):
+        predictor = self.get_predictor()
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "poll_interval_seconds": self.interval,
+                "accepted": self.accepted,
+                "rejected": self.rejected,
+                "files": self.files,
+                "failed_files": self.failed_files,
+                "compactions": self.compactions,
+                "index_delta": {h: index.delta_size for h, index in predictor.indexes.items()},
+                "last_ingest": self.last_ingest,
+                "last_error": self.last_error,
+            }
@@ -0,0 +1,248 @@
+"""
+Load generator for the /predict service.
+
+Sweeps concurrency levels against a server on this machine and reports
+throughput, p50/p95/p99 latency and error rate per level, for two
+coordinate distributions:
+  - hotspot: repeated clicks around a handful of well-known hazard areas
+  - uniform: points spread uniformly over the globe
+
+Only loopback targets are accepted. With --start the tool launches the
+server itself (app.py in development mode, or serve.py) and stops it when
+done; the started server logs alerts instead of sending them.
+
+Usage:
+    python loadtest.py --start app
+    python loadtest.py --start serve --workers 4 --concurrency 1 4 16 64
+    python loadtest.py --url http://127.0.0.1:5000 --duration 20 --json results.json
+"""
+import argparse
+import ipaddress
+import json
+import math
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from urllib.parse import urlparse
+
+# (lat, lng) of areas users keep clicking on
+HOTSPOTS = [
+    (35.68, 139.69),   # Tokyo
+    (37.77, -122.42),  # San Francisco
+    (-6.21, 106.85),   # Jakarta
+    (34.05, -118.24),  # Los Angeles
+    (28.61, 77.21),    # Delhi
+    (23.81, 90.41),    # Dhaka
+    (-33.87, 151.21),  # Sydney
+    (19.43, -99.13),   # Mexico City
+]
+
+DISTRIBUTIONS = ("hotspot", "uniform")
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def point_generator(distribution, seed):
+    """Return a function producing (lat, lng) pairs for one worker"""
+    rng = random.Random(seed)
+    if distribution == "hotspot":
+        def hotspot():
+            lat, lng = rng.choice(HOTSPOTS)
+            # A click lands within a few km of the area; rounding mimics map clicks
+            return round(lat + rng.gauss(0, 0.05), 2), round(lng + rng.gauss(0, 0.05), 2)
+        return hotspot
+
+    def uniform():
+        lat = math.degrees(math.asin(rng.uniform(-1, 1)))
+        return round(lat, 4), round(rng.uniform(-180, 180), 4)
+    return uniform
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_level(base_url, concurrency, duration, distribution, timeout):
+    """Hammer /predict with `concurrency` closed-loop clients for `duration` seconds"""
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    start_barrier = threading.Barrier(concurrency + 1)
+    deadline_holder = {}
+
+    def client(i):
+        next_point = point_generator(distribution, seed=i * 7919 + concurrency)
+        start_barrier.wait()
+        deadline = deadline_holder["deadline"]
+        while time.perf_counter() < deadline:
+            lat, lng = next_point()
+            url = f"{base_url}/predict?lat={lat}&lng={lng}"
+            t0 = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as resp:
+                    resp.read()
+                    ok = resp.status == 200
+            except urllib.error.HTTPError as e:
+                e.read()
+                ok = False
+            except Exception:
+                ok = False
+            latencies[i].append(time.perf_counter() - t0)
+            if not ok:
+                errors[i] += 1
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    started = time.perf_counter()
+    deadline_holder["deadline"] = started + duration
+    start_barrier.wait()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    all_latencies = sorted(x for per_client in latencies for x in per_client)
+    total = len(all_latencies)
+    failed = sum(errors)
+    return {
+        "distribution": distribution,
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": failed,
+        "error_rate": round(failed / total, 4) if total else 0.0,
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(all_latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(all_latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(all_latencies, 99) * 1000, 2),
+        "max_ms": round(all_latencies[-1] * 1000, 2) if all_latencies else 0.0,
+    }
+
+
+# --- Server management ---
+
+def start_server(mode, port, workers):
+    """Launch app.py or serve.py on 127.0.0.1:port and return the process"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env["ALERT_TRANSPORT"] = "log"  # never reach out to an SMS provider during a load test
+    if mode == "serve":
+        cmd = [sys.executable, "serve.py", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", str(workers)]
+    else:
+        # app.py's __main__ is pinned to port 5000 with debug mode on; start the same app on
+        # the requested port with debug off so error pages and logging don't skew timings
+        cmd = [sys.executable, "-c",
+               f"import app; app.app.run(host='127.0.0.1', port={port}, threaded=True)"]
+    return subprocess.Popen(cmd, cwd=root, env=env, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
+
+
+def wait_until_healthy(base_url, proc=None, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(f"{base_url}/health", timeout=2) as resp:
+                if resp.status == 200:
+                    return True
+        except Exception:
+            time.sleep(0.25)
+    return False
+
+
+def stop_server(proc, timeout=30.0):
+    if proc.poll() is not None:
+        return
+    proc.send_signal(signal.SIGTERM if hasattr(signal, "SIGTERM") else signal.SIGINT)
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def print_table(results):
+    header = f"{'dist':<8} {'conc':>5} {'reqs':>8} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['distribution']:<8} {r['concurrency']:>5} {r['requests']:>8} {r['throughput_rps']:>9.1f} "
+              f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['error_rate']:>8.2%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrency sweep load test for /predict (localhost only)")
+    parser.add_argument("--url", default=None,
+                        help="Server base URL (default http://127.0.0.1:<port>)")
+    parser.add_argument("--port", type=int, default=5055,
+                        help="Port used with --start, or for the default URL")
+    parser.add_argument("--start", choices=("app", "serve"),
+                        help="Launch the server: app (development server) or serve (pre-fork)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes when using --start serve")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS + ("both",), default="both")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-request timeout in seconds")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    args = parser.parse_args(argv)
+
+    base_url = (args.url or f"http://127.0.0.1:{args.port}").rstrip("/")
+    host = urlparse(base_url).hostname or ""
+    if not is_loopback(host):
+        print(f"❌ Refusing to load test {host!r}: only localhost targets are allowed")
+        return 2
+
+    proc = None
+    if args.start:
+        if args.url:
+            print("❌ --url cannot be combined with --start")
+            return 2
+        print(f"Starting {args.start} server on {base_url}...")
+        proc = start_server(args.start, args.port, args.workers)
+
+    try:
+        if not wait_until_healthy(base_url, proc, timeout=60.0 if proc else 5.0):
+            print(f"❌ Server at {base_url} is not healthy")
+            return 1
+        print(f"✅ Server healthy at {base_url}\n")
+
+        distributions = DISTRIBUTIONS if args.distribution == "both" else (args.distribution,)
+        results = []
+        for distribution in distributions:
+            for concurrency in args.concurrency:
+                print(f"Running {distribution} x{concurrency} for {args.duration:g}s...")
+                results.append(run_level(base_url, concurrency, args.duration, distribution, args.timeout))
+        print()
+        print_table(results)
+
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"url": base_url, "server": args.start, "duration": args.duration,
+                           "results": results}, f, indent=2)
+            print(f"\nResults written to {args.json}")
+    finally:
+        if proc is not None:
+            stop_server(proc)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Shared model loading.
+
+Every entry point used to pickle.load the three models one after another
+(some without closing the file). ModelLoader resolves each hazard's model
+file once and loads it:
+  - from a joblib dump when one exists next to the pickle and is at least
+    as new; dumps of MMAP_MIN_BYTES or more are opened with mmap_mode='r'
+    so their numpy arrays are mapped instead of read into fresh buffers
+    (for small models, mapping each array costs more than reading it)
+  - for all hazards in parallel threads (load_all), or
+  - lazily, the first time a hazard is requested (lazy=True)
+and records how long each load took.
+
+Usage:
+    python model_loader.py --convert     # write models/*.joblib next to the pickles
+    python model_loader.py --benchmark   # compare pickle / joblib, sequential / parallel
+"""
+import argparse
+import importlib.util
+import os
+import pickle
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# joblib is imported only when a .joblib file is read or written
+_JOBLIB_AVAILABLE = importlib.util.find_spec("joblib") is not None
+
+HAZARDS = ("earthquake", "flood", "wildfire")
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+MMAP_MIN_BYTES = 32 * 1024 * 1024
+
+
+def model_filename(hazard, ext=".pkl"):
+    return f"{hazard}_model{ext}"
+
+
+def resolve_model_path(model_dir, hazard, prefer_joblib=True):
+    """Path to load for hazard: the joblib dump if present and not older than the pickle"""
+    pkl_path = os.path.join(model_dir, model_filename(hazard))
+    joblib_path = os.path.join(model_dir, model_filename(hazard, ".joblib"))
+    if prefer_joblib and _JOBLIB_AVAILABLE and os.path.exists(joblib_path):
+        if not os.path.exists(pkl_path) or os.path.getmtime(joblib_path) >= os.path.getmtime(pkl_path):
+            return joblib_path
+    return pkl_path
+
+
+def load_model_file(path, mmap=True, mmap_min_bytes=MMAP_MIN_BYTES):
+    """Load one model file (.joblib or .pkl)"""
+    if path.endswith(".joblib"):
+        import joblib
+        use_mmap = mmap and os.path.getsize(path) >= mmap_min_bytes
+        return joblib.load(path, mmap_mode="r" if use_mmap else None)
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def convert_to_joblib(model_dir=MODEL_DIR, hazards=HAZARDS):
+    """Write an uncompressed joblib dump next to each pickle; returns the paths"""
+    if not _JOBLIB_AVAILABLE:
+        raise RuntimeError("joblib is not installed")
+    import joblib
+    written = []
+    for hazard in hazards:
+        pkl_path = os.path.join(model_dir, model_filename(hazard))
+        out_path = os.path.join(model_dir, model_filename(hazard, ".joblib"))
+        model = load_model_file(pkl_path)
+        tmp_path = f"{out_path}.tmp{os.getpid()}"
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, out_path)
+        written.append(out_path)
+    return written
+
+
+class ModelLoader:
+    """Loads hazard models on demand or all at once, in parallel.
+
+    get() is thread-safe: concurrent first requests for the same hazard
+    wait for a single load.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, hazards=HAZARDS, lazy=False, mmap=True,
+                 mmap_min_bytes=MMAP_MIN_BYTES, prefer_joblib=True, on_load=None):
+        self.model_dir = model_dir
+        self.hazards = tuple(hazards)
+        self.lazy = lazy
+        self.mmap = mmap
+        self.mmap_min_bytes = mmap_min_bytes
+        self.on_load = on_load
+        self.paths = {h: resolve_model_path(model_dir, h, prefer_joblib) for h in self.hazards}
+        self.load_ms = {}
+        self._models = {}
+        self._locks = {h: threading.Lock() for h in self.hazards}
+
+    def get(self, hazard):
+        model = self._models.get(hazard)
+        if model is not None:
+            return model
+        if hazard not in self._locks:
+            raise KeyError(f"Unknown model: {hazard}")
+        with self._locks[hazard]:
+            model = self._models.get(hazard)
+            if model is None:
+                start = time.perf_counter()
+                model = load_model_file(self.paths[hazard], self.mmap, self.mmap_min_bytes)
+                self.load_ms[hazard] = round((time.perf_counter() - start) * 1000, 2)
+                if self.on_load is not None:
+                    self.on_load(hazard, model)
+                self._models[hazard] = model
+        return model
+
+    def load_all(self, parallel=True):
+        """Load every hazard model; returns {hazard: model}"""
+        missing = [h for h in self.hazards if h not in self._models]
+        if parallel and len(missing) > 1:
+            with ThreadPoolExecutor(max_workers=len(missing), thread_name_prefix="model-load") as pool:
+                list(pool.map(self.get, missing))
+        else:
+            for hazard in missing:
+                self.get(hazard)
+        return {h: self._models[h] for h in self.hazards}
+
+    def is_loaded(self, hazard):
+        return hazard in self._models
+
+    def stats(self):
+        return {
+            "mode": "lazy" if self.lazy else "eager",
+            "models": {
+                h: {
+                    "file": os.path.basename(self.paths[h]),
+                    "loaded": h in self._models,
+                    "load_ms": self.load_ms.get(h),
+                }
+                for h in self.hazards
+            },
+        }
+
+
+def _time_loads(model_dir, prefer_joblib, parallel, mmap_min_bytes=MMAP_MIN_BYTES, repeat=5):
+    best = None
+    for _ in range(repeat):
+        loader = ModelLoader(model_dir, prefer_joblib=prefer_joblib, mmap_min_bytes=mmap_min_bytes)
+        start = time.perf_counter()
+        loader.load_all(parallel=parallel)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert and time DisasterScope model loading")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--convert", action="store_true", help="Write joblib dumps next to the pickles")
+    parser.add_argument("--benchmark", action="store_true", help="Time loading with each strategy")
+    args = parser.parse_args(argv)
+
+    if args.convert:
+        for path in convert_to_joblib(args.model_dir):
+            print(f"✅ Wrote {path}")
+
+    if args.benchmark or not args.convert:
+        print("Model load time (best of 5):")
+        for label, prefer_joblib, parallel, mmap_min_bytes in (
+                ("pickle, sequential", False, False, MMAP_MIN_BYTES),
+                ("pickle, parallel", False, True, MMAP_MIN_BYTES),
+                ("joblib, sequential", True, False, MMAP_MIN_BYTES),
+                ("joblib, parallel", True, True, MMAP_MIN_BYTES),
+                ("joblib mmap, parallel", True, True, 0)):
+            if prefer_joblib and not _JOBLIB_AVAILABLE:
+                continue
+            ms = _time_loads(args.model_dir, prefer_joblib, parallel, mmap_min_bytes)
+            print(f"   {label:<25} {ms:8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+Shared inference for the hazard models.
+
+DisasterPredictor owns what a prediction needs: the models (through
+ModelLoader), their compiled feature plans and fast inference engines, the
+event catalogs with their spatial indexes, and the feature defaults derived
+from those catalogs. app.py, model.py, backend/predict_disaster.py and
+score_file.py all build on it, so they agree on model paths and feature
+names and share every inference optimization.
+
+Paths default to the repository's models/ directory and catalogs, whatever
+the working directory.
+
+    predictor = DisasterPredictor()
+    predictor.probability("flood", 20.59, 78.96)                  # one point, 0-100
+    predictor.probability("flood", 20.59, 78.96, rainfall=300)    # with a feature value
+    predictor.predict(20.59, 78.96)                               # all hazards + counts
+    predictor.predict_batch(lats, lons)                           # arrays in, arrays out
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+from catalog_store import EventCatalog, load_catalog
+from fast_inference import get_engine, predict_proba
+from feature_defaults import FeatureDefaultsStore, data_version
+from feature_plan import FeaturePlanRegistry
+from model_loader import MODEL_DIR, ModelLoader
+from spatial_index import SpatialIndex, find_lat_lon_columns
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+CATALOG_FILES = {"earthquake": "earthquakes.csv", "flood": "floods.csv", "wildfire": "wildfires.csv"}
+RADIUS_KM = 100
+COMPACT_ROWS = 10_000
+
+
+def class_probabilities(model, X):
+    """Class-1 probability (0-100) for every row of X with a single model call"""
+    if not hasattr(model, "predict_proba"):
+        # No probabilities: turn the binary prediction into an estimate
+        return np.where(np.asarray(model.predict(X)) == 1, 85.0, 15.0)
+    proba = np.asarray(predict_proba(model, X), dtype=float)
+    if proba.ndim == 1:
+        return proba * 100
+    return proba[:, 1 if proba.shape[1] > 1 else 0] * 100
+
+
+def risk_level(probability):
+    """Categorize risk level based on probability"""
+    if probability >= 70:
+        return "High", "High risk - Take immediate precautions"
+    elif probability >= 40:
+        return "Medium", "Moderate risk - Stay alert"
+    elif probability >= 10:
+        return "Low", "Low risk - Minimal concern"
+    else:
+        return "Very Low", "Very low risk - Safe area"
+
+
+def risk_levels(probabilities):
+    """Vectorized risk_level (levels only)"""
+    probabilities = np.asarray(probabilities, dtype=float)
+    return np.select([probabilities >= 70, probabilities >= 40, probabilities >= 10],
+                     ["High", "Medium", "Low"], default="Very Low").astype(object)
+
+
+class DisasterPredictor:
+    """Models, feature plans, catalogs and spatial indexes behind every prediction.
+
+    Models load on first use unless load_models() is called. Single-point
+    methods take floats, batch methods take arrays; probabilities are class-1
+    percentages as the models produce them, counts are catalog events within
+    radius_km.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, catalog_dir=base_path, catalog_files=CATALOG_FILES,
+                 lazy=True, convert_catalogs=False, load_catalogs=True, radius_km=RADIUS_KM,
+                 compact_rows=COMPACT_ROWS):
+        self.radius_km = radius_km
+        self.compact_rows = compact_rows
+        self.feature_defaults = FeatureDefaultsStore()
+        self.feature_plans = FeaturePlanRegistry(self.feature_defaults)
+        self.loader = ModelLoader(model_dir, lazy=lazy, on_load=self._prepare_model)
+        self.model_files = [self.loader.paths[h] for h in self.loader.hazards]
+        self.model_version = data_version(self.model_files)
+        self.models_ms = None
+
+        self.catalog_paths = {h: os.path.join(catalog_dir, f) for h, f in catalog_files.items()}
+        self.catalog_error = None
+        catalogs = {h: EventCatalog({}, 0) for h in self.catalog_paths}
+        if load_catalogs:
+            try:
+                catalogs = {h: load_catalog(p, convert=convert_catalogs) for h, p in self.catalog_paths.items()}
+            except Exception as e:
+                self.catalog_error = e
+        self.catalogs = catalogs
+        self.files_version = data_version(list(self.catalog_paths.values()))
+        self.data_version = self.files_version
+        self.feature_defaults.refresh(self.data_version, catalogs["earthquake"], catalogs["flood"],
+                                      catalogs["wildfire"])
+        self.indexes = {h: SpatialIndex.from_dataframe(c) for h, c in catalogs.items()}
+
+        # Events appended since the catalogs were read (see ingest())
+        self.ingested = {h: 0 for h in catalogs}
+        self.ingested_sources = set()
+        self.ingest_batches = 0
+        self._ingest_lock = threading.Lock()
+
+    def _prepare_model(self, hazard, model):
+        """Compile the feature plan and inference engine as soon as a model loads"""
+        self.feature_plans.get(model)
+        get_engine(model)
+
+    @property
+    def hazards(self):
+        return self.loader.hazards
+
+    @property
+    def version(self):
+        """Version of the loaded models and catalogs"""
+        return f"{self.model_version}-{self.data_version}"
+
+    def load_models(self, parallel=True):
+        """Load every model now (in parallel threads); returns the time taken in ms"""
+        start = time.perf_counter()
+        self.loader.load_all(parallel=parallel)
+        self.models_ms = round((time.perf_counter() - start) * 1000, 2)
+        return self.models_ms
+
+    def model(self, hazard):
+        return self.loader.get(hazard)
+
+    def features(self, hazard, lats, lons, **values):
+        """Feature matrix for hazard's model; values sets named features (e.g. rainfall=300)"""
+        model = self.model(hazard)
+        return self._set_features(hazard, self.feature_plans.get(model).fill(lats, lons), model, values)
+
+    def _set_features(self, hazard, X, model, values):
+        plan = self.feature_plans.get(model)
+        for name, value in values.items():
+            slots = plan.slots(name)
+            if not slots.size:
+                raise ValueError(f"The {hazard} model has no feature {name!r} (features: {list(plan.columns)})")
+            X[:, slots] = np.asarray(value, dtype=np.float64).reshape(-1, 1)
+        return X
+
+    # --- Single point ---
+
+    def probability(self, hazard, lat, lon, **values):
+        """Class-1 probability (0-100) of one point"""
+        model = self.model(hazard)
+        X = self._set_features(hazard, self.feature_plans.get(model).row(lat, lon), model, values)
+        return float(class_probabilities(model, X)[0])
+
+    def count_nearby(self, hazard, lat, lon, radius_km=None):
+        """Catalog events within radius_km of one point (0 if the catalog can't be searched)"""
+        try:
+            return self.indexes[hazard].count_within(lat, lon, radius_km or self.radius_km)
+        except Exception:
+            return 0
+
+    def count_nearby_radii(self, hazard, lat, lon, radii_km):
+        """Catalog events within each radius of one point, from one distance pass (zeros on failure)"""
+        try:
+            return [int(c) for c in self.indexes[hazard].count_within_radii(lat, lon, radii_km)]
+        except Exception:
+            return [0] * len(radii_km)
+
+    def predict(self, lat, lon, radius_km=None):
+        """Probabilities, max probability, risk level and counts for one point"""
+        probs = {h: min(100.0, max(0.0, self.probability(h, lat, lon))) for h in self.hazards}
+        out = {f"{h}_probability": round(p, 2) for h, p in probs.items()}
+        out["max_probability"] = round(max(probs.values()), 2)
+        out["risk_level"] = risk_level(max(probs.values()))[0]
+        for h in self.hazards:
+            out[f"{h}_count"] = self.count_nearby(h, lat, lon, radius_km)
+        return out
+
+    # --- Batches ---
+
+    def probabilities(self, hazard, lats, lons, **values):
+        """Class-1 probabilities (0-100) for arrays of points, one model call"""
+        return class_probabilities(self.model(hazard), self.features(hazard, lats, lons, **values))
+
+    def count_nearby_many(self, hazard, lats, lons, radius_km=None):
+        return self.indexes[hazard].count_within_many(lats, lons, radius_km or self.radius_km)
+
+    def predict_batch(self, lats, lons, radius_km=None):
+        """predict() for arrays of points: dict of result arrays"""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        out = {}
+        for h in self.hazards:
+            out[f"{h}_probability"] = np.clip(self.probabilities(h, lats, lons), 0.0, 100.0)
+        max_prob = np.maximum.reduce([out[f"{h}_probability"] for h in self.hazards])
+        for h in self.hazards:
+            out[f"{h}_probability"] = out[f"{h}_probability"].round(2)
+        out["max_probability"] = max_prob.round(2)
+        out["risk_level"] = risk_levels(max_prob)
+        for h in self.hazards:
+            out[f"{h}_count"] = self.count_nearby_many(h, lats, lons, radius_km)
+        return out
+
+    # --- Incremental ingestion ---
+
+    def coordinate_columns(self, hazard):
+        """(lat, lon) column names of a hazard's catalog, or (None, None)"""
+        catalog = self.catalogs[hazard]
+        if not catalog.columns:
+            return "latitude", "longitude"
+        return find_lat_lon_columns(catalog)
+
+    def ingest(self, hazard, columns, nrows, source=None):
+        """Append nrows events (catalog column -> array) to a catalog and its spatial index.
+
+        The catalog and index are replaced, not modified, so readers keep a
+        consistent view; the new rows sit in append buffers (catalog) and a
+        delta (index) until compact(). The data version changes, which updates
+        the feature defaults and gives new prediction cache keys. Returns the
+        new version.
+        """
+        lat_col, lon_col = self.coordinate_columns(hazard)
+        if lat_col is None or lon_col is None:
+            raise ValueError(f"The {hazard} catalog has no latitude/longitude columns")
+        with self._ingest_lock:
+            catalog = self.catalogs[hazard].appended(columns, nrows)
+            added, _ = catalog.pending[-1]
+            index = self.indexes[hazard].with_points(columns[lat_col], columns[lon_col])
+            if index.delta_size >= self.compact_rows:
+                catalog, index = catalog.compacted(), index.compacted()
+            self.catalogs[hazard] = catalog
+            self.indexes[hazard] = index
+            self.ingested[hazard] += nrows
+            self.ingest_batches += 1
+            if source is not None:
+                self.ingested_sources.add(source)
+            self.data_version = f"{self.files_version}+{self.ingest_batches}"
+            self.feature_defaults.extend(self.data_version, hazard, added)
+            return self.version
+
+    def compact(self):
+        """Merge the ingested events into the catalogs and sorted spatial indexes; returns the events merged"""
+        merged = 0
+        with self._ingest_lock:
+            for hazard, index in list(self.indexes.items()):
+                if index.delta_size:
+                    merged += index.delta_size
+                    self.indexes[hazard] = index.compacted()
+                self.catalogs[hazard] = self.catalogs[hazard].compacted()
+        return merged
+
+    def catalog_stats(self):
+        return {
+            h: {"total_records": len(c), "columns": list(c.columns) if not c.empty else [], "source": c.source,
+                "ingested_records": self.ingested[h], "index_delta": self.indexes[h].delta_size}
+            for h, c in self.catalogs.items()
+        }
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_predictor():
+    """Process-wide predictor over the repository's models and catalogs, created on first use"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = DisasterPredictor()
+    return _default
@@ -1,73 +1,244 @@
-import pandas as pd
-import numpy as np
+"""
+Preprocessing pipeline: raw catalogs -> labelled training data.
+
+The raw CSVs in the project folder (earthquakes.csv, floods.csv,
+wildfires.csv) are only read. Each dataset runs through the stages
+  normalize -> label -> select -> negatives
+and the result is written to data/processed/<dataset>.csv.
+
+Every stage output is cached under data/processed/.cache, keyed by a hash
+of the raw file's content, the stage name and its parameters, so a rerun
+skips datasets (and stages) whose inputs have not changed and reprocesses
+only what did. data/processed/manifest.json records the key each output
+was built from.
+
+Usage:
+    python preprocessesdata.py                 # process what changed
+    python preprocessesdata.py --force         # rebuild everything
+    python preprocessesdata.py earthquakes     # only some datasets
+"""
+import argparse
+import hashlib
+import json
 import os
+import sys
+
+import numpy as np
+import pandas as pd
 
 # ✅ Auto-detect project folder
 base_path = os.path.dirname(os.path.abspath(__file__))
+processed_dir = os.path.join(base_path, "data", "processed")
+cache_dir = os.path.join(processed_dir, ".cache")
+manifest_path = os.path.join(processed_dir, "manifest.json")
+
+# Bump when stage code changes in a way that alters outputs
+PIPELINE_VERSION = 1
+
+# ✅ Dataset definitions: raw file, column renames and labelling rule
+DATASETS = {
+    "earthquakes": {
+        "raw": "earthquakes.csv",
+        "rename": {"latitude": "lat", "longitude": "lon"},
+        "label": {"column": "magnitude", "threshold": 6, "drop_missing": False},
+        "negatives": {"seed": 42, "margin": 5},
+    },
+    "wildfires": {
+        "raw": "wildfires.csv",
+        "rename": {"latitude": "lat", "longitude": "lon"},
+        "label": {"column": "Fires", "threshold": 70000, "drop_missing": True},
+        "negatives": {"seed": 42, "margin": 5},
+    },
+    "floods": {
+        "raw": "floods.csv",
+        "rename": {"Latitude": "lat", "Longitude": "lon", "latitude": "lat", "longitude": "lon"},
+        "label": {"column": "FloodProbability", "threshold": 50, "drop_missing": True},
+        "negatives": {"seed": 42, "margin": 5},
+    },
+}
+
+
+class SkipDataset(Exception):
+    """Raised by a stage when the raw data can't produce training data"""
+
+
+def processed_path(name):
+    return os.path.join(processed_dir, f"{name}.csv")
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def stage_key(input_key, stage, params):
+    payload = json.dumps([PIPELINE_VERSION, input_key, stage, params], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# --- Stages ---
+# Each takes the previous DataFrame and the stage parameters.
+
+def normalize(df, params):
+    """Consistent lat/lon names, rows with coordinates only"""
+    df = df.rename(columns=params["rename"])
+    missing = [c for c in ("lat", "lon") if c not in df.columns]
+    if missing:
+        raise SkipDataset(f"no coordinate columns {missing} (columns: {list(df.columns)})")
+    return df.dropna(subset=["lat", "lon"])
+
+
+def label(df, params):
+    """label = 1 where the label column is at or above the threshold.
 
-# ✅ Dataset paths
-earthquake_path = os.path.join(base_path, "earthquakes.csv")
-wildfire_path = os.path.join(base_path, "wildfires.csv")
-flood_path = os.path.join(base_path, "floods.csv")
-
-# ✅ Load datasets
-earthquakes = pd.read_csv(earthquake_path)
-wildfires = pd.read_csv(wildfire_path)
-floods = pd.read_csv(flood_path)
-
-# ✅ Ensure consistency in column names
-earthquakes = earthquakes.rename(columns={"latitude": "lat", "longitude": "lon"})
-wildfires = wildfires.rename(columns={"latitude": "lat", "longitude": "lon"})
-floods = floods.rename(columns={"Latitude": "lat", "Longitude": "lon"})
-
-# ✅ Drop rows with missing coordinates
-earthquakes = earthquakes.dropna(subset=["lat", "lon"])
-wildfires = wildfires.dropna(subset=["lat", "lon"])
-floods = floods.dropna(subset=["lat", "lon"])
-
-# ✅ Label creation
-earthquakes["label"] = earthquakes["magnitude"].apply(lambda x: 1 if x >= 6 else 0)
-
-wildfires["Fires"] = pd.to_numeric(wildfires["Fires"], errors="coerce")
-wildfires = wildfires.dropna(subset=["Fires"])
-wildfires["label"] = wildfires["Fires"].apply(lambda x: 1 if x >= 70000 else 0)
-
-floods["FloodProbability"] = pd.to_numeric(floods["FloodProbability"], errors="coerce")
-floods = floods.dropna(subset=["FloodProbability"])
-floods["label"] = floods["FloodProbability"].apply(lambda x: 1 if x >= 50 else 0)
-
-# ✅ Keep only required columns
-earthquakes = earthquakes[["lat", "lon", "label"]]
-wildfires = wildfires[["lat", "lon", "label"]]
-floods = floods[["lat", "lon", "label"]]
-
-# ✅ Generate negative samples
-def generate_negative_samples(df, count):
-    np.random.seed(42)
-    lat_min, lat_max = df["lat"].min(), df["lat"].max()
-    lon_min, lon_max = df["lon"].min(), df["lon"].max()
-    
-    lat_range = (lat_min - 5, lat_max + 5)
-    lon_range = (lon_min - 5, lon_max + 5)
-    
-    neg_samples = {
-        "lat": np.random.uniform(lat_range[0], lat_range[1], count),
-        "lon": np.random.uniform(lon_range[0], lon_range[1], count),
-        "label": 0
+    Rows without a (numeric) value are dropped when drop_missing is set,
+    otherwise they are kept and labelled 0.
+    """
+    column, threshold = params["column"], params["threshold"]
+    if column not in df.columns:
+        raise SkipDataset(f"no '{column}' column to label from")
+    values = df[column]
+    if not pd.api.types.is_numeric_dtype(values):
+        values = pd.to_numeric(values.astype(str).str.replace(",", ""), errors="coerce")
+    df = df.assign(**{column: values})
+    if params["drop_missing"]:
+        df = df.dropna(subset=[column])
+    return df.assign(label=(df[column].to_numpy() >= threshold).astype(np.int64))
+
+
+def select(df, params):
+    """Keep only required columns"""
+    return df[params["columns"]].reset_index(drop=True)
+
+
+def negatives(df, params):
+    """Append one random negative sample per row inside the padded bounding box"""
+    rng = np.random.RandomState(params["seed"])
+    margin = params["margin"]
+    count = len(df)
+    if count == 0:
+        return df
+    neg = pd.DataFrame({
+        "lat": rng.uniform(df["lat"].min() - margin, df["lat"].max() + margin, count),
+        "lon": rng.uniform(df["lon"].min() - margin, df["lon"].max() + margin, count),
+        "label": 0,
+    })
+    return pd.concat([df, neg], ignore_index=True)
+
+
+def stages_for(spec):
+    return [
+        ("normalize", normalize, {"rename": spec["rename"]}),
+        ("label", label, spec["label"]),
+        ("select", select, {"columns": ["lat", "lon", "label"]}),
+        ("negatives", negatives, spec["negatives"]),
+    ]
+
+
+# --- Runner ---
+
+def load_manifest():
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest):
+    tmp = f"{manifest_path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, manifest_path)
+
+
+def write_csv_atomic(df, path):
+    tmp = f"{path}.tmp"
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def process_dataset(name, spec, manifest, force=False):
+    """Run one dataset's stages, reusing cached stage outputs; returns a status string"""
+    raw_path = os.path.join(base_path, spec["raw"])
+    if not os.path.exists(raw_path):
+        return f"⚠️  {name}: raw file {spec['raw']} not found, skipped"
+
+    stages = stages_for(spec)
+    keys = []
+    key = file_hash(raw_path)
+    for stage_name, _, params in stages:
+        key = stage_key(key, stage_name, params)
+        keys.append(key)
+
+    output = processed_path(name)
+    entry = manifest.get(name, {})
+    if not force and entry.get("key") == keys[-1] and os.path.exists(output):
+        return f"⏭️  {name}: unchanged, skipped"
+
+    dataset_cache = os.path.join(cache_dir, name)
+
+    # Resume from the latest stage whose output is already cached
+    df, start = None, 0
+    if not force and os.path.isdir(dataset_cache):
+        for i in range(len(stages) - 1, -1, -1):
+            cached = os.path.join(dataset_cache, f"{stages[i][0]}-{keys[i][:16]}.pkl")
+            if os.path.exists(cached):
+                df, start = pd.read_pickle(cached), i + 1
+                break
+    if df is None:
+        df = pd.read_csv(raw_path)
+
+    ran = []
+    try:
+        for i in range(start, len(stages)):
+            stage_name, fn, params = stages[i]
+            df = fn(df, params)
+            os.makedirs(dataset_cache, exist_ok=True)
+            df.to_pickle(os.path.join(dataset_cache, f"{stage_name}-{keys[i][:16]}.pkl"))
+            ran.append(stage_name)
+    except SkipDataset as e:
+        manifest.pop(name, None)
+        return f"⚠️  {name}: {e}, skipped"
+
+    # Drop cache files from older versions of this dataset's stages
+    current = {f"{s[0]}-{k[:16]}.pkl" for s, k in zip(stages, keys)}
+    for filename in os.listdir(dataset_cache):
+        if filename not in current:
+            os.remove(os.path.join(dataset_cache, filename))
+
+    write_csv_atomic(df, output)
+    manifest[name] = {
+        "key": keys[-1],
+        "raw": spec["raw"],
+        "output": os.path.relpath(output, base_path),
+        "rows": len(df),
+        "positives": int(df["label"].sum()),
     }
-    return pd.DataFrame(neg_samples)
+    reused = f", reused {stages[start - 1][0]}" if start else ""
+    return f"✅ {name}: {len(df)} rows -> {os.path.relpath(output, base_path)} (ran {', '.join(ran) or 'nothing'}{reused})"
+
 
-eq_neg = generate_negative_samples(earthquakes, len(earthquakes))
-wf_neg = generate_negative_samples(wildfires, len(wildfires))
-flood_neg = generate_negative_samples(floods, len(floods))
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build labelled training data from the raw catalogs")
+    parser.add_argument("datasets", nargs="*", help=f"Datasets to process (default: all of {list(DATASETS)})")
+    parser.add_argument("--force", action="store_true", help="Ignore cached stages and rebuild")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.datasets if name not in DATASETS]
+    if unknown:
+        parser.error(f"unknown dataset(s) {unknown}; choose from {list(DATASETS)}")
 
-earthquake_data = pd.concat([earthquakes, eq_neg], ignore_index=True)
-wildfire_data = pd.concat([wildfires, wf_neg], ignore_index=True)
-flood_data = pd.concat([floods, flood_neg], ignore_index=True)
+    os.makedirs(processed_dir, exist_ok=True)
+    manifest = load_manifest()
+    for name in args.datasets or list(DATASETS):
+        print(process_dataset(name, DATASETS[name], manifest, force=args.force))
+    save_manifest(manifest)
+    print("✅ Preprocessing completed")
+    return 0
 
-# ✅ Save updated datasets
-earthquake_data.to_csv(os.path.join(base_path, "earthquakes.csv"), index=False)
-wildfire_data.to_csv(os.path.join(base_path, "wildfires.csv"), index=False)
-flood_data.to_csv(os.path.join(base_path, "floods.csv"), index=False)
 
-print("✅ Preprocessing completed and datasets updated successfully!")
+if __name__ == "__main__":
+    sys.exit(main())
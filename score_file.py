@@ -0,0 +1,280 @@
+"""
+Bulk scoring for files of coordinates.
+
+Reads a CSV or Parquet file in chunks and adds, for every row, the three
+hazard probabilities (0-100, as returned by /predict), the overall risk
+level and the number of catalog events within --radius km. Rows with
+missing or out-of-range coordinates get an "error" value instead of scores.
+
+Chunks are scored on a process pool; each worker loads the models, catalogs
+and spatial indexes once. At most two chunks per worker are in flight and
+results are written in input order as they complete, so memory depends on
+--chunk-rows, not on the size of the input. Output goes to a temporary file
+that is renamed into place when scoring finishes.
+
+Usage:
+    python score_file.py sites.csv scored.csv
+    python score_file.py sites.parquet scored.parquet --workers 8 --chunk-rows 200000
+    python score_file.py sites.csv scored.csv --lat-col y --lon-col x --keep site_id
+
+Parquet input/output needs pyarrow.
+"""
+import argparse
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from model_loader import HAZARDS
+from predictor import RADIUS_KM, DisasterPredictor, base_path
+from spatial_index import find_lat_lon_columns
+
+CHUNK_ROWS = 100_000
+
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def load_predictor(model_dir=None, catalog_dir=None, radius_km=RADIUS_KM):
+    """DisasterPredictor with every model loaded, as each worker uses it"""
+    predictor = DisasterPredictor(model_dir=model_dir or os.path.join(base_path, "models"),
+                                  catalog_dir=catalog_dir or base_path, radius_km=radius_km)
+    predictor.load_models(parallel=False)
+    return predictor
+
+
+def coordinate_errors(lats, lons):
+    """Per-row error message (None for valid rows), as validate_coordinates reports them"""
+    errors = np.full(len(lats), None, dtype=object)
+    errors[(lons < -180) | (lons > 180)] = "Longitude must be between -180 and 180"
+    errors[(lats < -90) | (lats > 90)] = "Latitude must be between -90 and 90"
+    errors[~(np.isfinite(lats) & np.isfinite(lons))] = "Missing or invalid latitude/longitude"
+    return errors
+
+
+def score_columns():
+    """Names of the columns score_frame adds, in output order"""
+    return [f"{h}_probability" for h in HAZARDS] + ["max_probability", "risk_level"] + \
+        [f"{h}_count" for h in HAZARDS] + ["error"]
+
+
+def score_frame(predictor, df, lat_col, lon_col, keep=None):
+    """Scored copy of one input chunk"""
+    lats = pd.to_numeric(df[lat_col], errors="coerce").to_numpy(dtype=np.float64)
+    lons = pd.to_numeric(df[lon_col], errors="coerce").to_numpy(dtype=np.float64)
+    errors = coordinate_errors(lats, lons)
+    valid = np.array([e is None for e in errors], dtype=bool)
+
+    out = df[keep].copy() if keep is not None else df.copy()
+    scores = predictor.predict_batch(lats[valid], lons[valid]) if valid.any() else None
+    for name in score_columns()[:-1]:
+        if name.endswith("_count"):
+            column = pd.array([pd.NA] * len(df), dtype="Int64")
+        elif name == "risk_level":
+            column = np.full(len(df), None, dtype=object)
+        else:
+            column = np.full(len(df), np.nan)
+        if scores is not None:
+            column[valid] = scores[name]
+        out[name] = column
+    out["error"] = errors
+    return out
+
+
+# --- Worker processes ---
+
+_predictor = None
+_job = None
+
+
+def _init_worker(model_dir, catalog_dir, radius_km, lat_col, lon_col, keep):
+    global _predictor, _job
+    _predictor = load_predictor(model_dir, catalog_dir, radius_km)
+    _job = (lat_col, lon_col, keep)
+
+
+def _score_chunk(df):
+    return score_frame(_predictor, df, *_job)
+
+
+# --- Input / output ---
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise SystemExit("❌ Parquet files need pyarrow (pip install pyarrow)")
+
+
+def is_parquet(path):
+    return path.lower().endswith((".parquet", ".pq"))
+
+
+def read_chunks(path, chunk_rows):
+    """Yield DataFrames of at most chunk_rows rows"""
+    if is_parquet(path):
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+        parquet_file = pq.ParquetFile(path)
+        empty = True
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows):
+            empty = False
+            yield batch.to_pandas()
+        if empty:
+            # Like read_csv on a header-only file: one chunk with the columns and no rows
+            yield parquet_file.schema_arrow.empty_table().to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows, low_memory=False)
+
+
+def parquet_schema(df=None, coordinate_columns=()):
+    """Arrow schema for scored chunks.
+
+    The score columns have fixed types: a chunk where every row is valid has
+    an all-None "error" column (and one where none is has an all-None
+    "risk_level"), which Arrow would otherwise type as null and later chunks
+    could not be cast to. Input columns keep the types inferred from df, with
+    coordinates as float64 and all-missing columns as string.
+    """
+    import pyarrow as pa
+    fixed = {name: pa.string() if name in ("risk_level", "error") else
+             pa.int64() if name.endswith("_count") else pa.float64()
+             for name in score_columns()}
+    if df is None:
+        return pa.schema([pa.field(name, dtype) for name, dtype in fixed.items()])
+    fields = []
+    for field in pa.Schema.from_pandas(df, preserve_index=False):
+        dtype = field.type
+        if field.name in fixed:
+            dtype = fixed[field.name]
+        elif field.name in coordinate_columns and (pa.types.is_null(dtype) or pa.types.is_integer(dtype)):
+            dtype = pa.float64()
+        elif pa.types.is_null(dtype):
+            dtype = pa.string()
+        fields.append(pa.field(field.name, dtype))
+    return pa.schema(fields)
+
+
+class ChunkWriter:
+    """Appends scored chunks to a temporary file, moved to path on close"""
+
+    def __init__(self, path, coordinate_columns=()):
+        self.path = path
+        self.tmp = f"{path}.tmp"
+        self.parquet = is_parquet(path)
+        self.coordinate_columns = tuple(coordinate_columns)
+        self._writer = None
+        self.rows = 0
+        if self.parquet:
+            _require_pyarrow()
+
+    def write(self, df):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.tmp, parquet_schema(df, self.coordinate_columns))
+            table = pa.Table.from_pandas(df, schema=self._writer.schema, preserve_index=False)
+            self._writer.write_table(table)
+        else:
+            df.to_csv(self.tmp, mode="w" if self.rows == 0 else "a", header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self.parquet and self._writer is None:
+            # Nothing was written: still produce a (row-less) file, as for CSV
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self.tmp, parquet_schema())
+        if self._writer is not None:
+            self._writer.close()
+        if not os.path.exists(self.tmp):
+            open(self.tmp, "w").close()
+        os.replace(self.tmp, self.path)
+
+
+def score_file(input_path, output_path, workers=None, chunk_rows=CHUNK_ROWS, radius_km=RADIUS_KM,
+               lat_col=None, lon_col=None, keep=None, model_dir=None, catalog_dir=None):
+    """Score input_path into output_path; returns the number of rows written"""
+    workers = workers or os.cpu_count() or 1
+    chunks = read_chunks(input_path, chunk_rows)
+    first = next(chunks, None)
+    if first is None:
+        raise ValueError(f"{input_path} has no rows")
+    if lat_col is None or lon_col is None:
+        found_lat, found_lon = find_lat_lon_columns(first)
+        lat_col, lon_col = lat_col or found_lat, lon_col or found_lon
+    missing = [c for c in (lat_col, lon_col) + tuple(keep or ()) if c is None or c not in first.columns]
+    if missing:
+        raise ValueError(f"Missing columns {missing}; found {list(first.columns)} (use --lat-col/--lon-col)")
+
+    job = (lat_col, lon_col, list(keep) if keep else None)
+    writer = ChunkWriter(output_path, coordinate_columns=(lat_col, lon_col))
+    start = time.perf_counter()
+
+    def report(scored):
+        writer.write(scored)
+        elapsed = time.perf_counter() - start
+        print(f"✅ {writer.rows} rows scored ({writer.rows / elapsed:,.0f} rows/s)")
+
+    def all_chunks():
+        yield first
+        yield from chunks
+
+    try:
+        if workers <= 1:
+            predictor = load_predictor(model_dir, catalog_dir, radius_km)
+            for df in all_chunks():
+                report(score_frame(predictor, df, *job))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(model_dir, catalog_dir, radius_km) + job) as pool:
+                pending = []
+                for df in all_chunks():
+                    pending.append(pool.submit(_score_chunk, df))
+                    # Bounded in-flight chunks; results are written in input order
+                    if len(pending) >= workers * 2:
+                        report(pending.pop(0).result())
+                for future in pending:
+                    report(future.result())
+    except BaseException:
+        if writer._writer is not None:
+            writer._writer.close()
+        if os.path.exists(writer.tmp):
+            os.remove(writer.tmp)
+        raise
+    writer.close()
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a CSV/Parquet file of coordinates with the hazard models")
+    parser.add_argument("input", help="CSV or Parquet file with latitude/longitude columns")
+    parser.add_argument("output", help="Output file (.csv or .parquet)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--radius", type=float, default=RADIUS_KM, help="Nearby-event radius in km")
+    parser.add_argument("--lat-col")
+    parser.add_argument("--lon-col")
+    parser.add_argument("--keep", help="Comma-separated input columns to copy to the output (default: all)")
+    parser.add_argument("--model-dir", default=None)
+    args = parser.parse_args(argv)
+
+    keep = [c.strip() for c in args.keep.split(",") if c.strip()] if args.keep else None
+    start = time.perf_counter()
+    try:
+        rows = score_file(args.input, args.output, workers=args.workers, chunk_rows=args.chunk_rows,
+                          radius_km=args.radius, lat_col=args.lat_col, lon_col=args.lon_col, keep=keep,
+                          model_dir=args.model_dir)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"Done: {rows} rows -> {args.output} in {time.perf_counter() - start:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+"""
+Production server for DisasterScope.
+
+The master process imports app.py once (models, catalogs, spatial indexes,
+fast inference engines), warms it up, then forks worker processes that
+share all of that memory copy-on-write and accept connections from one
+shared listening socket.
+
+Usage:
+    python serve.py --workers 4 --port 5000
+
+Signals (master):
+    SIGHUP          graceful restart: reload app.py in the master, then replace
+                    workers one at a time so the socket is never left unserved
+    SIGTERM/SIGINT  graceful shutdown: workers finish in-flight requests first
+
+On platforms without os.fork (Windows) it falls back to a single-process
+threaded server.
+"""
+import argparse
+import gc
+import importlib
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+import types
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="DisasterScope production server")
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "5000")))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))),
+                        help="Worker processes (default: WEB_CONCURRENCY or CPU count)")
+    parser.add_argument("--graceful-timeout", type=float, default=30.0,
+                        help="Seconds a worker gets to finish in-flight requests")
+    parser.add_argument("--backlog", type=int, default=128)
+    return parser.parse_args(argv)
+
+
+def load_app():
+    """Import app.py (loading models and data) and warm the request path"""
+    import app as app_module
+    warm_up(app_module)
+    return app_module
+
+
+def warm_up(app_module):
+    """Run one prediction so lazy caches (engines, plans) exist before fork
+
+    Goes straight to the predictor rather than through a request, so no
+    alert is sent, nothing is cached and no background thread is started
+    in the master (threads don't survive fork). Returns False if the
+    prediction failed.
+    """
+    lat, lng = app_module.WARM_UP_POINT
+    try:
+        app_module.predictor.predict(lat, lng)
+        app_module.predictor.predict_batch([lat], [lng])
+    except Exception as e:
+        print(f"Warm-up prediction failed: {e}")
+        return False
+    return True
+
+
+def stop_background(app_module):
+    """Stop app.py's watcher, ingest poller, alert workers and stage pool"""
+    app_module.model_reloader.stop()
+    app_module.event_ingestor.stop()
+    app_module.alert_dispatcher.stop()
+    app_module.stage_pipeline.shutdown(wait=False)
+
+
+def create_socket(host, port, backlog):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app_module, sock, host, port):
+    """Serve requests from the shared socket until told to stop"""
+    from werkzeug.serving import make_server
+
+    server = make_server(host, port, app_module.app, threaded=True, fd=sock.fileno())
+    # Let server_close() wait for in-flight request threads
+    server.daemon_threads = False
+    server.block_on_close = True
+
+    def stop(signum, frame):
+        # shutdown() blocks until serve_forever exits, so call it from another thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+class Master:
+    """Forks and supervises worker processes"""
+
+    def __init__(self, app_module, sock, args):
+        self.app_module = app_module
+        self.sock = sock
+        self.args = args
+        self.workers = {}  # pid -> start time
+        self.stopping = False
+        self.restart_requested = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app_module, self.sock, self.args.host, self.args.port)
+            except Exception:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.time()
+        return pid
+
+    def stop_worker(self, pid, timeout):
+        """SIGTERM a worker and wait for it, SIGKILL if it overruns"""
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            self.workers.pop(pid, None)
+            return
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+            if done:
+                break
+            time.sleep(0.05)
+        else:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.workers.pop(pid, None)
+
+    def reap(self):
+        """Collect exited workers; returns how many died"""
+        died = 0
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            if self.workers.pop(pid, None) is not None:
+                died += 1
+                print(f"Worker {pid} exited (status {status})")
+        return died
+
+    def graceful_restart(self):
+        """Reload app.py in the master, then roll workers one by one"""
+        print("Graceful restart: reloading application...")
+        # reload re-runs app.py in the same module namespace: keep the old one
+        # to put back on failure, and stop its background work only on success
+        previous = dict(vars(self.app_module))
+        try:
+            self.app_module = importlib.reload(self.app_module)
+            if not warm_up(self.app_module):
+                raise RuntimeError("warm-up prediction failed")
+        except Exception as e:
+            print(f"Reload failed, keeping current application: {e}")
+            traceback.print_exc()
+            vars(self.app_module).clear()
+            vars(self.app_module).update(previous)
+        else:
+            stop_background(types.SimpleNamespace(**previous))
+            print("Application reloaded")
+        gc.freeze()
+        for old_pid in list(self.workers):
+            new_pid = self.spawn()
+            print(f"Started worker {new_pid}, stopping worker {old_pid}")
+            self.stop_worker(old_pid, self.args.graceful_timeout)
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_hup)
+
+        # Objects allocated so far (models, catalogs) are moved out of the
+        # GC's tracked generations so collections in workers don't write to
+        # their pages and break copy-on-write sharing.
+        gc.freeze()
+        for _ in range(self.args.workers):
+            pid = self.spawn()
+            print(f"Started worker {pid}")
+
+        while not self.stopping:
+            if self.restart_requested:
+                self.restart_requested = False
+                self.graceful_restart()
+            self.reap()
+            while not self.stopping and len(self.workers) < self.args.workers:
+                pid = self.spawn()
+                print(f"Replaced worker with {pid}")
+            time.sleep(0.2)
+
+        print("Shutting down workers...")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.time() + self.args.graceful_timeout
+        while self.workers and time.time() < deadline:
+            self.reap()
+            time.sleep(0.05)
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self.reap()
+
+    def _on_stop(self, signum, frame):
+        self.stopping = True
+
+    def _on_hup(self, signum, frame):
+        self.restart_requested = True
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    print("\n" + "=" * 50)
+    print("DisasterScope Production Server")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    app_module = load_app()
+    print(f"Application loaded in {time.perf_counter() - start:.2f}s")
+
+    if not hasattr(os, "fork"):
+        print("os.fork is not available on this platform; serving with one process")
+        from werkzeug.serving import make_server
+        make_server(args.host, args.port, app_module.app, threaded=True).serve_forever()
+        return 0
+
+    try:
+        sock = create_socket(args.host, args.port, args.backlog)
+    except OSError as e:
+        print(f"Cannot bind {args.host}:{args.port}: {e}")
+        return 1
+
+    print(f"Listening on http://{args.host}:{args.port} with {args.workers} workers")
+    print("   SIGHUP: graceful restart, SIGTERM/Ctrl+C: stop")
+    print("=" * 50 + "\n")
+    Master(app_module, sock, args).run()
+    sock.close()
+    print("Server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
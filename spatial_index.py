@@ -0,0 +1,196 @@
+"""
+Spatial index for nearby-event counts.
+
+Events are kept sorted by latitude so a radius query only looks at the
+latitude band that can contain matches (found with a binary search), then
+drops points outside the longitude window before running the haversine
+formula on the few candidates that remain.
+
+Newly ingested events go to a small delta index instead of re-sorting the
+whole catalog: with_points() returns a new index that shares the sorted
+arrays and has the extra points in its delta, and compacted() merges the
+delta back in. Indexes are never modified in place, so a request that holds
+one keeps consistent counts while ingestion swaps in the next.
+"""
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+LAT_COLUMNS = ('latitude', 'lat')
+LON_COLUMNS = ('longitude', 'lon', 'lng')
+
+
+def find_lat_lon_columns(df):
+    """Return the (lat, lon) column names of a catalog, or (None, None)"""
+    lat_col = None
+    lon_col = None
+    for col in df.columns:
+        col_lower = str(col).lower()
+        if col_lower in LAT_COLUMNS and lat_col is None:
+            lat_col = col
+        if col_lower in LON_COLUMNS and lon_col is None:
+            lon_col = col
+    return lat_col, lon_col
+
+
+def haversine_array(lat, lon, lats, lons):
+    """Vectorized haversine distance in km from one point to arrays of points"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(lons - lon)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+class SpatialIndex:
+    """Latitude-sorted point index answering radius counts"""
+
+    def __init__(self, lats, lons):
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        valid = ~(np.isnan(lats) | np.isnan(lons))
+        lats = lats[valid]
+        lons = lons[valid]
+        order = np.argsort(lats, kind='stable')
+        self.lats = lats[order]
+        self.lons = lons[order]
+        self.delta = None  # SpatialIndex of points added since the last compaction
+
+    @classmethod
+    def _from_sorted(cls, lats, lons, delta=None):
+        index = cls.__new__(cls)
+        index.lats = lats
+        index.lons = lons
+        index.delta = delta
+        return index
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Build an index from any catalog with lat/lon columns"""
+        if df is None or df.empty:
+            return cls([], [])
+        lat_col, lon_col = find_lat_lon_columns(df)
+        if not lat_col or not lon_col:
+            return cls([], [])
+        lats = np.asarray(df[lat_col], dtype=np.float64)
+        lons = np.asarray(df[lon_col], dtype=np.float64)
+        return cls(lats, lons)
+
+    def __len__(self):
+        return len(self.lats) + self.delta_size
+
+    @property
+    def delta_size(self):
+        return len(self.delta.lats) if self.delta is not None else 0
+
+    def with_points(self, lats, lons):
+        """New index that also counts the given points (kept in the delta until compacted)"""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        if self.delta is not None:
+            lats = np.concatenate([self.delta.lats, lats])
+            lons = np.concatenate([self.delta.lons, lons])
+        return SpatialIndex._from_sorted(self.lats, self.lons, SpatialIndex(lats, lons))
+
+    def compacted(self):
+        """New index with the delta merged into the sorted arrays"""
+        if not self.delta_size:
+            return self
+        # The delta is sorted too, so inserting it keeps the arrays sorted
+        positions = np.searchsorted(self.lats, self.delta.lats, side='right')
+        return SpatialIndex._from_sorted(np.insert(self.lats, positions, self.delta.lats),
+                                         np.insert(self.lons, positions, self.delta.lons))
+
+    def candidates(self, lat, lon, radius_km):
+        """Return the lat/lon arrays of sorted points inside the query's bounding box (delta excluded)"""
+        # Pad the box slightly so floating point rounding never excludes a
+        # point that the exact haversine check would accept.
+        dlat = np.degrees(radius_km / EARTH_RADIUS_KM) * 1.0001 + 1e-9
+        lo = np.searchsorted(self.lats, lat - dlat, side='left')
+        hi = np.searchsorted(self.lats, lat + dlat, side='right')
+        lats = self.lats[lo:hi]
+        lons = self.lons[lo:hi]
+        if len(lats) == 0:
+            return lats, lons
+
+        # Longitude window widens towards the poles; give up on it when the
+        # band touches a pole and just use the latitude band.
+        max_abs_lat = abs(lat) + dlat
+        if max_abs_lat < 90:
+            dlon = dlat / np.cos(np.radians(max_abs_lat))
+            if dlon < 180:
+                delta = np.abs((lons - lon + 180) % 360 - 180)
+                keep = delta <= dlon
+                lats = lats[keep]
+                lons = lons[keep]
+        return lats, lons
+
+    def count_within(self, lat, lon, radius_km):
+        """Count indexed points within radius_km of (lat, lon)"""
+        count = self.delta.count_within(lat, lon, radius_km) if self.delta is not None else 0
+        if len(self.lats) == 0:
+            return count
+        lats, lons = self.candidates(lat, lon, radius_km)
+        if len(lats) == 0:
+            return count
+        distances = haversine_array(lat, lon, lats, lons)
+        return count + int((distances <= radius_km).sum())
+
+    def count_within_radii(self, lat, lon, radii_km):
+        """Count indexed points within each of several radii of (lat, lon).
+
+        Distances are computed once, for the candidates of the largest radius,
+        then sorted so every count is a binary search.
+        """
+        radii_km = np.asarray(radii_km, dtype=np.float64)
+        counts = np.zeros(len(radii_km), dtype=np.int64)
+        if self.delta is not None:
+            counts += self.delta.count_within_radii(lat, lon, radii_km)
+        if len(self.lats) == 0 or len(radii_km) == 0:
+            return counts
+        lats, lons = self.candidates(lat, lon, radii_km.max())
+        if len(lats) == 0:
+            return counts
+        distances = np.sort(haversine_array(lat, lon, lats, lons))
+        return counts + np.searchsorted(distances, radii_km, side='right')
+
+    def count_within_many(self, lats, lons, radius_km, chunk_candidates=2_000_000):
+        """Count indexed points within radius_km of every query point.
+
+        Candidate pairs from the latitude bands of all queries are expanded
+        into flat arrays and evaluated together, in chunks of at most
+        chunk_candidates pairs to bound memory.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        counts = np.zeros(len(lats), dtype=np.int64)
+        if self.delta is not None:
+            counts += self.delta.count_within_many(lats, lons, radius_km, chunk_candidates)
+        if len(self.lats) == 0 or len(lats) == 0:
+            return counts
+
+        dlat = np.degrees(radius_km / EARTH_RADIUS_KM) * 1.0001 + 1e-9
+        lo = np.searchsorted(self.lats, lats - dlat, side='left')
+        hi = np.searchsorted(self.lats, lats + dlat, side='right')
+        sizes = hi - lo
+
+        start = 0
+        while start < len(lats):
+            # Grow the chunk until it holds chunk_candidates pairs (at least one query)
+            cum = np.cumsum(sizes[start:])
+            stop = start + max(1, int(np.searchsorted(cum, chunk_candidates, side='right')))
+            total = int(cum[stop - start - 1])
+            if total:
+                query_ids = np.repeat(np.arange(start, stop), sizes[start:stop])
+                offsets = np.arange(total) - np.repeat(cum[:stop - start] - sizes[start:stop], sizes[start:stop])
+                point_ids = lo[query_ids] + offsets
+                distances = haversine_array(
+                    lats[query_ids], lons[query_ids],
+                    self.lats[point_ids], self.lons[point_ids]
+                )
+                within = query_ids[distances <= radius_km]
+                counts += np.bincount(within, minlength=len(lats))
+            start = stop
+        return counts
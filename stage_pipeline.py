@@ -0,0 +1,68 @@
+"""
+Concurrent execution of independent per-request stages.
+
+/predict has six stages that don't depend on each other (three model
+inferences and three catalog counts). StagePipeline runs them on a thread
+pool created once at startup and reports each stage's result, exception and
+wall time separately, so callers can keep their per-stage error handling.
+"""
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+
+class StageResult:
+    """Outcome of one stage: value or error, plus its duration in ms"""
+
+    __slots__ = ('name', 'value', 'error', 'traceback', 'elapsed_ms')
+
+    def __init__(self, name, value=None, error=None, tb=None, elapsed_ms=0.0):
+        self.name = name
+        self.value = value
+        self.error = error
+        self.traceback = tb
+        self.elapsed_ms = elapsed_ms
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _run_stage(name, fn):
+    start = time.perf_counter()
+    try:
+        value = fn()
+        return StageResult(name, value=value, elapsed_ms=(time.perf_counter() - start) * 1000)
+    except Exception as e:
+        return StageResult(name, error=e, tb=traceback.format_exc(),
+                           elapsed_ms=(time.perf_counter() - start) * 1000)
+
+
+class StagePipeline:
+    """Runs named stages concurrently on a shared thread pool.
+
+    With max_workers <= 1 stages run inline, one after another.
+    """
+
+    def __init__(self, max_workers=6, thread_name_prefix="predict-stage"):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._lock = threading.Lock()
+        self._executor = None
+        if max_workers > 1:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                                thread_name_prefix=thread_name_prefix)
+
+    def run(self, stages):
+        """Run [(name, fn), ...] and return {name: StageResult} in stage order"""
+        if self._executor is None:
+            return {name: _run_stage(name, fn) for name, fn in stages}
+        futures = [(name, self._executor.submit(_run_stage, name, fn)) for name, fn in stages]
+        return {name: future.result() for name, future in futures}
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
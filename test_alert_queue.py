@@ -0,0 +1,86 @@
+"""
+Tests for the background alert dispatcher in alert_queue.py.
+Run with: pytest test_alert_queue.py
+"""
+import threading
+
+from alert_queue import AlertDispatcher
+
+
+class _Transport:
+    """Records batches; the first `failures` calls raise"""
+
+    name = "fake"
+
+    def __init__(self, failures=0, gate=None):
+        self.failures = failures
+        self.gate = gate
+        self.entered = threading.Event()
+        self.batches = []
+
+    def send_batch(self, alerts):
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.batches.append([a.message for a in alerts])
+        if len(self.batches) <= self.failures:
+            raise ConnectionError("network down")
+        return []
+
+
+def test_alerts_are_sent_in_batches():
+    transport, latencies = _Transport(), []
+    dispatcher = AlertDispatcher(transport, workers=1, batch_size=3, batch_wait=0.5, on_sent=latencies.append)
+    try:
+        assert all(dispatcher.submit("+1555", f"m{i}") for i in range(5))
+        assert dispatcher.flush(5)
+    finally:
+        dispatcher.stop()
+    assert sorted(m for batch in transport.batches for m in batch) == [f"m{i}" for i in range(5)]
+    assert max(len(batch) for batch in transport.batches) == 3
+    stats = dispatcher.stats()
+    assert (stats["submitted"], stats["sent"], stats["failed"]) == (5, 5, 0)
+    assert stats["dispatch_latency_ms"]["count"] == len(latencies) == 5
+
+
+def test_failed_batches_are_retried_with_backoff_then_given_up():
+    transport = _Transport(failures=2)
+    dispatcher = AlertDispatcher(transport, workers=1, max_retries=3, backoff_base=0.01)
+    try:
+        dispatcher.submit("+1555", "flood")
+        assert dispatcher.flush(5)
+    finally:
+        dispatcher.stop()
+    assert transport.batches == [["flood"]] * 3
+    stats = dispatcher.stats()
+    assert (stats["sent"], stats["retried"], stats["failed"]) == (1, 2, 0)
+
+    transport = _Transport(failures=10)
+    dispatcher = AlertDispatcher(transport, workers=1, max_retries=2, backoff_base=0.01)
+    try:
+        dispatcher.submit("+1555", "quake")
+        assert dispatcher.flush(5)
+    finally:
+        dispatcher.stop()
+    assert len(transport.batches) == 3
+    stats = dispatcher.stats()
+    assert (stats["sent"], stats["retried"], stats["failed"]) == (0, 2, 1)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    gate = threading.Event()
+    transport = _Transport(gate=gate)
+    dispatcher = AlertDispatcher(transport, maxsize=1, workers=1, batch_wait=0)
+    try:
+        assert dispatcher.submit("+1555", "in flight")
+        assert transport.entered.wait(5)
+        assert dispatcher.submit("+1555", "queued")
+        assert not dispatcher.submit("+1555", "dropped")
+        assert dispatcher.stats()["queue_depth"] == 1
+        gate.set()
+        assert dispatcher.flush(5)
+    finally:
+        gate.set()
+        dispatcher.stop()
+    stats = dispatcher.stats()
+    assert (stats["submitted"], stats["sent"], stats["dropped"]) == (2, 2, 1)
@@ -0,0 +1,42 @@
+"""
+Tests for per-hazard, per-cell alert cooldowns in alert_suppression.py.
+Run with: pytest test_alert_suppression.py
+"""
+from alert_suppression import AlertSuppressor
+
+
+def test_repeat_alerts_in_a_cell_are_muted_until_the_cooldown_ends():
+    suppressor = AlertSuppressor(cell_degrees=0.5, cooldown=900)
+    assert suppressor.should_send("flood", 20.10, 78.10, now=0)
+    assert not suppressor.should_send("flood", 20.40, 78.45, now=899)  # same 0.5° cell
+    assert suppressor.should_send("flood", 20.60, 78.10, now=899)  # next cell north
+    assert suppressor.should_send("earthquake", 20.10, 78.10, now=899)  # other hazard
+    assert suppressor.should_send("flood", 20.10, 78.10, now=900)  # cooldown over
+    stats = suppressor.stats()
+    assert (stats["allowed"], stats["suppressed"], stats["suppressed_by_hazard"]) == (4, 1, {"flood": 1})
+
+
+def test_cells_split_at_multiples_of_the_grid_size():
+    suppressor = AlertSuppressor(cell_degrees=1.0)
+    assert suppressor.cell(0.99, -0.01) == (0, -1)
+    assert suppressor.cell(1.0, -1.0) == (1, -1)
+    assert suppressor.cell(-0.5, 179.9) == (-1, 179)
+
+
+def test_per_hazard_cooldowns_override_the_default():
+    suppressor = AlertSuppressor(cooldown=900, cooldowns={"earthquake": 60})
+    assert suppressor.cooldown_for("flood") == 900 and suppressor.cooldown_for("earthquake") == 60
+    for hazard in ("earthquake", "flood"):
+        assert suppressor.should_send(hazard, 10, 10, now=0)
+    assert suppressor.should_send("earthquake", 10, 10, now=60)
+    assert not suppressor.should_send("flood", 10, 10, now=60)
+
+
+def test_table_stays_bounded():
+    suppressor = AlertSuppressor(cell_degrees=1.0, cooldown=900, maxsize=3)
+    for i in range(5):
+        assert suppressor.should_send("flood", 0, i, now=i)
+    assert suppressor.stats()["tracked_cells"] == 3
+    # The oldest cells were dropped, so they alert again
+    assert suppressor.should_send("flood", 0, 0, now=10)
+    assert not suppressor.should_send("flood", 0, 4, now=10)
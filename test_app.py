@@ -0,0 +1,111 @@
+"""
+Tests for the Flask endpoints in app.py (run in-process with the test client).
+Run with: pytest test_app.py
+"""
+import os
+
+import pytest
+
+# No background watcher/poller threads in tests
+os.environ.setdefault("MODEL_RELOAD_INTERVAL", "0")
+os.environ.setdefault("INGEST_INTERVAL", "0")
+
+import app  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+def test_batch_matches_single_point_predictions(client):
+    points = [{"latitude": 20.59, "longitude": 78.96}, [35.68, 139.69], {"lat": -33.87, "lng": 151.21}]
+    body = client.post("/predict/batch", json={"points": points}).get_json()
+    assert body["count"] == 3 and body["version"] == app.predictor.version
+    for (lat, lng), result in zip([(20.59, 78.96), (35.68, 139.69), (-33.87, 151.21)], body["results"]):
+        single = client.get(f"/predict?lat={lat}&lng={lng}").get_json()
+        for key in ("earthquake", "flood", "wildfire", "overall", "counts"):
+            assert result[key] == single[key], key
+
+
+def test_batch_accepts_a_bare_array_body(client):
+    response = client.post("/predict/batch", json=[{"lat": 20.59, "lng": 78.96}, [10, 10]])
+    assert response.status_code == 200 and response.get_json()["count"] == 2
+
+
+def test_batch_reports_bad_points_in_place(client):
+    points = [[20.59, 78.96], [95, 0], {"lat": 1}, ["x", 2], [0, 200], "junk"]
+    results = client.post("/predict/batch", json={"points": points}).get_json()["results"]
+    assert "error" not in results[0]
+    assert [r.get("error") for r in results[1:]] == [
+        "Latitude must be between -90 and 90",
+        "Missing latitude or longitude",
+        "Invalid latitude/longitude format",
+        "Longitude must be between -180 and 180",
+        "Missing latitude or longitude",
+    ]
+
+
+def test_batch_rejects_bad_bodies_and_oversized_batches(client, monkeypatch):
+    for body in ({}, {"points": "nope"}, 42):
+        response = client.post("/predict/batch", json=body)
+        assert response.status_code == 400, body
+    monkeypatch.setattr(app, "BATCH_MAX_POINTS", 3)
+    response = client.post("/predict/batch", json={"points": [[0, 0]] * 4})
+    assert response.status_code == 400 and "max 3" in response.get_json()["error"]
+    assert client.post("/predict/batch", json={"points": [[0, 0]] * 3}).status_code == 200
+
+
+def test_metrics_endpoint_serves_prometheus_text(client):
+    client.get("/predict?lat=20.59&lng=78.96")
+    response = client.get("/metrics")
+    assert response.status_code == 200 and response.mimetype == "text/plain"
+    lines = response.get_data(as_text=True).splitlines()
+    assert "# TYPE disasterscope_request_duration_seconds histogram" in lines
+    assert "# TYPE disasterscope_alert_dispatch_seconds histogram" in lines
+    assert "# TYPE disasterscope_alert_queue_depth gauge" in lines
+    assert any(line.startswith('disasterscope_requests_total{endpoint="/predict",method="GET",status="200"}')
+               for line in lines)
+    assert any(line.startswith('disasterscope_stage_duration_seconds_count{stage="count_nearby",target="earthquake"}')
+               for line in lines)
+
+
+STAGES = ["earthquake_model", "flood_model", "wildfire_model", "earthquake_count", "flood_count", "wildfire_count"]
+
+
+def test_concurrent_stages_match_the_sequential_path(monkeypatch):
+    lat, lng = 35.68, 139.69
+    current = app.predictor
+    pooled = app.run_prediction_stages(lat, lng, current=current)
+    monkeypatch.setattr(app, "stage_pipeline", app.StagePipeline(max_workers=1))
+    inline = app.run_prediction_stages(lat, lng, current=current)
+    assert list(pooled) == list(inline) == STAGES
+    for hazard in ("earthquake", "flood", "wildfire"):
+        model = current.model(hazard)
+        expected = app.safe_predict_proba(model, app.build_model_input(model, lat, lng, current))
+        assert pooled[f"{hazard}_model"].value == inline[f"{hazard}_model"].value == expected
+        expected = current.count_nearby(hazard, lat, lng, radius_km=100)
+        assert pooled[f"{hazard}_count"].value == inline[f"{hazard}_count"].value == expected
+
+
+def test_predict_reports_stage_timings_and_failures(client, monkeypatch):
+    app.prediction_cache.clear()
+    body = client.get("/predict?lat=-12.5&lng=130.8").get_json()
+    assert body["cached"] is False and sorted(body["timings_ms"]) == sorted(STAGES)
+    assert all(ms >= 0 for ms in body["timings_ms"].values())
+    assert client.get("/predict?lat=-12.5&lng=130.8").get_json()["cached"] is True
+
+    def broken(hazard, *args, **kwargs):
+        if hazard == "flood":
+            raise RuntimeError("flood index unavailable")
+        return 0
+
+    monkeypatch.setattr(app.predictor, "count_nearby", broken)
+    stages = app.run_prediction_stages(1.0, 2.0)
+    assert not stages["flood_count"].ok and "flood index unavailable" in str(stages["flood_count"].error)
+    assert all(stages[name].ok for name in STAGES if name != "flood_count")
+
+    monkeypatch.setattr(app, "safe_predict_proba", lambda model, X: 1 / 0)
+    app.prediction_cache.clear()
+    response = client.get("/predict?lat=3&lng=4")
+    assert response.status_code == 500 and response.get_json()["error"].startswith("Earthquake model error")
@@ -0,0 +1,104 @@
+"""
+Tests for the binary catalog format in catalog_store.py.
+Run with: pytest test_catalog_store.py
+"""
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from catalog_store import EventCatalog, binary_path, convert_csv, is_stale, load_catalog
+from spatial_index import SpatialIndex
+
+CSV = "latitude,longitude,magnitude,Fires,place\n10.5,20.25,5.5,\"1,200\",a\n-3.0,170.0,6.1,300,b\n"
+
+
+def _make_csv(directory, text=CSV):
+    path = os.path.join(directory, "events.csv")
+    with open(path, "w") as f:
+        f.write(text)
+    return path
+
+
+def test_roundtrip_is_memory_mapped_float32():
+    with tempfile.TemporaryDirectory() as d:
+        csv_path = _make_csv(d)
+        convert_csv(csv_path)
+        catalog = load_catalog(csv_path)
+        assert catalog.source == "binary"
+        assert len(catalog) == 2 and not catalog.empty
+        assert catalog.columns == ["latitude", "longitude", "magnitude", "Fires"]
+        assert isinstance(catalog["latitude"], np.memmap)
+        assert catalog["latitude"].dtype == np.float32
+        np.testing.assert_array_equal(catalog["Fires"], np.array([1200, 300], dtype=np.float32))
+        assert SpatialIndex.from_dataframe(catalog).count_within(10.5, 20.25, 1) == 1
+        del catalog
+
+
+def test_stale_binary_falls_back_to_csv():
+    with tempfile.TemporaryDirectory() as d:
+        csv_path = _make_csv(d)
+        convert_csv(csv_path)
+        assert not is_stale(binary_path(csv_path), csv_path)
+
+        _make_csv(d, CSV + "1.0,2.0,4.0,10,c\n")
+        assert is_stale(binary_path(csv_path), csv_path)
+        catalog = load_catalog(csv_path)
+        assert catalog.source == "csv" and len(catalog) == 3
+
+        catalog = load_catalog(csv_path, convert=True)
+        assert catalog.source == "binary" and len(catalog) == 3
+        del catalog
+
+
+def test_missing_binary_and_empty_catalog():
+    with tempfile.TemporaryDirectory() as d:
+        csv_path = _make_csv(d, "latitude,longitude\n")
+        assert load_catalog(csv_path).empty
+        convert_csv(csv_path)
+        catalog = load_catalog(csv_path)
+        assert catalog.source == "binary" and catalog.empty and len(catalog["latitude"]) == 0
+
+
+def test_shipped_catalogs_match_csv():
+    root = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as d:
+        csv_path = shutil.copy2(os.path.join(root, "earthquakes.csv"), d)
+        from_csv = load_catalog(csv_path)
+        convert_csv(csv_path)
+        from_binary = load_catalog(csv_path)
+        assert from_binary.columns == from_csv.columns
+        for name in from_csv.columns:
+            np.testing.assert_array_equal(from_binary[name], from_csv[name].astype(np.float32))
+        del from_binary
+
+
+def test_csv_fallback_keeps_float64():
+    with tempfile.TemporaryDirectory() as d:
+        catalog = load_catalog(_make_csv(d, CSV + "0.1,0.2,4.123456789,7,c\n"))
+        assert catalog.source == "csv" and catalog["magnitude"].dtype == np.float64
+        np.testing.assert_array_equal(catalog["magnitude"], [5.5, 6.1, 4.123456789])
+        grown = catalog.appended({"latitude": [1.0], "magnitude": [0.1]}, 1).compacted()
+        assert grown["magnitude"].dtype == np.float64 and grown["magnitude"][-1] == 0.1
+
+
+def test_appended_rows_are_buffered_until_compacted():
+    with tempfile.TemporaryDirectory() as d:
+        csv_path = _make_csv(d)
+        convert_csv(csv_path)
+        catalog = load_catalog(csv_path)
+        grown = catalog.appended({"latitude": [1.0], "longitude": [2.0], "magnitude": [7.0]}, 1)
+        grown = grown.appended({"latitude": [3.0, 4.0], "longitude": [5.0, 6.0], "Fires": [9, 8]}, 2)
+        assert len(catalog) == 2 and len(grown) == 5 and grown.pending_rows == 3
+        # The mapped columns are shared, not copied
+        assert grown._columns["latitude"] is catalog["latitude"]
+        np.testing.assert_array_equal(grown["latitude"], [10.5, -3.0, 1.0, 3.0, 4.0])
+        np.testing.assert_array_equal(grown["magnitude"], np.array([5.5, 6.1, 7.0, np.nan, np.nan], dtype=np.float32))
+        np.testing.assert_array_equal(grown["Fires"], [1200, 300, np.nan, 9, 8])
+        compacted = grown.compacted()
+        assert compacted.pending_rows == 0 and len(compacted) == 5
+        assert not isinstance(compacted["latitude"], np.memmap)
+        for name in grown.columns:
+            np.testing.assert_array_equal(compacted[name], grown[name])
+        del catalog, grown
@@ -0,0 +1,116 @@
+"""
+Parity tests for the fast inference engines in fast_inference.py.
+Run with: pytest test_fast_inference.py
+"""
+import os
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from fast_inference import CompiledForest, FusedLogistic, get_engine
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+
+def _load(name):
+    with open(os.path.join(MODEL_DIR, name), "rb") as f:
+        return pickle.load(f)
+
+
+def _random_inputs(n_features, n_rows=500, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(-180, 180, size=(n_rows, n_features))
+    X[:, 0] = rng.uniform(-90, 90, size=n_rows)
+    return X
+
+
+def test_forest_matches_sklearn_on_fitted_forest():
+    rng = np.random.default_rng(42)
+    X = rng.normal(size=(400, 2))
+    y = (X[:, 0] * X[:, 1] > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=50, random_state=42).fit(X, y)
+
+    engine = CompiledForest.from_sklearn(model)
+    Xq = rng.normal(size=(300, 2))
+    np.testing.assert_allclose(engine.predict_proba(Xq), model.predict_proba(Xq), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(engine.predict_proba(Xq[:1]), model.predict_proba(Xq[:1]), rtol=0, atol=1e-12)
+
+
+def test_forest_matches_sklearn_on_thresholds():
+    # Points exactly on split thresholds must take the same branch as sklearn
+    model = _load("earthquake_model.pkl")
+    engine = CompiledForest.from_sklearn(model)
+    thresholds = model.estimators_[0].tree_.threshold[model.estimators_[0].tree_.feature >= 0]
+    X = _random_inputs(model.n_features_in_, n_rows=len(thresholds))
+    X[:, 0] = thresholds
+    np.testing.assert_allclose(engine.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+
+
+def test_shipped_forest_models_match_sklearn():
+    for name in ("earthquake_model.pkl", "wildfire_model.pkl"):
+        model = _load(name)
+        engine = get_engine(model)
+        assert engine is not None, name
+        X = _random_inputs(model.n_features_in_)
+        np.testing.assert_allclose(engine.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-12)
+
+
+def test_fused_logistic_matches_pipeline():
+    # Same shape as trainfloodmodel.py: StandardScaler + LogisticRegression on lat/lon
+    rng = np.random.default_rng(7)
+    X = np.column_stack([rng.uniform(-90, 90, 600), rng.uniform(-180, 180, 600)])
+    y = (X[:, 0] + 0.3 * X[:, 1] + rng.normal(scale=20, size=600) > 0).astype(int)
+    model = Pipeline([
+        ('scaler', StandardScaler()),
+        ('logreg', LogisticRegression(max_iter=2000))
+    ]).fit(X, y)
+
+    engine = get_engine(model)
+    assert isinstance(engine, FusedLogistic)
+    Xq = np.column_stack([rng.uniform(-90, 90, 1000), rng.uniform(-180, 180, 1000)])
+    np.testing.assert_allclose(engine.predict_proba(Xq), model.predict_proba(Xq), rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(engine.predict_proba(Xq[:1]), model.predict_proba(Xq[:1]), rtol=1e-12, atol=1e-12)
+
+
+def test_fused_logistic_honours_scaler_options():
+    rng = np.random.default_rng(11)
+    X = np.column_stack([rng.uniform(10, 90, 600), rng.uniform(-180, 180, 600)])
+    y = (X[:, 0] - 50 + 0.2 * X[:, 1] + rng.normal(scale=10, size=600) > 0).astype(int)
+    Xq = np.column_stack([rng.uniform(10, 90, 500), rng.uniform(-180, 180, 500)])
+    for options in ({"with_mean": False}, {"with_std": False}, {"with_mean": False, "with_std": False}):
+        model = Pipeline([
+            ('scaler', StandardScaler(**options)),
+            ('logreg', LogisticRegression(max_iter=5000))
+        ]).fit(X, y)
+        engine = get_engine(model)
+        assert isinstance(engine, FusedLogistic), options
+        np.testing.assert_allclose(engine.predict_proba(Xq), model.predict_proba(Xq), rtol=1e-10, atol=1e-12,
+                                   err_msg=str(options))
+
+
+@pytest.mark.filterwarnings("ignore::FutureWarning")  # multi_class is deprecated in newer sklearn
+def test_fused_logistic_matches_binary_multinomial():
+    rng = np.random.default_rng(12)
+    X = np.column_stack([rng.uniform(10, 90, 600), rng.uniform(-180, 180, 600)])
+    y = (X[:, 0] - 50 + 0.2 * X[:, 1] + rng.normal(scale=10, size=600) > 0).astype(int)
+    Xq = np.column_stack([rng.uniform(10, 90, 500), rng.uniform(-180, 180, 500)])
+    for model in (LogisticRegression(multi_class='multinomial', max_iter=5000),
+                  Pipeline([('scaler', StandardScaler()),
+                            ('logreg', LogisticRegression(multi_class='multinomial', max_iter=5000))])):
+        model.fit(X, y)
+        engine = get_engine(model)
+        assert isinstance(engine, FusedLogistic)
+        np.testing.assert_allclose(engine.predict_proba(Xq), model.predict_proba(Xq), rtol=1e-10, atol=1e-12)
+
+
+def test_shipped_flood_model_matches_sklearn():
+    model = _load("flood_model.pkl")
+    engine = get_engine(model)
+    assert isinstance(engine, FusedLogistic)
+    X = _random_inputs(model.n_features_in_)
+    np.testing.assert_allclose(engine.predict_proba(X), model.predict_proba(X), rtol=1e-12, atol=1e-12)
@@ -0,0 +1,109 @@
+"""
+Tests for the compiled feature plans in feature_plan.py.
+Run with: pytest test_feature_plan.py
+"""
+import os
+import pickle
+import shutil
+import tempfile
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_defaults import FeatureDefaultsStore
+from feature_plan import FeaturePlan, FeaturePlanRegistry
+from predictor import DisasterPredictor
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _baseline_defaults():
+    """Feature defaults the way the old per-request build_model_input computed them"""
+    earthquakes = pd.read_csv(os.path.join(ROOT, "earthquakes.csv"))
+    floods = pd.read_csv(os.path.join(ROOT, "floods.csv"))
+    wildfires = pd.read_csv(os.path.join(ROOT, "wildfires.csv"))
+    fires_col = next(c for c in wildfires.columns if c.lower() == "fires")
+    fires = pd.to_numeric(wildfires[fires_col].astype(str).str.replace(",", ""), errors="coerce")
+    if "rainfall" in floods.columns:
+        rainfall = floods["rainfall"].mean()
+    elif "Rainfall" in floods.columns:
+        rainfall = floods["Rainfall"].mean()
+    else:
+        rainfall = floods["FloodProbability"].mean() * 2
+    return {"magnitude": earthquakes["magnitude"].mean(), "depth": earthquakes["depth"].mean(),
+            "rainfall": rainfall, "fires": fires.mean()}
+
+
+def _baseline_input(model, lat, lng, defaults):
+    """The DataFrame row the old build_model_input built"""
+    feat_names = getattr(model, "feature_names_in_", None)
+    if feat_names is None:
+        return pd.DataFrame([[lat, lng]], columns=["lat", "lon"])
+    row = []
+    for name in feat_names:
+        n_low = str(name).lower()
+        if n_low in ("lat", "latitude"):
+            row.append(lat)
+        elif n_low in ("lon", "lng", "longitude"):
+            row.append(lng)
+        else:
+            row.append(defaults.get(n_low, 0.0))
+    return pd.DataFrame([row], columns=list(feat_names))
+
+
+def _store(version="v1"):
+    store = FeatureDefaultsStore()
+    frames = [pd.read_csv(os.path.join(ROOT, name)) for name in ("earthquakes.csv", "floods.csv", "wildfires.csv")]
+    store.refresh(version, *frames)
+    return store
+
+
+@pytest.mark.parametrize("hazard", ["earthquake", "flood", "wildfire"])
+def test_plans_match_the_old_model_input_for_shipped_models(hazard):
+    with open(os.path.join(ROOT, "models", f"{hazard}_model.pkl"), "rb") as f:
+        model = pickle.load(f)
+    plan = FeaturePlanRegistry(_store()).get(model)
+    defaults = _baseline_defaults()
+    lats, lons = np.array([20.59, -33.87, 0.0]), np.array([78.96, 151.21, -179.5])
+    matrix = plan.fill(lats, lons)
+    for i, (lat, lon) in enumerate(zip(lats, lons)):
+        expected = _baseline_input(model, lat, lon, defaults)
+        assert plan.columns == tuple(expected.columns)
+        np.testing.assert_allclose(matrix[i], expected.to_numpy(dtype=float)[0], rtol=1e-12)
+        np.testing.assert_array_equal(plan.row(lat, lon), matrix[i:i + 1])
+
+
+def test_feature_names_match_case_insensitively_and_unknown_features_get_zero():
+    model = SimpleNamespace(feature_names_in_=np.array(["LAT", "Lng", "FIRES", "Magnitude", "mystery"]))
+    defaults = _store().current
+    plan = FeaturePlan.compile(model, defaults)
+    np.testing.assert_array_equal(plan.row(1.5, -2.5), [[1.5, -2.5, defaults["fires"], defaults["magnitude"], 0.0]])
+    assert [d["source"] for d in plan.describe()] == ["lat", "lon", "const", "const", "const"]
+    assert plan.slots("fires").tolist() == [2] and plan.slots("Mystery").tolist() == [4]
+    assert plan.slots("rainfall").tolist() == []
+    # No recorded names: fitted on lat/lon
+    assert FeaturePlan.compile(SimpleNamespace(), defaults).columns == ("lat", "lon")
+
+
+def test_registry_recompiles_when_defaults_change():
+    store = _store()
+    registry = FeaturePlanRegistry(store)
+    model = SimpleNamespace(feature_names_in_=np.array(["latitude", "longitude", "rainfall"]))
+    plan = registry.get(model)
+    assert registry.get(model) is plan
+    store.extend("v2", "flood", {"rainfall": np.array([1e6])})
+    updated = registry.get(model)
+    assert updated is not plan and updated.template[2] > plan.template[2]
+
+
+def test_defaults_from_csv_catalogs_match_the_pandas_means():
+    with tempfile.TemporaryDirectory() as d:
+        for name in ("earthquakes.csv", "floods.csv", "wildfires.csv"):
+            shutil.copy2(os.path.join(ROOT, name), d)
+        predictor = DisasterPredictor(catalog_dir=d)
+        assert {c.source for c in predictor.catalogs.values()} == {"csv"}
+        defaults = predictor.feature_defaults.current
+        for name, expected in _baseline_defaults().items():
+            np.testing.assert_allclose(defaults[name], expected, rtol=1e-12, err_msg=name)
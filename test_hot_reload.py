@@ -0,0 +1,58 @@
+"""
+Tests for the background reloader in hot_reload.py.
+Run with: pytest test_hot_reload.py
+"""
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+from hot_reload import ModelReloader
+
+
+class _Predictor(SimpleNamespace):
+    """Just what ModelReloader reads from a DisasterPredictor"""
+
+    def __init__(self, directory, version):
+        super().__init__(hazards=("flood",), loader=SimpleNamespace(model_dir=directory),
+                         catalog_paths={"flood": os.path.join(directory, "floods.csv")}, version=version)
+
+
+def _touch(path, content="x"):
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_watcher_swaps_in_new_version_after_files_settle():
+    with tempfile.TemporaryDirectory() as d:
+        _touch(os.path.join(d, "flood_model.pkl"))
+        builds, swapped = [], []
+
+        def build():
+            builds.append(time.monotonic())
+            return _Predictor(d, f"v{len(builds) + 1}")
+
+        reloader = ModelReloader(build, swapped.append, _Predictor(d, "v1"), interval=0.05)
+        reloader.ensure_started()
+        try:
+            _touch(os.path.join(d, "flood_model.pkl"), "retrained")
+            deadline = time.monotonic() + 5
+            while not swapped and time.monotonic() < deadline:
+                time.sleep(0.02)
+        finally:
+            reloader.stop()
+        assert [p.version for p in swapped] == ["v2"]
+        assert reloader.stats()["version"] == "v2" and reloader.stats()["reloads"] == 1
+
+
+def test_failed_build_keeps_current_version():
+    with tempfile.TemporaryDirectory() as d:
+        swapped = []
+
+        def build():
+            raise ValueError("corrupt pickle")
+
+        reloader = ModelReloader(build, swapped.append, _Predictor(d, "v1"), interval=0)
+        result = reloader.reload()
+        assert not result["reloaded"] and "corrupt pickle" in result["error"]
+        assert swapped == [] and reloader.version == "v1" and reloader.stats()["failures"] == 1
@@ -0,0 +1,89 @@
+"""
+Tests for incremental event ingestion (ingest.py, SpatialIndex deltas).
+Run with: pytest test_ingest.py
+"""
+import json
+import os
+import tempfile
+
+import numpy as np
+import pytest
+
+from feature_defaults import compute_feature_defaults
+from ingest import EventIngestor, parse_events
+from predictor import DisasterPredictor
+from spatial_index import SpatialIndex
+
+
+def test_delta_and_compaction_count_like_a_rebuilt_index():
+    rng = np.random.default_rng(1)
+    base, extra = rng.uniform(-80, 80, (3000, 2)), rng.uniform(-80, 80, (500, 2))
+    extra[3] = np.nan
+    index = SpatialIndex(base[:, 0], base[:, 1])
+    grown = index.with_points(extra[:200, 0], extra[:200, 1]).with_points(extra[200:, 0], extra[200:, 1])
+    rebuilt = SpatialIndex(np.r_[base[:, 0], extra[:, 0]], np.r_[base[:, 1], extra[:, 1]])
+    queries = rng.uniform(-80, 80, (100, 2))
+    expected = rebuilt.count_within_many(queries[:, 0], queries[:, 1], 500)
+    for candidate in (grown, grown.compacted()):
+        assert (candidate.count_within_many(queries[:, 0], queries[:, 1], 500) == expected).all()
+        assert [candidate.count_within(lat, lon, 500) for lat, lon in queries] == list(expected)
+    assert len(index) == 3000 and grown.delta_size == 499 and grown.compacted().delta_size == 0
+
+
+def _catalogs(directory):
+    for name, text in (("earthquakes.csv", "latitude,longitude,magnitude,depth\n10,10,5,10\n"),
+                       ("floods.csv", "latitude,longitude,rainfall\n10,10,100\n"),
+                       ("wildfires.csv", "Year,Fires\n2020,100\n")):
+        with open(os.path.join(directory, name), "w") as f:
+            f.write(text)
+
+
+def test_api_and_drop_directory_events_reach_counts_and_replay():
+    with tempfile.TemporaryDirectory() as d:
+        _catalogs(d)
+        drop = os.path.join(d, "ingest")
+        predictor = DisasterPredictor(catalog_dir=d)
+        ingestor = EventIngestor(lambda: predictor, directory=drop, interval=0, settle=0)
+        version = predictor.version
+        geojson = {"type": "FeatureCollection", "features": [
+            {"type": "Feature", "properties": {"mag": 6.0}, "geometry": {"type": "Point", "coordinates": [-150, -60, 5]}},
+            {"type": "Feature", "properties": {}, "geometry": {"type": "Point", "coordinates": [-150, 95]}}]}
+        result = ingestor.submit("earthquake", parse_events(geojson))
+        assert (result["accepted"], result["rejected"]) == (1, 1)
+        assert predictor.count_nearby("earthquake", -60, -150) == 1 and predictor.version != version
+        assert predictor.catalogs["earthquake"]["magnitude"][-1] == 6.0
+        assert predictor.catalogs["earthquake"]["depth"][-1] == 5.0
+
+        os.makedirs(os.path.join(drop, "flood"))
+        with open(os.path.join(drop, "flood", "batch.json"), "w") as f:
+            json.dump([{"lat": -60.1, "lng": -150.1, "Rainfall": "1,000"}], f)
+        assert ingestor.sync() == 1 and ingestor.sync() == 0
+        assert predictor.count_nearby("flood", -60, -150) == 1
+        assert predictor.feature_defaults.current.values["rainfall"] == 550
+
+        # A freshly built predictor (hot reload) replays both files
+        fresh = DisasterPredictor(catalog_dir=d)
+        assert ingestor.sync(fresh) == 2
+        assert fresh.count_nearby_many("earthquake", [-60], [-150])[0] == 1
+        assert fresh.compact() == 2 and fresh.count_nearby("flood", -60, -150) == 1
+
+
+def test_feature_defaults_track_ingested_rows_incrementally():
+    with tempfile.TemporaryDirectory() as d:
+        _catalogs(d)
+        predictor = DisasterPredictor(catalog_dir=d, compact_rows=10 ** 6)
+        rng = np.random.default_rng(2)
+        for size in (3, 1, 5):
+            magnitude = rng.uniform(4, 8, size)
+            magnitude[0] = np.nan
+            lat, lon = rng.uniform(-60, 60, (2, size))
+            predictor.ingest("earthquake", {"latitude": lat, "longitude": lon, "magnitude": magnitude}, size)
+        predictor.ingest("flood", {"latitude": [1.0], "longitude": [1.0], "rainfall": [300.0]}, 1)
+        catalogs = predictor.catalogs
+        assert catalogs["earthquake"].pending_rows == 9
+        expected = compute_feature_defaults(catalogs["earthquake"], catalogs["flood"], catalogs["wildfire"])
+        for name, value in expected.items():
+            assert predictor.feature_defaults.current.values[name] == pytest.approx(value), name
+        assert predictor.feature_defaults.current.values["rainfall"] == 200
+        assert predictor.compact() == 10 and catalogs is predictor.catalogs
+        assert predictor.catalogs["earthquake"].pending_rows == 0 and len(predictor.catalogs["earthquake"]) == 10
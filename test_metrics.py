@@ -0,0 +1,44 @@
+"""
+Tests for the Prometheus text exposition in metrics.py.
+Run with: pytest test_metrics.py
+"""
+from metrics import Registry
+
+
+def test_counter_renders_help_type_and_labelled_samples():
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests", ("endpoint", "status"))
+    counter.inc(endpoint="/predict", status=200)
+    counter.inc(2, endpoint="/predict", status=200)
+    counter.inc(endpoint='say "hi"\\', status=500)
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{endpoint="/predict",status="200"} 3',
+        'requests_total{endpoint="say \\"hi\\"\\\\",status="500"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative_with_sum_and_count():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, stage="count")
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{stage="count",le="0.1"} 2',
+        'latency_seconds_bucket{stage="count",le="1"} 3',
+        'latency_seconds_bucket{stage="count",le="+Inf"} 4',
+        'latency_seconds_sum{stage="count"} 3.65',
+        'latency_seconds_count{stage="count"} 4',
+    ]
+
+
+def test_collectors_are_read_at_scrape_time_and_failures_skipped():
+    registry = Registry()
+    depth = [0]
+    registry.add_collector(lambda: [("queue_depth", "gauge", "Queued", depth[0])])
+    registry.add_collector(lambda: 1 / 0)
+    depth[0] = 7
+    assert registry.render() == "# HELP queue_depth Queued\n# TYPE queue_depth gauge\nqueue_depth 7\n"
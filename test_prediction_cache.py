@@ -0,0 +1,49 @@
+"""
+Tests for the quantized /predict cache in prediction_cache.py.
+Run with: pytest test_prediction_cache.py
+"""
+import prediction_cache
+from prediction_cache import PredictionCache
+
+
+def test_keys_quantize_coordinates_and_include_the_version():
+    cache = PredictionCache(precision=3)
+    assert cache.key(20.12341, 78.96049, "v1") == cache.key(20.1234, 78.9605, "v1")
+    assert cache.key(20.1234, 78.9605, "v1") != cache.key(20.1244, 78.9605, "v1")
+    assert cache.key(20.1234, 78.9605, "v1") != cache.key(20.1234, 78.9605, "v2")
+    cache.put(cache.key(1, 2, "v1"), "old")
+    assert cache.get(cache.key(1, 2, "v2")) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats["size"], stats["evictions"], stats["hits"], stats["misses"]) == (2, 1, 3, 1)
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(prediction_cache.time, "monotonic", lambda: now[0])
+    cache = PredictionCache(ttl=300)
+    cache.put("k", "v")
+    now[0] += 299
+    assert cache.get("k") == "v"
+    now[0] += 2
+    assert cache.get("k") is None
+    assert len(cache) == 0 and cache.stats()["expirations"] == 1
+
+
+def test_disabled_cache_and_clear():
+    disabled = PredictionCache(maxsize=0)
+    disabled.put("k", "v")
+    assert disabled.get("k") is None and len(disabled) == 0 and not disabled.stats()["enabled"]
+    cache = PredictionCache()
+    cache.put("k", "v")
+    cache.get("k")
+    cache.clear()
+    assert cache.get("k") is None and cache.stats()["hits"] == 1
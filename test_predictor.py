@@ -0,0 +1,42 @@
+"""
+Tests for the shared DisasterPredictor in predictor.py.
+Run with: pytest test_predictor.py
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from predictor import DisasterPredictor, default_predictor
+
+
+def test_batch_matches_single_point():
+    predictor = default_predictor()
+    lats, lons = np.array([20.59, -33.9, 64.1]), np.array([78.96, 151.2, -21.9])
+    batch = predictor.predict_batch(lats, lons)
+    for i, (lat, lon) in enumerate(zip(lats, lons)):
+        for name, value in predictor.predict(lat, lon).items():
+            assert batch[name][i] == value, name
+
+
+def test_feature_values_override_defaults():
+    predictor = DisasterPredictor(load_catalogs=False)
+    model = predictor.model("flood")
+    X = pd.DataFrame([[20.59, 78.96, 300.0]], columns=["latitude", "longitude", "rainfall"])
+    expected = model.predict_proba(X)[0][1] * 100
+    assert predictor.probability("flood", 20.59, 78.96, rainfall=300) == pytest.approx(expected)
+    rainfall = np.array([0.0, 300.0])
+    probs = predictor.probabilities("flood", [20.59, 20.59], [78.96, 78.96], rainfall=rainfall)
+    assert probs[1] == pytest.approx(expected)
+    with pytest.raises(ValueError):
+        predictor.probability("wildfire", 0, 0, rainfall=1)
+
+
+def test_multi_radius_counts_match_single_radius_counts():
+    predictor = default_predictor()
+    catalog = predictor.catalogs["earthquake"]
+    points = [(float(catalog["latitude"][i]), float(catalog["longitude"][i])) for i in range(0, len(catalog), 50)]
+    radii = [10, 50, 100, 250, 500, 2000]
+    for lat, lon in points + [(89.9, 0.0), (0.0, 179.9)]:
+        for hazard in predictor.hazards:
+            expected = [predictor.count_nearby(hazard, lat, lon, r) for r in radii]
+            assert predictor.count_nearby_radii(hazard, lat, lon, radii) == expected
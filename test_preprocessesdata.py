@@ -0,0 +1,67 @@
+"""
+Tests for the cached preprocessing pipeline in preprocessesdata.py.
+Run with: pytest test_preprocessesdata.py
+"""
+import os
+
+import pandas as pd
+import pytest
+
+import preprocessesdata as pp
+
+EARTHQUAKES = "latitude,longitude,magnitude,depth\n10,20,6.5,10\n11,21,4.0,5\n12,22,,7\n,23,7.0,1\n"
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    processed = tmp_path / "data" / "processed"
+    monkeypatch.setattr(pp, "base_path", str(tmp_path))
+    monkeypatch.setattr(pp, "processed_dir", str(processed))
+    monkeypatch.setattr(pp, "cache_dir", str(processed / ".cache"))
+    monkeypatch.setattr(pp, "manifest_path", str(processed / "manifest.json"))
+    (tmp_path / "earthquakes.csv").write_text(EARTHQUAKES)
+    return tmp_path
+
+
+def _run(force=False):
+    os.makedirs(pp.processed_dir, exist_ok=True)
+    manifest = pp.load_manifest()
+    status = pp.process_dataset("earthquakes", pp.DATASETS["earthquakes"], manifest, force=force)
+    pp.save_manifest(manifest)
+    return status, pd.read_csv(pp.processed_path("earthquakes"))
+
+
+def test_missing_magnitude_is_labelled_zero_not_dropped(project):
+    _, df = _run()
+    positives = df.iloc[:3]
+    assert positives[["lat", "lon"]].values.tolist() == [[10, 20], [11, 21], [12, 22]]
+    assert positives["label"].tolist() == [1, 0, 0]
+    assert len(df) == 6 and df["label"].sum() == 1
+
+
+def test_cache_hit_matches_a_fresh_run(project):
+    _, fresh = _run(force=True)
+    status, _ = _run()
+    assert "unchanged" in status
+    os.remove(pp.processed_path("earthquakes"))
+    status, cached = _run()
+    assert "ran nothing" in status and "reused negatives" in status
+    pd.testing.assert_frame_equal(cached, fresh)
+
+
+def test_changed_raw_file_or_parameters_invalidate_the_cache(project, monkeypatch):
+    _, before = _run()
+    with open(project / "earthquakes.csv", "a") as f:
+        f.write("13,24,8.0,3\n")
+    status, after = _run()
+    assert "ran normalize, label, select, negatives" in status
+    assert len(after) == len(before) + 2 and after["label"].sum() == 2
+
+    spec = dict(pp.DATASETS["earthquakes"], negatives={"seed": 7, "margin": 5})
+    monkeypatch.setitem(pp.DATASETS, "earthquakes", spec)
+    status, reseeded = _run()
+    assert "ran negatives" in status and "reused select" in status
+    pd.testing.assert_frame_equal(reseeded.iloc[:4], after.iloc[:4])
+    assert not reseeded.iloc[4:].equals(after.iloc[4:])
+    # Only the current stage outputs stay in the cache
+    assert len(os.listdir(os.path.join(pp.cache_dir, "earthquakes"))) == 4
@@ -0,0 +1,96 @@
+"""
+Tests for the bulk scorer in score_file.py.
+Run with: pytest test_score_file.py
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from predictor import default_predictor
+from score_file import score_columns, score_file
+
+
+def _sites(directory, n=300):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"site_id": np.arange(n),
+                       "lat": rng.uniform(-80, 80, n).round(4),
+                       "lng": rng.uniform(-170, 170, n).round(4)})
+    df.loc[5, "lat"] = 120.0
+    df.loc[7, "lng"] = np.nan
+    path = os.path.join(directory, "sites.csv")
+    df.to_csv(path, index=False)
+    return path, df
+
+
+def _score_as_csv(df, directory):
+    path, out = os.path.join(directory, "sites.csv"), os.path.join(directory, "scored.csv")
+    df.to_csv(path, index=False)
+    score_file(path, out, workers=1)
+    return out
+
+
+def test_chunks_and_workers_give_the_same_output():
+    with tempfile.TemporaryDirectory() as d:
+        path, df = _sites(d)
+        inline = os.path.join(d, "inline.csv")
+        pooled = os.path.join(d, "pooled.csv")
+        assert score_file(path, inline, workers=1, chunk_rows=1000) == len(df)
+        assert score_file(path, pooled, workers=2, chunk_rows=70, keep=["site_id"]) == len(df)
+        a, b = pd.read_csv(inline), pd.read_csv(pooled)
+        assert list(b["site_id"]) == list(df["site_id"])
+        pd.testing.assert_frame_equal(a.drop(columns=["lat", "lng"]), b)
+        assert a.loc[5, "error"] == "Latitude must be between -90 and 90"
+        assert a.loc[7, "error"].startswith("Missing") and np.isnan(a.loc[7, "earthquake_probability"])
+        assert not os.path.exists(pooled + ".tmp")
+
+
+def test_scores_match_single_point_predictions():
+    with tempfile.TemporaryDirectory() as d:
+        path, df = _sites(d, 50)
+        out = os.path.join(d, "out.csv")
+        score_file(path, out, workers=1)
+        scored = pd.read_csv(out).drop(index=[5, 7])
+        predictor = default_predictor()
+        for row in scored.itertuples():
+            expected = predictor.predict(row.lat, row.lng)
+            for name, value in expected.items():
+                assert getattr(row, name) == value, name
+
+
+def test_header_only_csv_gives_header_only_output():
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "empty.csv")
+        with open(path, "w") as f:
+            f.write("site_id,lat,lng\n")
+        out = os.path.join(d, "out.csv")
+        assert score_file(path, out, workers=1) == 0
+        assert list(pd.read_csv(out).columns) == ["site_id", "lat", "lng"] + score_columns()
+
+
+def test_parquet_chunks_with_null_only_columns_share_one_schema():
+    pytest.importorskip("pyarrow")
+    with tempfile.TemporaryDirectory() as d:
+        # First chunk all valid (error all None), second all invalid (risk_level all None)
+        df = pd.DataFrame({"site_id": np.arange(9), "note": [None] * 9,
+                           "lat": [10, 20, 30, 95, 96, 97, 40, 50, 120],
+                           "lng": [10.5, 20.5, 30.5, 0, 0, 0, 40.5, np.nan, 0]})
+        path = os.path.join(d, "sites.parquet")
+        df.to_parquet(path, index=False)
+        out = os.path.join(d, "scored.parquet")
+        assert score_file(path, out, workers=1, chunk_rows=3) == 9
+        scored = pd.read_parquet(out)
+        expected = pd.read_csv(_score_as_csv(df, d))
+        assert list(scored.columns) == list(expected.columns)
+        assert scored["error"].tolist()[:3] == [None] * 3
+        assert scored["risk_level"].tolist()[3:6] == [None] * 3
+        np.testing.assert_allclose(scored["max_probability"], expected["max_probability"])
+        for name in ("earthquake_count", "flood_count", "wildfire_count"):
+            assert scored[name].fillna(-1).astype(int).tolist() == expected[name].fillna(-1).astype(int).tolist()
+
+        empty = os.path.join(d, "empty.parquet")
+        df.iloc[:0].to_parquet(empty, index=False)
+        assert score_file(empty, out, workers=1) == 0
+        assert len(pd.read_parquet(out)) == 0
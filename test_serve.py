@@ -0,0 +1,89 @@
+"""
+Tests for the pre-fork helpers in serve.py.
+Run with: pytest test_serve.py
+"""
+import importlib
+import os
+import sys
+import threading
+import types
+
+import pytest
+
+os.environ.setdefault("MODEL_RELOAD_INTERVAL", "0")
+os.environ.setdefault("INGEST_INTERVAL", "0")
+
+import app  # noqa: E402
+import serve  # noqa: E402
+
+
+def test_warm_up_has_no_side_effects():
+    threads = {t.name for t in threading.enumerate()}
+    submitted = app.alert_dispatcher.stats()["submitted"]
+    cached = len(app.prediction_cache)
+    serve.warm_up(app)
+    assert {t.name for t in threading.enumerate()} <= threads
+    assert app.alert_dispatcher.stats()["submitted"] == submitted
+    assert len(app.prediction_cache) == cached
+
+
+FAKE_APP = """
+import os
+
+
+class Background:
+    stopped = False
+
+    def stop(self, *args, **kwargs):
+        self.stopped = True
+
+    shutdown = stop
+
+
+class Predictor:
+    def predict(self, lat, lng):
+        if os.environ.get("FAKE_APP_FAIL") == "warm-up":
+            raise RuntimeError("broken model")
+
+    predict_batch = predict
+
+
+model_reloader, event_ingestor = Background(), Background()
+alert_dispatcher, stage_pipeline = Background(), Background()
+WARM_UP_POINT = (20.59, 78.96)
+if os.environ.get("FAKE_APP_FAIL") == "import":
+    raise RuntimeError("broken app")
+predictor = Predictor()
+"""
+
+BACKGROUND = ("model_reloader", "event_ingestor", "alert_dispatcher", "stage_pipeline")
+
+
+def _restart(tmp_path, monkeypatch, fail=None):
+    (tmp_path / "fake_app.py").write_text(FAKE_APP)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "fake_app", raising=False)
+    monkeypatch.setattr(serve.gc, "freeze", lambda: None)
+    monkeypatch.delenv("FAKE_APP_FAIL", raising=False)
+    module = importlib.import_module("fake_app")
+    old = dict(vars(module))
+    if fail:
+        monkeypatch.setenv("FAKE_APP_FAIL", fail)
+    master = serve.Master(module, None, types.SimpleNamespace(graceful_timeout=1.0))
+    master.graceful_restart()
+    monkeypatch.delitem(sys.modules, "fake_app")
+    return master.app_module, old
+
+
+def test_graceful_restart_stops_the_old_background_work_after_warm_up(tmp_path, monkeypatch):
+    module, old = _restart(tmp_path, monkeypatch)
+    for name in BACKGROUND:
+        assert old[name].stopped, name
+        assert getattr(module, name) is not old[name] and not getattr(module, name).stopped
+
+
+@pytest.mark.parametrize("fail", ["import", "warm-up"])
+def test_failed_reload_keeps_the_old_module_running(tmp_path, monkeypatch, fail):
+    module, old = _restart(tmp_path, monkeypatch, fail)
+    assert vars(module) == old
+    assert not any(old[name].stopped for name in BACKGROUND)
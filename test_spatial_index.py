@@ -0,0 +1,56 @@
+"""
+Tests for the latitude-band radius counts in spatial_index.py.
+Run with: pytest test_spatial_index.py
+"""
+from math import atan2, cos, radians, sin, sqrt
+
+import numpy as np
+
+from spatial_index import SpatialIndex
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    """The per-row distance the index replaced"""
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    return 6371 * 2 * atan2(sqrt(a), sqrt(1 - a))
+
+
+def _brute_count(lats, lons, lat, lon, radius_km):
+    return sum(1 for p_lat, p_lon in zip(lats, lons)
+               if not (np.isnan(p_lat) or np.isnan(p_lon)) and _haversine(lat, lon, p_lat, p_lon) <= radius_km)
+
+
+def _points(rng):
+    lats = np.concatenate([rng.uniform(-90, 90, 800),
+                           rng.uniform(-30, 30, 200),       # straddling the dateline
+                           rng.uniform(85, 90, 100),        # around the poles
+                           rng.uniform(-90, -85, 100)])
+    lons = np.concatenate([rng.uniform(-180, 180, 800),
+                           rng.choice([-1, 1], 200) * rng.uniform(178, 180, 200),
+                           rng.uniform(-180, 180, 200)])
+    lats[::97] = np.nan
+    return lats, lons
+
+
+def test_counts_match_a_brute_force_haversine_scan():
+    rng = np.random.default_rng(5)
+    lats, lons = _points(rng)
+    queries = [(0.0, 180.0), (0.0, -180.0), (10.0, 179.95), (-10.0, -179.95), (90.0, 0.0), (-90.0, 45.0),
+               (89.5, -120.0), (-88.0, 179.0), (45.0, 0.0)] + \
+        [(float(a), float(b)) for a, b in zip(rng.uniform(-90, 90, 15), rng.uniform(-180, 180, 15))]
+    q_lats, q_lons = np.array(queries).T
+    # The largest radius spans more than any latitude band (and half the globe)
+    radii = [25, 300, 2500, 12000, 25000]
+
+    base = SpatialIndex(lats[:900], lons[:900])
+    grown = base.with_points(lats[900:], lons[900:])
+    for index in (SpatialIndex(lats, lons), grown, grown.compacted()):
+        for radius in radii:
+            expected = [_brute_count(lats, lons, lat, lon, radius) for lat, lon in queries]
+            assert [index.count_within(lat, lon, radius) for lat, lon in queries] == expected, radius
+            assert index.count_within_many(q_lats, q_lons, radius).tolist() == expected, radius
+            assert index.count_within_many(q_lats, q_lons, radius, chunk_candidates=50).tolist() == expected
+        by_radius = [index.count_within_radii(lat, lon, radii).tolist() for lat, lon in queries]
+        assert by_radius == [[_brute_count(lats, lons, lat, lon, r) for r in radii] for lat, lon in queries]
@@ -0,0 +1,43 @@
+"""
+Tests for the concurrent stage runner in stage_pipeline.py.
+Run with: pytest test_stage_pipeline.py
+"""
+import threading
+import time
+
+from stage_pipeline import StagePipeline
+
+
+def test_stages_run_concurrently_and_report_errors_per_stage():
+    pipeline = StagePipeline(max_workers=3)
+    barrier = threading.Barrier(2, timeout=5)  # only passes if both stages run at once
+
+    def meet(name):
+        def run():
+            barrier.wait()
+            return name
+        return run
+
+    def fail():
+        raise RuntimeError("model file corrupt")
+
+    try:
+        results = pipeline.run([("a", meet("a")), ("broken", fail), ("b", meet("b"))])
+    finally:
+        pipeline.shutdown()
+    assert list(results) == ["a", "broken", "b"]
+    assert (results["a"].value, results["b"].value) == ("a", "b") and results["a"].ok
+    assert not results["broken"].ok and results["broken"].value is None
+    assert isinstance(results["broken"].error, RuntimeError)
+    assert "model file corrupt" in results["broken"].traceback
+
+
+def test_inline_pipeline_gives_the_same_results_with_timings():
+    stages = [("sleep", lambda: time.sleep(0.02) or 1), ("square", lambda: 7 * 7)]
+    inline, pooled = StagePipeline(max_workers=1), StagePipeline(max_workers=2)
+    try:
+        a, b = inline.run(stages), pooled.run(stages)
+    finally:
+        pooled.shutdown()
+    assert {n: r.value for n, r in a.items()} == {n: r.value for n, r in b.items()} == {"sleep": 1, "square": 49}
+    assert a["sleep"].elapsed_ms >= 15 and b["sleep"].elapsed_ms >= 15
@@ -0,0 +1,58 @@
+"""
+Tests for the parallel training driver in train_all.py.
+Run with: pytest test_train_all.py
+"""
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import train_all
+
+
+def test_core_budgets_never_oversubscribe():
+    names = ["earthquake", "flood", "wildfire"]
+    assert train_all.core_budgets(names, {}, total=8) == {"earthquake": 4, "flood": 1, "wildfire": 3}
+    assert train_all.core_budgets(names, {}, total=3) == {"earthquake": 1, "flood": 1, "wildfire": 1}
+    for total in (1, 2):
+        assert train_all.core_budgets(names, {}, total=total) == {"earthquake": 1, "flood": 1, "wildfire": 1}
+        assert train_all.worker_count(names, total=total) == total
+    assert train_all.core_budgets(names, {"wildfire": 2}, total=8) == {"earthquake": 5, "flood": 1, "wildfire": 2}
+    assert train_all.worker_count(names, total=8) == 3
+
+
+def test_write_atomic_keeps_the_old_file_on_failure(tmp_path):
+    path = str(tmp_path / "model.pkl")
+    train_all.write_atomic({"version": 1}, path)
+    with pytest.raises(Exception):
+        train_all.write_atomic(lambda: None, path)  # not picklable
+    with open(path, "rb") as f:
+        assert pickle.load(f) == {"version": 1}
+    assert os.listdir(tmp_path) == ["model.pkl"]
+
+
+def test_training_writes_models_and_merges_the_manifest(tmp_path, monkeypatch):
+    processed = tmp_path / "processed"
+    processed.mkdir()
+    rng = np.random.default_rng(0)
+    lat, lon = rng.uniform(-50, 50, 200), rng.uniform(-50, 50, 200)
+    for name in ("earthquakes.csv", "floods.csv"):
+        pd.DataFrame({"lat": lat, "lon": lon, "label": (lat > 0).astype(int)}).to_csv(processed / name, index=False)
+    monkeypatch.setattr(train_all, "base_path", str(tmp_path))
+    monkeypatch.setattr(train_all, "processed_dir", str(processed))
+    monkeypatch.setattr(train_all, "array_cache_dir", str(processed / ".cache"))
+    models = tmp_path / "models"
+
+    assert train_all.main(["flood", "--model-dir", str(models)]) == 0
+    assert train_all.main(["earthquake", "wildfire", "--sequential", "--model-dir", str(models)]) == 1
+    with open(models / "manifest.json") as f:
+        manifest = json.load(f)
+    assert sorted(manifest["models"]) == ["earthquake", "flood"]  # wildfire had no data
+    for name, entry in manifest["models"].items():
+        assert entry["sha256"] == train_all.file_hash(models / f"{name}_model.pkl")
+        assert entry["data_sha256"] == train_all.file_hash(processed / f"{name}s.csv")
+        assert entry["rows"] == 200 and entry["accuracy"] > 0.9
+    assert sorted(os.listdir(models)) == ["earthquake_model.pkl", "flood_model.pkl", "manifest.json"]
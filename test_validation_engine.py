@@ -0,0 +1,72 @@
+"""
+Tests for the chunked validator in validation_engine.py.
+Run with: pytest test_validation_engine.py
+"""
+import csv
+import os
+import tempfile
+from datetime import datetime
+
+from validation_engine import Rule, Schema, iter_errors, validate_rows
+
+NUMBERS = ["", " 7 ", "-3", "+1_000", "1__0", "_1", "1.5", ".5", "5.", "1e5", "1E-2", "1e", "inf", "-Infinity",
+           "nan", "0x10", "١٢", "١.٥", "abc", "2²", "1.0000000000000001"]
+DATES = ["31-12-2020 23:59", "29-02-2020 10:10", "29-02-2019 10:10", "1-1-2020 1:5", "01-01-2020 00:00:60",
+         "01-01-2020 00:00:59", "01-01-0000 00:00", "31-04-2021 10:10", "01-13-2020 10:10", "1-1-2020  1:5:7",
+         "01-01-2020\t10:10", "01-01-2020 24:00", "01-01-2020 10:60", "١-١-٢٠٢٠ ١:٥", " 1-01-2020 10:10"]
+FORMATS = ["%d-%m-%Y %H:%M", "%d-%m-%Y %H:%M:%S"]
+
+
+def _accepts(func, value):
+    try:
+        func(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _strptime_any(value):
+    if not any(_accepts(lambda v: datetime.strptime(v, fmt), value) for fmt in FORMATS):
+        raise ValueError(value)
+
+
+def _invalid(rule, values, repeat=1):
+    rows = [[v] for v in values] * repeat
+    return {line - 2 for line, _ in validate_rows(Schema("t", [rule]), ["x"], rows, 2)}
+
+
+def test_types_match_python_builtins():
+    # repeat=300 exercises the dictionary-encoded path for repeated values
+    for repeat in (1, 300):
+        for kind, reference, values in (("int", int, NUMBERS), ("float", float, NUMBERS),
+                                        ("datetime", _strptime_any, DATES)):
+            rule = Rule("x", kind, "bad", formats=FORMATS)
+            expected = {i for i, v in enumerate(values * repeat) if not _accepts(reference, v.strip())}
+            assert _invalid(rule, values, repeat) == expected, kind
+
+
+def test_bounds_optional_and_messages():
+    rule = Rule("score", "int", "'{column}' invalid: '{value}'", optional=True, bounds=(0, 10),
+                range_message="'{column}' = {parsed} out of range")
+    rows = [["3"], ["11"], [" x "], [""], []]
+    errors = validate_rows(Schema("t", [rule]), ["score"], [r for r in rows if r], 2)
+    assert errors == [(3, ["'score' = 11 out of range"]), (4, ["'score' invalid: 'x'"])]
+
+
+def test_file_semantics_and_chunking_match_dictreader():
+    schema = Schema("t", [Rule("a", "int", "a {raw}"), Rule("b", "float", "b {raw}", clean="number")])
+    text = "a,b\n1,\"1,000\"\n\n2\nx,$5,extra\n \n3,4\n" * 50
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "t.csv")
+        with open(path, "w", newline="") as f:
+            f.write(text)
+        expected = []
+        with open(path, newline="") as f:
+            for line, row in enumerate(csv.DictReader(f), start=2):
+                messages = [f"a {row['a']}"] if not _accepts(int, row["a"] or "") else []
+                b = (row["b"] or "").replace(",", "").replace("$", "").strip()
+                messages += [f"b {row['b']}"] if not _accepts(float, b) else []
+                if messages:
+                    expected.append((line, messages))
+        assert list(iter_errors(path, schema)) == expected
+        assert list(iter_errors(path, schema, chunk_rows=7, workers=2)) == expected
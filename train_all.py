@@ -0,0 +1,252 @@
+"""
+Train the hazard models concurrently.
+
+Each model trains in its own process with a core budget (RandomForest
+n_jobs), so a full retrain takes about as long as the slowest model rather
+than the sum of all three. Parsed training arrays are cached as .npz files
+keyed by the content hash of the processed CSV, models are written to a
+temporary file and moved into place, and models/manifest.json records what
+each model was trained from.
+
+Training data comes from preprocessesdata.py (data/processed/<dataset>.csv).
+
+Usage:
+    python train_all.py                                  # all models
+    python train_all.py earthquake flood                 # some models
+    python train_all.py --cores earthquake=6 wildfire=2  # per-model core budgets
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+processed_dir = os.path.join(base_path, "data", "processed")
+array_cache_dir = os.path.join(processed_dir, ".cache", "train")
+model_dir = os.path.join(base_path, "models")
+
+FEATURES = ["lat", "lon"]
+
+# How each model is built; split_seed None keeps the flood script's unseeded split
+MODEL_SPECS = {
+    "earthquake": {"data": "earthquakes.csv", "kind": "forest", "split_seed": 42,
+                   "params": {"n_estimators": 200, "random_state": 42}},
+    "flood": {"data": "floods.csv", "kind": "logistic", "split_seed": None,
+              "params": {"max_iter": 2000}},
+    "wildfire": {"data": "wildfires.csv", "kind": "forest", "split_seed": 42,
+                 "params": {"n_estimators": 200, "random_state": 42}},
+}
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_training_arrays(csv_path):
+    """(X, y, data hash) for a processed CSV, parsed once per content hash"""
+    data_hash = file_hash(csv_path)
+    cache_path = os.path.join(array_cache_dir, f"{os.path.splitext(os.path.basename(csv_path))[0]}-{data_hash[:16]}.npz")
+    if os.path.exists(cache_path):
+        with np.load(cache_path) as cached:
+            return cached["X"], cached["y"], data_hash
+
+    import pandas as pd
+    df = pd.read_csv(csv_path)
+    missing = [c for c in FEATURES + ["label"] if c not in df.columns]
+    if missing:
+        raise ValueError(f"Missing columns in {os.path.basename(csv_path)}: {missing}")
+    X = df[FEATURES].to_numpy(dtype=np.float64)
+    y = df["label"].to_numpy()
+
+    os.makedirs(array_cache_dir, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=array_cache_dir, suffix=".npz")
+    with os.fdopen(fd, "wb") as f:
+        np.savez(f, X=X, y=y)
+    os.replace(tmp, cache_path)
+    return X, y, data_hash
+
+
+def build_model(spec, n_jobs):
+    if spec["kind"] == "forest":
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier(n_jobs=n_jobs, **spec["params"])
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    return Pipeline([
+        ('scaler', StandardScaler()),
+        ('logreg', LogisticRegression(**spec["params"]))
+    ])
+
+
+def write_atomic(obj, path):
+    """Pickle obj to path via a temporary file in the same directory"""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(obj, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def train_one(name, n_jobs, out_dir=model_dir):
+    """Train and save one model; runs in a worker process. Returns a manifest entry."""
+    from sklearn.metrics import accuracy_score
+    from sklearn.model_selection import train_test_split
+
+    start = time.perf_counter()
+    spec = MODEL_SPECS[name]
+    csv_path = os.path.join(processed_dir, spec["data"])
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"{os.path.relpath(csv_path, base_path)} not found - run python preprocessesdata.py first")
+    X, y, data_hash = load_training_arrays(csv_path)
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=spec["split_seed"])
+    model = build_model(spec, n_jobs)
+    model.fit(X_train, y_train)
+    accuracy = accuracy_score(y_test, model.predict(X_test))
+
+    if hasattr(model, "n_jobs"):
+        model.n_jobs = None  # don't carry the training core budget into serving
+    path = os.path.join(out_dir, f"{name}_model.pkl")
+    write_atomic(model, path)
+    return {
+        "file": os.path.basename(path),
+        "sha256": file_hash(path),
+        "data": os.path.relpath(csv_path, base_path),
+        "data_sha256": data_hash,
+        "rows": int(len(y)),
+        "accuracy": round(float(accuracy), 4),
+        "n_jobs": n_jobs,
+        "seconds": round(time.perf_counter() - start, 3),
+        "params": spec["params"],
+        "trained_at": datetime.now().isoformat(),
+    }
+
+
+def core_budgets(names, overrides, total=None):
+    """Split the machine's cores between the forests; logistic models get one.
+
+    With fewer cores than models every model gets one core, as only that
+    many train at a time (see worker_count).
+    """
+    total = total or os.cpu_count() or 1
+    budgets = {n: overrides[n] for n in names if n in overrides}
+    rest = [n for n in names if n not in budgets]
+    if total < len(names):
+        budgets.update((n, 1) for n in rest)
+        return budgets
+    forests = [n for n in rest if MODEL_SPECS[n]["kind"] == "forest"]
+    for n in rest:
+        if n not in forests:
+            budgets[n] = 1
+    free = max(1, total - sum(budgets.values()))
+    for i, n in enumerate(forests):
+        budgets[n] = max(1, free // len(forests) + (1 if i < free % len(forests) else 0))
+    return budgets
+
+
+def worker_count(names, total=None):
+    """Training processes to run at once: one per model, at most one per core"""
+    return max(1, min(len(names), total or os.cpu_count() or 1))
+
+
+def update_manifest(entries, out_dir=model_dir):
+    path = os.path.join(out_dir, "manifest.json")
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest.setdefault("models", {}).update(entries)
+    manifest["updated_at"] = datetime.now().isoformat()
+    fd, tmp = tempfile.mkstemp(dir=out_dir, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def parse_cores(values):
+    budgets = {}
+    for value in values or []:
+        name, _, cores = value.partition("=")
+        if name not in MODEL_SPECS or not cores.isdigit() or int(cores) < 1:
+            raise argparse.ArgumentTypeError(f"bad --cores entry {value!r}, expected e.g. earthquake=4")
+        budgets[name] = int(cores)
+    return budgets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the DisasterScope models in parallel")
+    parser.add_argument("models", nargs="*", help=f"Models to train (default: all of {list(MODEL_SPECS)})")
+    parser.add_argument("--cores", nargs="+", metavar="MODEL=N", help="Per-model core budgets")
+    parser.add_argument("--sequential", action="store_true", help="Train one model at a time in this process")
+    parser.add_argument("--model-dir", default=model_dir)
+    args = parser.parse_args(argv)
+
+    names = args.models or list(MODEL_SPECS)
+    unknown = [n for n in names if n not in MODEL_SPECS]
+    if unknown:
+        parser.error(f"unknown model(s) {unknown}; choose from {list(MODEL_SPECS)}")
+    try:
+        budgets = core_budgets(names, parse_cores(args.cores))
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    workers = 1 if args.sequential else worker_count(names)
+    os.makedirs(args.model_dir, exist_ok=True)
+
+    print(f"Training {', '.join(f'{n} ({budgets[n]} cores)' for n in names)} in {workers} process(es)...")
+    start = time.perf_counter()
+    results, failed = {}, 0
+    if workers == 1:
+        outcomes = []
+        for n in names:
+            try:
+                outcomes.append((n, train_one(n, budgets[n], args.model_dir), None))
+            except Exception as e:
+                outcomes.append((n, None, e))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {n: pool.submit(train_one, n, budgets[n], args.model_dir) for n in names}
+            outcomes = []
+            for n, future in futures.items():
+                try:
+                    outcomes.append((n, future.result(), None))
+                except Exception as e:
+                    outcomes.append((n, None, e))
+
+    for n, entry, error in outcomes:
+        if error is not None:
+            failed += 1
+            print(f"❌ {n}: {error}")
+            continue
+        results[n] = entry
+        print(f"✅ {n}: accuracy {entry['accuracy']}, {entry['seconds']}s -> {os.path.join(args.model_dir, entry['file'])}")
+
+    if results:
+        update_manifest(results, args.model_dir)
+    wall = time.perf_counter() - start
+    total = sum(e["seconds"] for e in results.values())
+    print(f"Done in {wall:.2f}s wall ({total:.2f}s of model training)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
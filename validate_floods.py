@@ -1,59 +1,46 @@
-import csv
 import os
 
-def validate_floods_csv(filepath):
-    expected_columns = [
-        "MonsoonIntensity", "TopographyDrainage", "RiverManagement", "Deforestation", "Urbanization",
-        "ClimateChange", "DamsQuality", "Siltation", "AgriculturalPractices", "Encroachments",
-        "IneffectiveDisasterPreparedness", "DrainageSystems", "CoastalVulnerability", "Landslides",
-        "Watersheds", "DeterioratingInfrastructure", "PopulationScore", "WetlandLoss",
-        "InadequatePlanning", "PoliticalFactors", "FloodProbability"
-    ]
+from validation_engine import Rule, Schema, iter_errors, missing_columns, read_fieldnames
 
-    if not os.path.exists(filepath):
-        print(f"❌ File not found: {filepath}")
-        return False
-
-    warnings = []
-
-    with open(filepath, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+expected_columns = [
+    "MonsoonIntensity", "TopographyDrainage", "RiverManagement", "Deforestation", "Urbanization",
+    "ClimateChange", "DamsQuality", "Siltation", "AgriculturalPractices", "Encroachments",
+    "IneffectiveDisasterPreparedness", "DrainageSystems", "CoastalVulnerability", "Landslides",
+    "Watersheds", "DeterioratingInfrastructure", "PopulationScore", "WetlandLoss",
+    "InadequatePlanning", "PoliticalFactors", "FloodProbability"
+]
 
-        if not reader.fieldnames:
-            print("❌ File is empty or missing header row.")
-            return False
-        
-        # Clean header spaces
-        headers = [h.strip() for h in reader.fieldnames]
+# Integer scores 0–10, then FloodProbability in 0–1
+SCHEMA = Schema("floods", [
+    Rule(col, "int", "'{column}' invalid integer: '{value}'", bounds=(0, 10),
+         range_message="'{column}' = {parsed} out of range (0–10)")
+    for col in expected_columns[:-1]
+] + [
+    Rule("FloodProbability", "float", "FloodProbability invalid float: '{value}'", bounds=(0.0, 1.0),
+         range_message="FloodProbability {parsed} out of range (0–1)"),
+], required_columns=expected_columns)
 
-        missing = [c for c in expected_columns if c not in headers]
-        if missing:
-            print(f"❌ Missing columns: {missing}")
-            print(f"📌 Found columns: {headers}")
-            return False
 
-        for row_num, row in enumerate(reader, start=2):
-            for col in expected_columns[:-1]:  # integer columns
-                cell = row.get(col, "")
-                cell = cell.strip() if isinstance(cell, str) else ""
+def validate_floods_csv(filepath, workers=None):
+    if not os.path.exists(filepath):
+        print(f"❌ File not found: {filepath}")
+        return False
 
-                try:
-                    val = int(cell)
-                    if not (0 <= val <= 10):
-                        warnings.append(f"Row {row_num}: '{col}' = {val} out of range (0–10)")
-                except ValueError:
-                    warnings.append(f"Row {row_num}: '{col}' invalid integer: '{cell}'")
+    fieldnames = read_fieldnames(filepath)
+    if not fieldnames:
+        print("❌ File is empty or missing header row.")
+        return False
 
-            # FloodProbability
-            prob = row.get("FloodProbability", "")
-            prob = prob.strip() if isinstance(prob, str) else ""
+    # Clean header spaces
+    headers, missing = missing_columns(fieldnames, SCHEMA.required_columns)
+    if missing:
+        print(f"❌ Missing columns: {missing}")
+        print(f"📌 Found columns: {headers}")
+        return False
 
-            try:
-                p = float(prob)
-                if not (0.0 <= p <= 1.0):
-                    warnings.append(f"Row {row_num}: FloodProbability {p} out of range (0–1)")
-            except ValueError:
-                warnings.append(f"Row {row_num}: FloodProbability invalid float: '{prob}'")
+    warnings = [f"Row {row_num}: {message}"
+                for row_num, messages in iter_errors(filepath, SCHEMA, workers=workers)
+                for message in messages]
 
     if warnings:
         print("⚠️ Validation Warnings:")
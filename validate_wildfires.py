@@ -1,97 +1,48 @@
-import csv
 import os
 
-columns = ["Year", "Fires", "Acres", "ForestService", "DOIAgencies", "Total"]
-
-def clean_number(value):
-    if value is None:
-        return ""
-    return value.replace(",", "").replace("$", "").strip()
-
-def is_valid_int(value):
-    try:
-        int(value)
-        return True
-    except (ValueError, TypeError):
-        return False
-
-def is_valid_float(value):
-    try:
-        float(value)
-        return True
-    except (ValueError, TypeError):
-        return False
-
-def validate_row(row, line_num):
-    errors = []
-
-    # Year
-    year = clean_number(row.get("Year", ""))
-    if not is_valid_int(year):
-        errors.append(f"Invalid Year: {row.get('Year')}")
-
-    # Fires
-    fires = clean_number(row.get("Fires", ""))
-    if not is_valid_int(fires):
-        errors.append(f"Invalid Fires count: {row.get('Fires')}")
+from validation_engine import Rule, Schema, iter_errors, missing_columns, read_fieldnames
 
-    # Acres
-    acres = clean_number(row.get("Acres", ""))
-    if not is_valid_int(acres):
-        errors.append(f"Invalid Acres count: {row.get('Acres')}")
-
-    # ForestService
-    fs = clean_number(row.get("ForestService", ""))
-    if not is_valid_float(fs):
-        errors.append(f"Invalid ForestService amount: {row.get('ForestService')}")
-
-    # DOIAgencies
-    doi = clean_number(row.get("DOIAgencies", ""))
-    if not is_valid_float(doi):
-        errors.append(f"Invalid DOIAgencies amount: {row.get('DOIAgencies')}")
+columns = ["Year", "Fires", "Acres", "ForestService", "DOIAgencies", "Total"]
 
-    # Total
-    total = clean_number(row.get("Total", ""))
-    if not is_valid_float(total):
-        errors.append(f"Invalid Total amount: {row.get('Total')}")
+# Numbers may carry thousands separators and dollar signs; messages show the raw cell
+SCHEMA = Schema("wildfires", [
+    Rule("Year", "int", "Invalid Year: {raw}", clean="number"),
+    Rule("Fires", "int", "Invalid Fires count: {raw}", clean="number"),
+    Rule("Acres", "int", "Invalid Acres count: {raw}", clean="number"),
+    Rule("ForestService", "float", "Invalid ForestService amount: {raw}", clean="number"),
+    Rule("DOIAgencies", "float", "Invalid DOIAgencies amount: {raw}", clean="number"),
+    Rule("Total", "float", "Invalid Total amount: {raw}", clean="number"),
+], required_columns=columns)
 
-    return errors
 
-def validate_wildfire_csv(filepath):
+def validate_wildfire_csv(filepath, workers=None):
     if not os.path.exists(filepath):
         print(f"❌ File not found: {filepath}")
         return
 
-    with open(filepath, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-
-        if not reader.fieldnames:
-            print("❌ CSV has no header row.")
-            return
-
-        # Clean header spaces
-        header = [h.strip() for h in reader.fieldnames]
+    fieldnames = read_fieldnames(filepath)
+    if not fieldnames:
+        print("❌ CSV has no header row.")
+        return
 
-        missing_cols = [col for col in columns if col not in header]
-        if missing_cols:
-            print(f"❌ Missing columns: {missing_cols}")
-            print(f"📌 Found columns: {header}")
-            return
+    # Clean header spaces
+    header, missing_cols = missing_columns(fieldnames, SCHEMA.required_columns)
+    if missing_cols:
+        print(f"❌ Missing columns: {missing_cols}")
+        print(f"📌 Found columns: {header}")
+        return
 
-        all_errors = []
-        for line_num, row in enumerate(reader, start=2):
-            errors = validate_row(row, line_num)
-            if errors:
-                all_errors.append(f"Line {line_num}: {', '.join(errors)}")
+    all_errors = [f"Line {line_num}: {', '.join(errors)}"
+                  for line_num, errors in iter_errors(filepath, SCHEMA, workers=workers)]
 
-        if all_errors:
-            print("⚠️ Wildfire Dataset Validation Errors:")
-            for err in all_errors:
-                print(" -", err)
-        else:
-            print("✅ No errors found in Wildfire dataset!")
+    if all_errors:
+        print("⚠️ Wildfire Dataset Validation Errors:")
+        for err in all_errors:
+            print(" -", err)
+    else:
+        print("✅ No errors found in Wildfire dataset!")
 
-        print("✅ Wildfire CSV validation complete.")
+    print("✅ Wildfire CSV validation complete.")
 
 if __name__ == "__main__":
     validate_wildfire_csv("wildfires.csv")
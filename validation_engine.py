@@ -0,0 +1,414 @@
+"""
+Chunked, vectorized CSV validation.
+
+The validate_*.py scripts used to walk csv.DictReader row by row with
+try/except float()/int() and strptime loops. Here each dataset declares its
+rules as a Schema; the file is parsed with the csv module in chunks of rows
+(so blank, short and long rows behave exactly as they do for DictReader),
+and every rule is checked for a whole column at once:
+
+  - int/float: plain digit strings pass straight away; the rest are matched
+    against patterns equivalent to what int()/float() accept (signs,
+    underscores, exponents, inf/nan); range checks compare NumPy arrays
+  - datetime: zero-padded values are checked on a code point matrix
+    (digits, separators, calendar); anything else gets the patterns
+    strptime builds for the format
+  - enums and required values: set lookups
+  - low-cardinality columns are dictionary-encoded, so each distinct value
+    is checked once
+
+Values containing non-ASCII characters (where int()/float()/strptime also
+accept other Unicode digits) are checked with the Python built-ins
+directly, and messages are only built for failing cells. Chunks are spread
+over a process pool once a file has more than one, and errors come back in
+file order with the same messages as before.
+"""
+import csv
+import operator
+import os
+import re
+import string
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import chain
+
+import numpy as np
+
+CHUNK_ROWS = 100_000
+
+_DIGITS = r"[0-9](?:_?[0-9])*"
+INT_PATTERN = rf"[+-]?{_DIGITS}"
+FLOAT_PATTERN = (rf"[+-]?(?:(?:{_DIGITS}(?:\.(?:{_DIGITS})?)?|\.{_DIGITS})(?:[eE][+-]?{_DIGITS})?"
+                 r"|(?i:inf|infinity|nan))")
+
+# Patterns time.strptime uses for each directive
+_STRPTIME_DIRECTIVES = {
+    'd': r"(3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])",
+    'm': r"(1[0-2]|0[1-9]|[1-9])",
+    'Y': r"(\d\d\d\d)",
+    'H': r"(2[0-3]|[0-1]\d|\d)",
+    'M': r"([0-5]\d|\d)",
+    'S': r"(6[0-1]|[0-5]\d|\d)",
+}
+
+
+class Rule:
+    """One check on one column.
+
+    kind: 'required', 'int', 'float', 'choice' or 'datetime'.
+    message / range_message are str.format templates; available fields are
+    column, value (cleaned), raw (as read, None if the row had no such cell)
+    and, for range_message, parsed.
+    clean: 'strip' (default) or 'number' (drop ',' and '$' first).
+    """
+
+    def __init__(self, column, kind, message, optional=False, bounds=None, range_message=None,
+                 choices=None, lower=False, formats=None, clean='strip'):
+        self.column = column
+        self.kind = kind
+        self.message = message
+        self.optional = optional
+        self.bounds = bounds
+        self.range_message = range_message
+        self.choices = tuple(choices) if choices else ()
+        self.lower = lower
+        self.formats = tuple(formats) if formats else ()
+        self.clean = clean
+
+
+class Schema:
+    """Rules for one dataset, checked in order for every row"""
+
+    def __init__(self, name, rules, required_columns=()):
+        self.name = name
+        self.rules = list(rules)
+        self.required_columns = list(required_columns)
+
+
+# --- Scalar reference checks (used for non-ASCII values) ---
+
+def _py_int(value):
+    try:
+        int(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def _py_float(value):
+    try:
+        float(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def _py_datetime(value, formats):
+    for fmt in formats:
+        try:
+            datetime.strptime(value, fmt)
+            return True
+        except ValueError:
+            pass
+    return False
+
+
+# --- Vectorized checks ---
+
+def _strptime_regex(fmt):
+    """Anchored regex for a strptime format and the directive of each group"""
+    parts, order, i = [], [], 0
+    while i < len(fmt):
+        ch = fmt[i]
+        if ch == '%':
+            directive = fmt[i + 1:i + 2]
+            if directive not in _STRPTIME_DIRECTIVES:
+                raise ValueError(f"Unsupported directive %{directive}")
+            parts.append(_STRPTIME_DIRECTIVES[directive])
+            order.append(directive)
+            i += 2
+        elif ch.isspace():
+            parts.append(r"\s+")
+            while i < len(fmt) and fmt[i].isspace():
+                i += 1
+        else:
+            parts.append(re.escape(ch))
+            i += 1
+    return re.compile("".join(parts), re.ASCII), order
+
+
+_INT_RE = re.compile(INT_PATTERN, re.ASCII)
+_FLOAT_RE = re.compile(FLOAT_PATTERN, re.ASCII)
+
+
+def _fullmatch(pattern, values):
+    return np.fromiter(map(bool, map(pattern.fullmatch, values)), dtype=bool, count=len(values))
+
+
+def _valid_dates(values, fmt):
+    """Boolean array: values that datetime.strptime(value, fmt) accepts (ASCII forms only)"""
+    try:
+        pattern, order = _strptime_regex(fmt)
+    except ValueError:
+        return np.array([_py_datetime(v, (fmt,)) for v in values], dtype=bool)
+    matches = list(map(pattern.fullmatch, values))
+    ok = np.fromiter(map(bool, matches), dtype=bool, count=len(values))
+    if not ok.any():
+        return ok
+    fields = np.array([m.groups() for m in matches if m]).astype(np.int64)
+    n = len(fields)
+    column = {d: fields[:, i] for i, d in enumerate(order)}
+    year = column.get('Y', np.full(n, 1900))
+    month = column.get('m', np.ones(n, dtype=np.int64))
+    day = column.get('d', np.ones(n, dtype=np.int64))
+    valid = (year >= 1) & (day <= _days_in_month(year, month))
+    if 'S' in column:
+        valid &= column['S'] <= 59  # strptime matches 60/61, datetime() rejects them
+    ok[ok] = valid
+    return ok
+
+
+_FIELD_RANGES = {'d': (1, 31), 'm': (1, 12), 'Y': (1, 9999), 'H': (0, 23), 'M': (0, 59), 'S': (0, 59)}
+
+
+def _fixed_dates(values, fmt):
+    """Boolean array: values that are the zero-padded rendering of fmt with valid fields.
+
+    Every such value is accepted by strptime; anything else is left False
+    for the pattern check. Works on a (rows x characters) code point matrix.
+    """
+    ok = np.zeros(len(values), dtype=bool)
+    layout, literals, width, i = [], [], 0, 0
+    while i < len(fmt):
+        if fmt[i] == '%':
+            directive = fmt[i + 1:i + 2]
+            if directive not in _FIELD_RANGES:
+                return ok
+            size = 4 if directive == 'Y' else 2
+            layout.append((directive, width, size))
+            width += size
+            i += 2
+        else:
+            literals.append((width, ord(fmt[i])))
+            width += 1
+            i += 1
+    rows = np.flatnonzero(np.fromiter(map(len, values), dtype=np.int64, count=len(values)) == width)
+    if not rows.size:
+        return ok
+    chars = np.array([values[r] for r in rows.tolist()], dtype=f"<U{width}").view(np.uint32)
+    chars = chars.reshape(len(rows), width).astype(np.int64)
+    valid = np.ones(len(rows), dtype=bool)
+    for pos, code in literals:
+        valid &= chars[:, pos] == code
+    fields = {}
+    for directive, pos, size in layout:
+        digits = chars[:, pos:pos + size] - 48
+        valid &= ((digits >= 0) & (digits <= 9)).all(axis=1)
+        fields[directive] = digits @ (10 ** np.arange(size - 1, -1, -1))
+        lo, hi = _FIELD_RANGES[directive]
+        valid &= (fields[directive] >= lo) & (fields[directive] <= hi)
+    if 'd' in fields:
+        year = fields.get('Y', np.full(len(rows), 1900))
+        month = fields.get('m', np.ones(len(rows), dtype=np.int64))
+        valid &= fields['d'] <= _days_in_month(year, np.clip(month, 1, 12))
+    ok[rows] = valid
+    return ok
+
+
+def _days_in_month(year, month):
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    return np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])[month] + ((month == 2) & leap)
+
+
+def _clean(rule, raw):
+    values = ["" if v is None else v for v in raw] if None in raw else raw
+    if rule.clean == 'number':
+        values = [v.replace(",", "").replace("$", "") for v in values]
+    values = list(map(str.strip, values))
+    if rule.lower:
+        values = list(map(str.lower, values))
+    return values
+
+
+def _mask(func, values):
+    return np.fromiter(map(func, values), dtype=bool, count=len(values))
+
+
+_drop_dot = operator.methodcaller("replace", ".", "", 1)
+
+
+def _check_values(rule, values):
+    """(invalid offsets, out-of-range offsets) for a list of cleaned values"""
+    if rule.kind == 'required':
+        return np.flatnonzero(~_mask(bool, values)), np.empty(0, dtype=np.int64)
+    if rule.kind == 'choice':
+        ok = _mask(set(rule.choices).__contains__, values)
+        if rule.optional:
+            ok |= ~_mask(bool, values)
+        return np.flatnonzero(~ok), np.empty(0, dtype=np.int64)
+
+    if rule.kind == 'int':
+        # Plain digit strings (with one '.' for floats) are always valid; only
+        # the rest go through the full pattern
+        ok, pattern, fallback = _mask(str.isdecimal, values), _INT_RE, _py_int
+    elif rule.kind == 'float':
+        ok = np.fromiter(map(str.isdecimal, map(_drop_dot, values)), dtype=bool, count=len(values))
+        pattern, fallback = _FLOAT_RE, _py_float
+    elif rule.kind == 'datetime':
+        ok = np.zeros(len(values), dtype=bool)
+        for fmt in rule.formats:
+            ok |= _fixed_dates(values, fmt)
+    else:
+        raise ValueError(f"Unknown rule kind {rule.kind!r}")
+
+    rest = [i for i in np.flatnonzero(~ok).tolist() if values[i]]
+    empty = [i for i in np.flatnonzero(~ok).tolist() if not values[i]]
+    if rule.kind == 'datetime' and rest:
+        # Unpadded, oddly spaced or invalid dates: the strptime patterns
+        subset = [values[i] for i in rest]
+        matched = np.zeros(len(subset), dtype=bool)
+        for fmt in rule.formats:
+            matched |= _valid_dates(subset, fmt)
+        for j in np.flatnonzero(~matched).tolist():
+            if not subset[j].isascii():
+                matched[j] = _py_datetime(subset[j], rule.formats)
+        ok[rest] = matched
+    elif rest:
+        for i in rest:
+            v = values[i]
+            # The pattern is ASCII-only; int()/float() also take other Unicode digits
+            ok[i] = bool(pattern.fullmatch(v)) if v.isascii() else fallback(v)
+
+    out_of_range = np.empty(0, dtype=np.int64)
+    if rule.bounds is not None and rule.kind in ('int', 'float'):
+        candidates = np.flatnonzero(ok)
+        if candidates.size:
+            convert = int if rule.kind == 'int' else float
+            selected = [values[i] for i in candidates.tolist()]
+            try:
+                numbers = np.fromiter(map(convert, selected), dtype=np.int64 if convert is int else np.float64,
+                                      count=len(selected))
+            except OverflowError:
+                numbers = np.array([convert(v) for v in selected], dtype=object)
+            lo, hi = rule.bounds
+            out_of_range = candidates[~((numbers >= lo) & (numbers <= hi)).astype(bool)]
+    if rule.optional:
+        ok[empty] = True
+    return np.flatnonzero(~ok), out_of_range
+
+
+def _check_rule(rule, raw):
+    """(invalid offsets, out-of-range offsets) for one raw column.
+
+    Low-cardinality columns (scores, flags, codes) are dictionary-encoded:
+    each distinct value is checked once and the result mapped back.
+    """
+    sample = raw[:1024]
+    if len(raw) >= 4096 and len(set(sample)) * 4 <= len(sample):
+        distinct = list(dict.fromkeys(raw))
+        if len(distinct) * 4 <= len(raw):
+            invalid, out_of_range = _check_values(rule, _clean(rule, distinct))
+            status = np.zeros(len(distinct), dtype=np.int8)
+            status[invalid] = 1
+            status[out_of_range] = 2
+            code = {v: i for i, v in enumerate(distinct)}
+            per_row = status[np.fromiter(map(code.__getitem__, raw), dtype=np.int64, count=len(raw))]
+            return np.flatnonzero(per_row == 1), np.flatnonzero(per_row == 2)
+    return _check_values(rule, _clean(rule, raw))
+
+
+def _column(rows, index, shortest):
+    if index is None:
+        return [None] * len(rows)
+    if shortest > index:
+        return list(map(operator.itemgetter(index), rows))
+    return [r[index] if index < len(r) else None for r in rows]
+
+
+def _formatter(rule, template):
+    """Message builder for error offsets; templates without per-row fields are formatted once"""
+    fields = {name for _, name, _, _ in string.Formatter().parse(template) if name}
+    if fields <= {'column'}:
+        message = template.format(column=rule.column)
+        return lambda raw: message
+    convert = int if rule.kind == 'int' else float
+
+    def build(raw):
+        value = _clean(rule, [raw])[0]
+        parsed = convert(value) if 'parsed' in fields else None
+        return template.format(column=rule.column, value=value, raw=raw, parsed=parsed)
+    return build
+
+
+def validate_rows(schema, fieldnames, rows, first_line):
+    """Validate a list of csv rows; returns [(line number, [messages])] for rows with errors"""
+    # DictReader semantics: the last column with a given name wins, short
+    # rows read as None
+    index = {name: i for i, name in enumerate(fieldnames)}
+    shortest = min(map(len, rows))
+    errors = {}
+    for rule in schema.rules:
+        raw = _column(rows, index.get(rule.column), shortest)
+        invalid, out_of_range = _check_rule(rule, raw)
+        for offsets, template in ((invalid, rule.message), (out_of_range, rule.range_message)):
+            if offsets.size:
+                message = _formatter(rule, template)
+                for off in offsets.tolist():
+                    errors.setdefault(off, []).append(message(raw[off]))
+    return [(first_line + off, errors[off]) for off in sorted(errors)]
+
+
+def read_fieldnames(path):
+    """Header row as csv.DictReader sees it (None for an empty file)"""
+    with open(path, newline='', encoding='utf-8') as f:
+        return next(csv.reader(f), None)
+
+
+def _chunks(reader, chunk_rows):
+    chunk, first_line, line = [], 2, 2
+    for row in reader:
+        if not row:
+            continue  # DictReader skips blank rows without counting them
+        chunk.append(row)
+        line += 1
+        if len(chunk) >= chunk_rows:
+            yield first_line, chunk
+            chunk, first_line = [], line
+    if chunk:
+        yield first_line, chunk
+
+
+def iter_errors(path, schema, chunk_rows=None, workers=None):
+    """Yield (line number, [messages]) for every invalid row, in file order"""
+    chunk_rows = chunk_rows or CHUNK_ROWS
+    workers = workers or os.cpu_count() or 1
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        fieldnames = next(reader, None)
+        if fieldnames is None:
+            return
+        chunks = _chunks(reader, chunk_rows)
+        first = next(chunks, None)
+        if first is None:
+            return
+        second = next(chunks, None)
+        chunks = chain([first], [second] if second else [], chunks)
+        if second is None or workers <= 1:
+            for first_line, rows in chunks:
+                yield from validate_rows(schema, fieldnames, rows, first_line)
+            return
+
+        # Keep a bounded number of chunks in flight so memory stays flat
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = []
+            for first_line, rows in chunks:
+                pending.append(pool.submit(validate_rows, schema, fieldnames, rows, first_line))
+                if len(pending) >= workers * 2:
+                    yield from pending.pop(0).result()
+            for future in pending:
+                yield from future.result()
+
+
+def missing_columns(fieldnames, required):
+    headers = [h.strip() for h in fieldnames]
+    return headers, [c for c in required if c not in headers]